@@ -66,17 +66,17 @@ async function uploadPendingData(token) {
             // Envia o lote
             const response = await api.registrarCheckinAdmin(token, payload);
             
-            // Extrai IDs com segurança
-            let idsGerados = [];
-            if (response.ids) idsGerados = response.ids;
-            else if (response.data && response.data.ids) idsGerados = response.data.ids;
+            // `itens` vem na mesma ordem do payload (um por presença enviada);
+            // `ids` traz só as presenças criadas agora e não casa por posição
+            const dados = response.data || response;
+            const itens = dados.itens || [];
             
-            logger.info("checkin_ids_received", { total: idsGerados.length, sent: readyToSend.length });
+            logger.info("checkin_ids_received", { total: (dados.ids || []).length, sent: readyToSend.length });
 
             // Atualização Local
             for (let i = 0; i < readyToSend.length; i++) {
                 const localCheckin = readyToSend[i];
-                const serverId = idsGerados[i] || null; // Se não veio ID, usa null
+                const serverId = (itens[i] && itens[i].presenca_id) || null; // Se não veio ID, usa null
                 
                 // Chama a função que atualiza APENAS o status se o ID for null
                 await qCheckins.markCheckinSynced(localCheckin.id_local, serverId);
@@ -0,0 +1,121 @@
+# servico_certificados/benchmarks/bench_qrcode.py
+
+"""
+Custo do QR Code de validação: o PNG antigo (qrcode.make -> PNG ->
+ImageReader -> drawImage) versus o desenho vetorial atual
+(_draw_qr_code), com o cache de matrizes (_qr_modulos) frio e quente.
+
+Mede o QR Code isolado em um canvas e o certificado inteiro
+(renderizar_pdf) com cada variante, informando ms por PDF e o tamanho
+médio do arquivo:
+
+    python servico_certificados/benchmarks/bench_qrcode.py --certificados 200
+
+"Frio" usa um código diferente por certificado e limpa o cache antes da
+medição (primeira emissão); "quente" repete o mesmo código (downloads e
+reemissões do mesmo certificado).
+"""
+
+import argparse
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path[:0] = [str(Path(__file__).resolve().parents[1] / "src"), str(Path(__file__).resolve().parents[2])]
+
+import qrcode
+from reportlab.lib.units import cm
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from services import gerador
+from services.gerador import PAGINA, TEMPLATES, _qr_modulos, frontend_base_url, renderizar_pdf
+
+
+def desenhar_qr_png(c, x, y, tamanho, conteudo):
+    """O QR Code como era antes do desenho vetorial."""
+    qr_img = qrcode.make(conteudo)
+    qr_buffer = io.BytesIO()
+    qr_img.save(qr_buffer, format="PNG")
+    qr_buffer.seek(0)
+    c.drawImage(ImageReader(qr_buffer), x, y, width=tamanho, height=tamanho)
+
+
+VARIANTES = {"png": desenhar_qr_png, "vetorial": gerador._draw_qr_code}
+
+
+def codigos(total: int, quente: bool) -> list:
+    return ["BENCH00000000000" if quente else f"BENCH{i:011d}" for i in range(total)]
+
+
+def medir_qr(desenhar, lista: list) -> float:
+    c = canvas.Canvas(io.BytesIO(), pagesize=PAGINA)
+    base_url = frontend_base_url()
+    inicio = time.perf_counter()
+    for codigo in lista:
+        desenhar(c, 0, 0, 2.5 * cm, f"{base_url}/validar?codigo={codigo}")
+    return time.perf_counter() - inicio
+
+
+def medir_pdf(desenhar, lista: list, template: str) -> tuple:
+    original = gerador._draw_qr_code
+    gerador._draw_qr_code = desenhar
+    try:
+        tamanhos = []
+        inicio = time.perf_counter()
+        for i, codigo in enumerate(lista):
+            conteudo, _ = renderizar_pdf({
+                "codigo_unico": codigo,
+                "participante_nome": f"Participante {i}",
+                "evento_nome": "Semana de Tecnologia",
+                "evento_data": "18/10/2026",
+                "template_nome": template,
+            })
+            tamanhos.append(len(conteudo))
+        return time.perf_counter() - inicio, statistics.mean(tamanhos)
+    finally:
+        gerador._draw_qr_code = original
+
+
+def cenarios():
+    yield "png", False
+    yield "vetorial", False
+    yield "vetorial", True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--certificados", type=int, default=200)
+    args = parser.parse_args()
+
+    # Aquece imports, fontes e o encoder PNG fora da medição
+    for desenhar in VARIANTES.values():
+        medir_pdf(desenhar, codigos(2, quente=False), "default")
+
+    for variante, quente in cenarios():
+        lista = codigos(args.certificados, quente)
+        _qr_modulos.cache_clear()
+        duracao = medir_qr(VARIANTES[variante], lista)
+        print({
+            "medida": "qr_isolado", "variante": variante, "cache": "quente" if quente else "frio",
+            "ms_por_qr": round(duracao / len(lista) * 1000, 3),
+        })
+
+    for template in sorted(TEMPLATES):
+        for variante, quente in cenarios():
+            lista = codigos(args.certificados, quente)
+            _qr_modulos.cache_clear()
+            duracao, tamanho = medir_pdf(VARIANTES[variante], lista, template)
+            print({
+                "medida": "pdf", "template": template, "variante": variante,
+                "cache": "quente" if quente else "frio",
+                "ms_por_pdf": round(duracao / len(lista) * 1000, 2),
+                "kb_por_pdf": round(tamanho / 1024, 1),
+            })
+    print({"cache_qr": _qr_modulos.cache_info()._asdict()})
+
+
+if __name__ == "__main__":
+    main()
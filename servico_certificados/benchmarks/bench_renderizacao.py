@@ -0,0 +1,127 @@
+# servico_certificados/benchmarks/bench_renderizacao.py
+
+"""
+Vazão da renderização de PDFs: por template registrado, com a camada
+estática pré-compilada e redesenhada a cada certificado, e do pool de
+renderização por número de workers.
+
+Primeiro renderiza N certificados de cada template em TEMPLATES, no
+processo atual, com o fundo pré-compilado (TemplateCertificado.desenhar)
+e desenhando o fundo a cada PDF (como antes do registro de templates).
+Depois renderiza N certificados concorrentes (templates alternados) pelo
+RenderizadorPDF com 1..W workers e compara com a renderização direta no
+event loop (como era antes do pool):
+
+    python servico_certificados/benchmarks/bench_renderizacao.py --certificados 200
+
+Com o backend de processos a vazão deve crescer com os núcleos do
+container até PDF_RENDER_WORKERS = núcleos. --workers-max 0 mede só os
+templates.
+"""
+
+import argparse
+import asyncio
+import io
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path[:0] = [str(Path(__file__).resolve().parents[1] / "src"), str(Path(__file__).resolve().parents[2])]
+
+from reportlab.pdfgen import canvas
+
+from servico_comum.runtime import cpus_disponiveis
+from services.gerador import PAGINA, TEMPLATES, _qr_modulos, compilar_templates, renderizar_pdf
+from services.renderizador import RenderizadorPDF
+
+
+def massa(total: int, template: str = None) -> list:
+    templates = [template] if template else sorted(TEMPLATES)
+    return [
+        {
+            "codigo_unico": f"BENCH{i:011d}",
+            "participante_nome": f"Participante {i}",
+            "evento_nome": "Semana de Tecnologia",
+            "evento_data": "18/10/2026",
+            "template_nome": templates[i % len(templates)],
+        }
+        for i in range(total)
+    ]
+
+
+def renderizar_sem_compilar(dados: dict):
+    """Como PDFGeneratorService.gerar_pdf_bytes, mas redesenhando o fundo a cada PDF."""
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=PAGINA)
+    w, h = PAGINA
+    data = SimpleNamespace(**dados)
+    template = TEMPLATES[data.template_nome]
+    c.saveState()
+    template.desenhar_fundo(c, w, h)
+    c.restoreState()
+    template.desenhar_conteudo(c, w, h, data)
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def direto(dados: list, renderizar=renderizar_pdf) -> float:
+    inicio = time.perf_counter()
+    for item in dados:
+        renderizar(item)
+    return time.perf_counter() - inicio
+
+
+def por_template(total: int):
+    compilar_templates()
+    for nome in sorted(TEMPLATES):
+        dados = massa(total, nome)
+        for camadas, renderizar in (("pre_compiladas", renderizar_pdf), ("redesenhadas", renderizar_sem_compilar)):
+            renderizar(dados[0])  # aquece fontes e imports fora da medição
+            # Códigos distintos: as duas variantes geram todas as matrizes de QR Code
+            _qr_modulos.cache_clear()
+            duracao = direto(dados, renderizar)
+            print({
+                "template": nome, "camadas_estaticas": camadas,
+                "pdfs_por_s": round(len(dados) / duracao, 1),
+                "ms_por_pdf": round(duracao / len(dados) * 1000, 2),
+            })
+
+
+async def pool(dados: list, backend: str, workers: int) -> float:
+    renderizador = RenderizadorPDF(backend, workers, fila_max=len(dados), timeout=300)
+    renderizador.iniciar()
+    try:
+        # Aquece os workers (spawn + compilação dos fundos) fora da medição
+        await asyncio.gather(*(renderizador.renderizar(item) for item in dados[:workers]))
+        inicio = time.perf_counter()
+        await asyncio.gather(*(renderizador.renderizar(item) for item in dados))
+        return time.perf_counter() - inicio
+    finally:
+        renderizador.encerrar()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--certificados", type=int, default=200)
+    parser.add_argument("--workers-max", type=int, default=cpus_disponiveis())
+    parser.add_argument("--backend", choices=["process", "thread"], default="process")
+    args = parser.parse_args()
+
+    por_template(args.certificados)
+
+    dados = massa(args.certificados)
+    print(f"núcleos disponíveis: {cpus_disponiveis()}")
+
+    _qr_modulos.cache_clear()
+    duracao = direto(dados)
+    print({"modo": "direto", "workers": 1, "pdfs_por_s": round(len(dados) / duracao, 1)})
+
+    for workers in range(1, args.workers_max + 1):
+        duracao = await pool(dados, args.backend, workers)
+        print({"modo": args.backend, "workers": workers, "pdfs_por_s": round(len(dados) / duracao, 1)})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -10,6 +10,7 @@ from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from sqlalchemy.exc import OperationalError
 
 from servico_comum.logger import configure_logger
+from servico_comum.runtime import dimensionar_pool, TESTAR_CONEXAO
 
 
 # ============================================================
@@ -45,8 +46,9 @@ POSTGRES_DB = read_env("POSTGRES_DB")
 POSTGRES_HOST = os.getenv("POSTGRES_HOST", "db")
 POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
 
+# Driver explícito: a partir do SQLAlchemy 2.1 `postgresql://` usa psycopg 3
 DATABASE_URL = (
-    f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}"
+    f"postgresql+psycopg2://{POSTGRES_USER}:{POSTGRES_PASSWORD}"
     f"@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 )
 
@@ -55,10 +57,13 @@ DATABASE_URL = (
 #  ENGINE PROFISSIONAL
 # ============================================================
 
+# Orçamento global de conexões (DB_CONEXOES_MAX) dividido entre os workers
+POOL_SIZE, MAX_OVERFLOW = dimensionar_pool(30)
+
 engine = create_engine(
     DATABASE_URL,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
     pool_pre_ping=True,           # Evita conexões mortas
     pool_recycle=600,            # Recicla após 30 minutos
     connect_args={
@@ -72,16 +77,17 @@ engine = create_engine(
 )
 
 
-# Teste imediato da conexão — essencial para produção
-try:
-    with engine.connect() as conn:
-        logger.info("Conexão com banco do serviço_certificados estabelecida com sucesso.")
-except OperationalError as e:
-    logger.error(
-        "Falha ao conectar ao banco do serviço_certificados",
-        extra={"error": str(e)}
-    )
-    raise e
+# Teste imediato da conexão (desligado no perfil de produção: DB_TESTAR_CONEXAO=0)
+if TESTAR_CONEXAO:
+    try:
+        with engine.connect() as conn:
+            logger.info("Conexão com banco do serviço_certificados estabelecida com sucesso.")
+    except OperationalError as e:
+        logger.error(
+            "Falha ao conectar ao banco do serviço_certificados",
+            extra={"error": str(e)}
+        )
+        raise e
 
 
 # ============================================================
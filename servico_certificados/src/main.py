@@ -1,21 +1,45 @@
 # servico_certificados/src/main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from servico_comum.logger import configure_logger
 from servico_comum.middleware import RequestIDMiddleware
+from servico_comum.idempotency import IdempotenciaMiddleware
 from servico_comum.exceptions import ServiceError, service_error_handler
 
+from database import engine
 from routers import certificados
+from services.renderizador import renderizador
+from services.prerender import prerender, PRERENDER_ATIVO
 
 # Configuração
 logger = configure_logger("servico_certificados")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pool de renderização de PDFs vive junto com o processo do serviço
+    renderizador.iniciar()
+    if PRERENDER_ATIVO:
+        await prerender.iniciar()
+    yield
+    await prerender.encerrar()
+    renderizador.encerrar()
+    engine.dispose()
+
 app = FastAPI(
     title="Serviço de Certificados",
     description="Motor de geração e validação de documentos digitais",
     version="1.0.0",
+    lifespan=lifespan,
+)
+
+# POSTs que honram o cabeçalho Idempotency-Key (retries do serviço de eventos)
+ROTAS_IDEMPOTENTES = (
+    "/interno/certificados/emitir_automatico",
+    "/interno/certificados/emitir_lote",
 )
 
 # Middlewares Corporativos
+app.add_middleware(IdempotenciaMiddleware, rotas=ROTAS_IDEMPOTENTES)
 app.add_middleware(RequestIDMiddleware)
 app.add_exception_handler(ServiceError, service_error_handler)
 app.add_exception_handler(Exception, service_error_handler)
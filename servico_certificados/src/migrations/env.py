@@ -0,0 +1,19 @@
+# servico_certificados/src/migrations/env.py
+
+"""
+Ambiente do Alembic. Usa a mesma URL do serviço (database.DATABASE_URL)
+e o metadata dos models para `alembic revision --autogenerate`.
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+
+from database import DATABASE_URL
+import models
+from servico_comum.migracoes import executar_migracoes
+
+if context.config.config_file_name is not None:
+    fileConfig(context.config.config_file_name)
+
+executar_migracoes(DATABASE_URL, models.Base.metadata, "certificados")
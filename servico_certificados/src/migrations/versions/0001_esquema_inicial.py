@@ -0,0 +1,47 @@
+"""Esquema inicial do serviço de certificados
+
+Cria certificados_metadata se ainda não existir. Em bancos antigos a
+tabela é anterior às colunas inscricao_id/evento_id: elas são
+acrescentadas aqui (o preenchimento fica na 0002).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from servico_comum.migracoes import tabelas_existentes
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if "certificados_metadata" in tabelas_existentes():
+        op.execute("ALTER TABLE certificados_metadata ADD COLUMN IF NOT EXISTS inscricao_id INTEGER")
+        op.execute("ALTER TABLE certificados_metadata ADD COLUMN IF NOT EXISTS evento_id INTEGER")
+        return
+
+    op.create_table(
+        "certificados_metadata",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("codigo_unico", sa.String(64), nullable=False),
+        sa.Column("inscricao_id", sa.Integer),
+        sa.Column("evento_id", sa.Integer),
+        sa.Column("participante_nome", sa.String(200), nullable=False),
+        sa.Column("evento_nome", sa.String(200), nullable=False),
+        sa.Column("evento_data", sa.String(50), nullable=False),
+        sa.Column("template_nome", sa.String(50), nullable=False),
+        sa.Column("dados_extras", sa.JSON),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()")),
+    )
+    op.create_index("ix_certificados_metadata_id", "certificados_metadata", ["id"])
+    op.create_index("ix_certificados_metadata_codigo_unico", "certificados_metadata", ["codigo_unico"], unique=True)
+
+
+def downgrade():
+    op.drop_table("certificados_metadata")
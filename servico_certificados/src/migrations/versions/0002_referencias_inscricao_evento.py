@@ -0,0 +1,66 @@
+"""Preenche inscricao_id/evento_id e indexa (CONCURRENTLY)
+
+Certificados emitidos antes das colunas só têm os ids dentro de
+dados_extras (o payload da emissão). Eles são copiados em lotes curtos,
+cada um na sua transação, para não segurar locks na tabela inteira; a
+idempotência da emissão e a exportação por evento dependem deles.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+import os
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from servico_comum.migracoes import criar_indice_concorrente, remover_indice_concorrente
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+LOTE = int(os.getenv("MIGRACAO_LOTE", "5000"))
+
+_NUMERO = "'^[0-9]+$'"
+_PENDENTES = f"""
+    (inscricao_id IS NULL AND dados_extras->>'inscricao_id' ~ {_NUMERO})
+    OR (evento_id IS NULL AND dados_extras->>'evento_id' ~ {_NUMERO})
+"""
+_PREENCHER = f"""
+    UPDATE certificados_metadata SET
+        inscricao_id = coalesce(inscricao_id, CASE WHEN dados_extras->>'inscricao_id' ~ {_NUMERO}
+                                              THEN (dados_extras->>'inscricao_id')::integer END),
+        evento_id = coalesce(evento_id, CASE WHEN dados_extras->>'evento_id' ~ {_NUMERO}
+                                        THEN (dados_extras->>'evento_id')::integer END)
+"""
+
+INDICES = [
+    # Idempotência da emissão por inscrição
+    ("ix_certificados_metadata_inscricao_id", ["inscricao_id"]),
+    # Exportação (ZIP) por evento
+    ("ix_certificados_metadata_evento_id", ["evento_id"]),
+]
+
+
+def upgrade():
+    if context.is_offline_mode():
+        op.execute(f"{_PREENCHER} WHERE {_PENDENTES}")
+    else:
+        with op.get_context().autocommit_block():
+            lote = sa.text(f"""
+                {_PREENCHER}
+                WHERE id IN (SELECT id FROM certificados_metadata WHERE {_PENDENTES} LIMIT :lote)
+            """)
+            while op.get_bind().execute(lote, {"lote": LOTE}).rowcount:
+                pass
+
+    for nome, colunas in INDICES:
+        criar_indice_concorrente(nome, "certificados_metadata", colunas)
+
+
+def downgrade():
+    for nome, _ in INDICES:
+        remover_indice_concorrente(nome, "certificados_metadata")
@@ -0,0 +1,52 @@
+"""Um certificado por inscrição (índice único em inscricao_id)
+
+Emissões concorrentes para a mesma inscrição (outbox, reconciliador,
+sync offline, vários workers) podiam gravar dois códigos. Antes do índice
+único as duplicatas são removidas: fica o código que o serviço de eventos
+registrou (tabela certificados, mesmo banco), ou o mais antigo.
+
+Se uma emissão antiga gravar uma duplicata entre a limpeza e o build, o
+índice fica INVALID e a migração falha; rodar de novo limpa e recria.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+from servico_comum.migracoes import criar_indice_concorrente, remover_indice_concorrente, tabelas_existentes
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    referenciado = "false"
+    if "certificados" in tabelas_existentes():
+        referenciado = "EXISTS (SELECT 1 FROM certificados e WHERE e.codigo_unico = m.codigo_unico)"
+
+    op.execute(f"""
+        DELETE FROM certificados_metadata WHERE id IN (
+            SELECT id FROM (
+                SELECT m.id, row_number() OVER (
+                    PARTITION BY m.inscricao_id ORDER BY {referenciado} DESC, m.id
+                ) AS ordem
+                FROM certificados_metadata m
+                WHERE m.inscricao_id IS NOT NULL
+            ) ranqueados
+            WHERE ordem > 1
+        )
+    """)
+
+    criar_indice_concorrente(
+        "uq_certificados_metadata_inscricao_id", "certificados_metadata", ["inscricao_id"], unique=True,
+    )
+    remover_indice_concorrente("ix_certificados_metadata_inscricao_id", "certificados_metadata")
+
+
+def downgrade():
+    criar_indice_concorrente("ix_certificados_metadata_inscricao_id", "certificados_metadata", ["inscricao_id"])
+    remover_indice_concorrente("uq_certificados_metadata_inscricao_id", "certificados_metadata")
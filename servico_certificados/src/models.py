@@ -1,13 +1,21 @@
 # servico_certificados/src/models.py
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
 from sqlalchemy.sql import func
 from database import Base
 
 class CertificadoMetadata(Base):
     __tablename__ = "certificados_metadata"
+    __table_args__ = (
+        # Um certificado por inscrição: emissões concorrentes caem no ON CONFLICT
+        Index("uq_certificados_metadata_inscricao_id", "inscricao_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     codigo_unico = Column(String(64), unique=True, index=True, nullable=False)
+
+    # Referências ao serviço de eventos (idempotência por inscrição)
+    inscricao_id = Column(Integer, nullable=True)
+    evento_id = Column(Integer, index=True, nullable=True)
     
     participante_nome = Column(String(200), nullable=False)
     evento_nome = Column(String(200), nullable=False)
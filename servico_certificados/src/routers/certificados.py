@@ -1,17 +1,87 @@
-from fastapi import APIRouter, Depends, status, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Request, status, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from datetime import datetime
+from typing import Optional
 
 import models
 import schemas
 from database import get_db
-from services.gerador import PDFGeneratorService
+from security import get_current_admin_user, User
+from services.gerador import PDFGeneratorService, dados_renderizacao
+from services.pdf_cache import pdf_cache
+from services.renderizador import renderizador, RenderizacaoSaturada, RenderizacaoExpirada
+from services.prerender import prerender
+from services.exportacao import contar_certificados_evento, stream_zip_evento
 from servico_comum.logger import configure_logger
 
 router = APIRouter(tags=["Certificados"])
 logger = configure_logger("router_certificados")
 
+def _montar_resposta(codigo: str) -> dict:
+    return {
+        "codigo_unico": codigo,
+        # URL pública que o Nginx vai rotear
+        "url_download": f"http://177.44.248.76/certificados/download/{codigo}",
+        "status": "emitido",
+        "data_emissao": datetime.utcnow()
+    }
+
+def _novo_metadata(payload: schemas.CertificadoRequest, codigo: str) -> dict:
+    return {
+        "codigo_unico": codigo,
+        "inscricao_id": payload.inscricao_id,
+        "evento_id": payload.evento_id,
+        "participante_nome": payload.usuario_nome,
+        "evento_nome": payload.evento_nome,
+        "evento_data": payload.evento_data,
+        "template_nome": payload.template_certificado,
+        "dados_extras": payload.model_dump()
+    }
+
+def _codigos_existentes(db: Session, inscricao_ids) -> dict:
+    """Mapeia inscricao_id -> codigo_unico já emitido."""
+    rows = (
+        db.query(models.CertificadoMetadata.inscricao_id, models.CertificadoMetadata.codigo_unico)
+        .filter(models.CertificadoMetadata.inscricao_id.in_(inscricao_ids))
+        .all()
+    )
+    return dict(rows)
+
+def _emitir(db: Session, itens) -> dict:
+    """
+    Grava os certificados com INSERT ... ON CONFLICT (inscricao_id) DO NOTHING
+    (índice único): chamadas concorrentes para a mesma inscrição (outbox,
+    reconciliador, sync, vários workers) ficam com um único código.
+    Quem já existia tem o código relido depois do INSERT.
+    Retorna {inscricao_id: codigo_unico}.
+    """
+    novos = {}
+    for item in itens:
+        # Primeira ocorrência no lote vence
+        if item.inscricao_id not in novos:
+            novos[item.inscricao_id] = _novo_metadata(item, PDFGeneratorService.gerar_hash(item.model_dump()))
+
+    M = models.CertificadoMetadata
+    codigos = dict(db.execute(
+        insert(M)
+        .values(list(novos.values()))
+        .on_conflict_do_nothing(index_elements=[M.inscricao_id])
+        .returning(M.inscricao_id, M.codigo_unico)
+    ).all())
+    db.commit()
+
+    if codigos:
+        prerender.notificar()
+        logger.info("certificados_emitidos", extra={"novos": len(codigos), "total": len(novos)})
+    existentes = [i for i in novos if i not in codigos]
+    if existentes:
+        codigos.update(_codigos_existentes(db, existentes))
+    return codigos
+
 @router.post(
     "/interno/certificados/emitir_automatico", 
     response_model=schemas.CertificadoResponse,
@@ -23,52 +93,133 @@ def emitir_certificado_interno(
 ):
     """
     Gera o hash, salva os metadados e devolve a URL de download.
+    Idempotente por inscricao_id: uma inscrição já atendida devolve o código original.
     """
-    # 1. Gera Hash
-    codigo = PDFGeneratorService.gerar_hash(payload.model_dump())
-    
-    # 2. Verifica se já existe (Idempotência)
-    existente = db.query(models.CertificadoMetadata).filter_by(codigo_unico=codigo).first()
-    if not existente:
-        # 3. Salva Metadados para geração futura
-        novo_cert = models.CertificadoMetadata(
-            codigo_unico=codigo,
-            participante_nome=payload.usuario_nome,
-            evento_nome=payload.evento_nome,
-            evento_data=payload.evento_data,
-            template_nome=payload.template_certificado,
-            dados_extras=payload.model_dump()
-        )
-        db.add(novo_cert)
-        db.commit()
-    
+    codigos = _emitir(db, [payload])
+    return _montar_resposta(codigos[payload.inscricao_id])
+
+@router.post(
+    "/interno/certificados/emitir_lote",
+    response_model=schemas.CertificadoLoteResponse,
+    status_code=status.HTTP_201_CREATED
+)
+def emitir_certificados_lote(
+    payload: schemas.CertificadoLoteRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Emite vários certificados em uma única transação.
+    Idempotente por inscricao_id: inscrições já atendidas devolvem o código original.
+    Os códigos retornam na mesma ordem do lote recebido.
+    """
+    codigos = _emitir(db, payload.certificados)
+
     return {
-        "codigo_unico": codigo,
-        # URL pública que o Nginx vai rotear
-        "url_download": f"http://177.44.248.76/certificados/download/{codigo}",
-        "status": "emitido",
-        "data_emissao": datetime.utcnow()
+        "certificados": [
+            _montar_resposta(codigos[item.inscricao_id]) for item in payload.certificados
+        ]
     }
 
+def _etag_confere(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidatos = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidatos or etag in candidatos or f"W/{etag}" in candidatos
+
 @router.get("/certificados/download/{codigo}")
-def download_certificado(codigo: str, db: Session = Depends(get_db)):
+async def download_certificado(codigo: str, request: Request, db: Session = Depends(get_db)):
     """
-    Gera o binário do PDF sob demanda.
+    Entrega o PDF do certificado.
+    Ordem: 304 (ETag) -> cache em memória -> arquivo em disco -> renderização.
     """
-    cert_data = db.query(models.CertificadoMetadata).filter_by(codigo_unico=codigo).first()
+    cert_data = await run_in_threadpool(
+        lambda: db.query(models.CertificadoMetadata).filter_by(codigo_unico=codigo).first()
+    )
     
     if not cert_data:
         raise HTTPException(status_code=404, detail="Certificado não encontrado")
 
-    # Gera o PDF em memória
-    pdf_buffer = PDFGeneratorService.gerar_pdf_bytes(cert_data)
-    
-    # Retorna como stream de arquivo
-    filename = f"certificado_{codigo}.pdf"
+    chave = pdf_cache.chave(codigo, cert_data.template_nome)
+    etag = f'"{chave}"'
+    headers = {
+        "Content-Disposition": f"attachment; filename=certificado_{codigo}.pdf",
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+    }
+
+    if _etag_confere(request.headers.get("if-none-match"), etag):
+        pdf_cache.registrar_nao_modificado()
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    conteudo = pdf_cache.obter_memoria(chave)
+    if conteudo is not None:
+        return Response(conteudo, media_type="application/pdf", headers=headers)
+
+    caminho = pdf_cache.obter_disco(chave)
+    if caminho is not None:
+        # FileResponse envia o arquivo direto do disco, sem materializar em memória
+        return FileResponse(caminho, media_type="application/pdf", headers=headers)
+
+    # Miss: renderiza no pool de workers e persiste nos dois níveis
+    pdf_cache.registrar_miss()
+    try:
+        conteudo = await renderizador.renderizar(dados_renderizacao(cert_data))
+    except RenderizacaoSaturada as e:
+        logger.warning("renderizacao_saturada", extra={"codigo": codigo})
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Serviço de certificados ocupado. Tente novamente em instantes.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except RenderizacaoExpirada as e:
+        logger.warning("renderizacao_expirada", extra={"codigo": codigo})
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="A geração do certificado demorou demais. Tente novamente em instantes.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    await run_in_threadpool(pdf_cache.salvar, chave, conteudo)
+    return Response(conteudo, media_type="application/pdf", headers=headers)
+
+@router.get("/interno/certificados/cache")
+def estatisticas_cache_pdf():
+    """Métricas do cache de PDFs (hit ratio por nível)."""
+    return pdf_cache.estatisticas()
+
+@router.get("/interno/certificados/render")
+def estatisticas_renderizacao():
+    """Métricas do pool de renderização (fila, rejeições e tempos)."""
+    return renderizador.estatisticas()
+
+@router.get("/interno/certificados/prerender/status")
+def status_prerender(db: Session = Depends(get_db)):
+    """Profundidade da fila e atraso do worker de pré-renderização."""
+    status_worker = prerender.status()
+    status_worker["aguardando_coleta"] = (
+        db.query(func.count(models.CertificadoMetadata.id))
+        .filter(models.CertificadoMetadata.id > (prerender.ultimo_id or 0))
+        .scalar()
+    )
+    return status_worker
+
+@router.get("/admin/certificados/eventos/{evento_id}/zip", tags=["Admin"])
+async def exportar_certificados_evento(
+    evento_id: int,
+    admin: User = Depends(get_current_admin_user)
+):
+    """
+    Baixa todos os certificados de um evento em um único ZIP.
+    O arquivo é montado em streaming: cada PDF entra no ZIP assim que fica pronto.
+    """
+    total = await run_in_threadpool(contar_certificados_evento, evento_id)
+    if not total:
+        raise HTTPException(status_code=404, detail="Nenhum certificado emitido para este evento")
+
+    logger.info("exportacao_zip_iniciada", extra={"evento_id": evento_id, "total": total, "admin": admin.username})
     return StreamingResponse(
-        pdf_buffer, 
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+        stream_zip_evento(evento_id),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=certificados_evento_{evento_id}.zip"}
     )
 
 @router.get("/certificados/validar/{codigo}")
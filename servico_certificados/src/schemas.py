@@ -1,7 +1,11 @@
 # servico_certificados/src/schemas.py
-from pydantic import BaseModel, EmailStr
+import os
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+
+# Tamanho máximo aceito por /interno/certificados/emitir_lote
+LOTE_MAXIMO = int(os.getenv("CERT_LOTE_MAXIMO", "500"))
 
 class CertificadoRequest(BaseModel):
     """Payload recebido do Servico de Eventos"""
@@ -17,4 +21,12 @@ class CertificadoRequest(BaseModel):
 class CertificadoResponse(BaseModel):
     codigo_unico: str
     url_download: str
-    status: str
\ No newline at end of file
+    status: str
+
+class CertificadoLoteRequest(BaseModel):
+    """Lote de emissões enviado pelo Servico de Eventos"""
+    certificados: List[CertificadoRequest] = Field(..., min_length=1, max_length=LOTE_MAXIMO)
+
+class CertificadoLoteResponse(BaseModel):
+    """Códigos emitidos, na mesma ordem do lote recebido"""
+    certificados: List[CertificadoResponse]
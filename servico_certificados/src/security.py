@@ -4,12 +4,12 @@
 Módulo de segurança profissional para o serviço de certificados.
 """
 
-import httpx
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel, EmailStr
 from typing import Optional
 
+from servico_comum.auth import decode_token
 from servico_comum.logger import configure_logger
 
 
@@ -24,7 +24,6 @@ logger = configure_logger("servico_certificados.security")
 #  CONFIGURAÇÃO
 # ============================================================
 
-USER_SERVICE_URL = "http://servico_usuarios:8000/usuarios/me"
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth")
 
 
@@ -46,7 +45,8 @@ class User(BaseModel):
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     """
-    Valida o token JWT chamando o serviço de usuários.
+    Valida o token JWT localmente (servico_comum.auth), sem chamar o
+    serviço de usuários a cada requisição.
     """
     if not token:
         raise HTTPException(
@@ -54,36 +54,27 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
             detail="Token não informado."
         )
 
-    headers = {"Authorization": f"Bearer {token}"}
-
     try:
-        async with httpx.AsyncClient(timeout=3) as client:
-            response = await client.get(USER_SERVICE_URL, headers=headers)
-
-            if response.status_code == 401:
-                logger.warning("token_invalid_or_expired")
-                raise HTTPException(
-                    status_code=401,
-                    detail="Token inválido ou expirado."
-                )
-
-            response.raise_for_status()
-            user = User(**response.json())
-            return user
-
-    except httpx.TimeoutException:
-        logger.error("usuario_service_timeout")
+        payload = decode_token(token)
+    except HTTPException:
+        logger.warning("token_invalid_or_expired")
         raise HTTPException(
-            status_code=503,
-            detail="Serviço de usuários indisponível (timeout)."
+            status_code=401,
+            detail="Token inválido ou expirado."
         )
 
-    except httpx.RequestError as e:
-        logger.error("usuario_service_connection_error", extra={"error": str(e)})
-        raise HTTPException(
-            status_code=503,
-            detail="Falha ao conectar ao serviço de usuários."
-        )
+    user_id = payload.get("user_id")
+    username = payload.get("sub")
+    if not username or not user_id:
+        raise HTTPException(status_code=401, detail="Token malformado.")
+
+    return User(
+        id=user_id,
+        username=username,
+        email=payload.get("email"),
+        full_name=payload.get("full_name"),
+        is_admin="admin" in (payload.get("roles") or []),
+    )
 
 
 # ============================================================
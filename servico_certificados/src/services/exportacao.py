@@ -0,0 +1,145 @@
+# servico_certificados/src/services/exportacao.py
+
+"""
+Exportação em lote dos certificados de um evento como um ZIP em streaming.
+
+Os PDFs são obtidos do cache (ou renderizados no pool) em paralelo, com
+concorrência limitada, e cada entrada é escrita no ZIP assim que fica pronta.
+Só os PDFs em andamento ficam em memória; o arquivo completo nunca é montado.
+"""
+
+import asyncio
+import io
+import os
+import re
+import unicodedata
+import zipfile
+from typing import AsyncIterator, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+import models
+from database import SessionLocal
+from servico_comum.logger import configure_logger
+from services.gerador import dados_renderizacao
+from services.pdf_cache import pdf_cache
+from services.renderizador import renderizador, RenderizacaoSaturada
+
+logger = configure_logger("servico_certificados.exportacao")
+
+EXPORT_CONCORRENCIA = int(os.getenv("EXPORT_CONCORRENCIA", "4"))
+EXPORT_PAGINA_DB = int(os.getenv("EXPORT_PAGINA_DB", "500"))
+
+
+class _SaidaZip(io.RawIOBase):
+    """Destino não-posicionável do ZipFile: acumula bytes até serem drenados."""
+
+    def __init__(self):
+        self._partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._partes.append(bytes(b))
+        return len(b)
+
+    def drenar(self) -> bytes:
+        dados = b"".join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+def _nome_arquivo(dados: dict) -> str:
+    ascii_nome = unicodedata.normalize("NFKD", dados["participante_nome"]).encode("ascii", "ignore").decode()
+    nome = re.sub(r"[^A-Za-z0-9_-]+", "_", ascii_nome).strip("_") or "participante"
+    return f"{nome}_{dados['codigo_unico']}.pdf"
+
+
+def contar_certificados_evento(evento_id: int) -> int:
+    with SessionLocal() as db:
+        return db.query(models.CertificadoMetadata).filter_by(evento_id=evento_id).count()
+
+
+def _pagina_metadados(evento_id: int, apos_id: int):
+    with SessionLocal() as db:
+        return (
+            db.query(models.CertificadoMetadata)
+            .filter(
+                models.CertificadoMetadata.evento_id == evento_id,
+                models.CertificadoMetadata.id > apos_id,
+            )
+            .order_by(models.CertificadoMetadata.id)
+            .limit(EXPORT_PAGINA_DB)
+            .all()
+        )
+
+
+async def _metadados_evento(evento_id: int):
+    """Percorre os certificados do evento em páginas (keyset por id)."""
+    apos_id = 0
+    while True:
+        pagina = await run_in_threadpool(_pagina_metadados, evento_id, apos_id)
+        for cert in pagina:
+            yield dados_renderizacao(cert)
+        if len(pagina) < EXPORT_PAGINA_DB:
+            return
+        apos_id = pagina[-1].id
+
+
+async def _obter_pdf(dados: dict) -> Tuple[str, bytes]:
+    chave = pdf_cache.chave(dados["codigo_unico"], dados["template_nome"])
+
+    conteudo: Optional[bytes] = pdf_cache.obter_memoria(chave)
+    if conteudo is None:
+        caminho = pdf_cache.obter_disco(chave)
+        if caminho is not None:
+            conteudo = await run_in_threadpool(caminho.read_bytes)
+
+    if conteudo is None:
+        pdf_cache.registrar_miss()
+        while True:
+            try:
+                conteudo = await renderizador.renderizar(dados)
+                break
+            except RenderizacaoSaturada as e:
+                # Exportação cede espaço aos downloads individuais
+                await asyncio.sleep(e.retry_after)
+        await run_in_threadpool(pdf_cache.salvar, chave, conteudo)
+
+    return _nome_arquivo(dados), conteudo
+
+
+async def _pdfs_evento(evento_id: int):
+    """Entrega (nome, bytes) na ordem em que as renderizações terminam."""
+    pendentes = set()
+    try:
+        async for dados in _metadados_evento(evento_id):
+            if len(pendentes) >= EXPORT_CONCORRENCIA:
+                prontos, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+                for tarefa in prontos:
+                    yield tarefa.result()
+            pendentes.add(asyncio.create_task(_obter_pdf(dados)))
+
+        while pendentes:
+            prontos, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+            for tarefa in prontos:
+                yield tarefa.result()
+    finally:
+        # Cliente desconectou ou houve erro: não deixa renderizações órfãs
+        for tarefa in pendentes:
+            tarefa.cancel()
+
+
+async def stream_zip_evento(evento_id: int) -> AsyncIterator[bytes]:
+    saida = _SaidaZip()
+    total = 0
+    # PDFs já são comprimidos: ZIP_STORED evita gastar CPU à toa
+    with zipfile.ZipFile(saida, "w", compression=zipfile.ZIP_STORED) as zf:
+        async for nome, conteudo in _pdfs_evento(evento_id):
+            zf.writestr(nome, conteudo)
+            total += 1
+            yield saida.drenar()
+    # Diretório central, escrito no close()
+    yield saida.drenar()
+    logger.info("exportacao_zip_concluida", extra={"evento_id": evento_id, "arquivos": total})
@@ -1,14 +1,31 @@
 import io
+import time
 import uuid
 import hashlib
 import os
 import qrcode
 from datetime import datetime
+from functools import lru_cache
+from types import SimpleNamespace
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import landscape, A4
 from reportlab.lib.units import cm
 from reportlab.lib import colors
-from reportlab.lib.utils import ImageReader
+
+# Incrementar sempre que o layout dos templates mudar (invalida o cache de PDFs)
+LAYOUT_VERSAO = "2"
+
+# Quantidade de QR Codes distintos mantidos em memória (LRU)
+QR_CACHE_TAMANHO = int(os.getenv("QR_CACHE_TAMANHO", "1024"))
+
+def frontend_base_url() -> str:
+    """URL do portal usada no rodapé de validação."""
+    base_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
+    if base_url.endswith("/"):
+        base_url = base_url[:-1]
+    return base_url
+
+PAGINA = landscape(A4)
 
 class PDFGeneratorService:
     
@@ -20,172 +37,238 @@ class PDFGeneratorService:
     @staticmethod
     def gerar_pdf_bytes(cert_data) -> io.BytesIO:
         buffer = io.BytesIO()
-        c = canvas.Canvas(buffer, pagesize=landscape(A4))
-        width, height = landscape(A4)
-        
-        # Seleciona o desenhista com base no template
-        template = cert_data.template_nome.lower()
+        c = canvas.Canvas(buffer, pagesize=PAGINA)
+        width, height = PAGINA
         
-        if template == 'tech':
-            _draw_tech_style(c, width, height, cert_data)
-        elif template == 'saude':
-            _draw_health_style(c, width, height, cert_data)
-        elif template == 'educacao':
-            _draw_education_style(c, width, height, cert_data)
-        else:
-            _draw_default_style(c, width, height, cert_data)
+        # Seleciona o template registrado (fallback: default)
+        obter_template(cert_data.template_nome).desenhar(c, width, height, cert_data)
 
         c.showPage()
         c.save()
         buffer.seek(0)
         return buffer
 
+def dados_renderizacao(cert_data) -> dict:
+    """Extrai de um CertificadoMetadata apenas o necessário para o PDF (serializável)."""
+    return {
+        "codigo_unico": cert_data.codigo_unico,
+        "participante_nome": cert_data.participante_nome,
+        "evento_nome": cert_data.evento_nome,
+        "evento_data": cert_data.evento_data,
+        "template_nome": cert_data.template_nome,
+    }
+
+def renderizar_pdf(dados: dict):
+    """
+    Ponto de entrada dos workers de renderização (precisa ser picklable).
+    Retorna (bytes do PDF, segundos gastos na renderização).
+    """
+    inicio = time.perf_counter()
+    conteudo = PDFGeneratorService.gerar_pdf_bytes(SimpleNamespace(**dados)).getvalue()
+    return conteudo, time.perf_counter() - inicio
+
+# --- REGISTRO DE TEMPLATES ---
+
+class TemplateCertificado:
+    """
+    Template em duas camadas:
+    - desenhar_fundo: elementos estáticos (bordas, formas, fundos), compilados
+      uma única vez em um fluxo de operadores PDF reutilizável;
+    - desenhar_conteudo: textos variáveis e QR Code, desenhados a cada certificado.
+    """
+
+    def __init__(self):
+        self._fundo_compilado = None
+
+    def desenhar_fundo(self, c, w, h):
+        pass
+
+    def desenhar_conteudo(self, c, w, h, data):
+        raise NotImplementedError
+
+    def fundo_compilado(self) -> str:
+        if self._fundo_compilado is None:
+            w, h = PAGINA
+            rascunho = canvas.Canvas(io.BytesIO(), pagesize=PAGINA)
+            self.desenhar_fundo(rascunho, w, h)
+            # q/Q isola o estado gráfico: a camada variável parte do estado padrão
+            self._fundo_compilado = "\n".join(["q", *rascunho._code, "Q"])
+        return self._fundo_compilado
+
+    def desenhar(self, c, w, h, data):
+        c.addLiteral(self.fundo_compilado())
+        self.desenhar_conteudo(c, w, h, data)
+
+
+TEMPLATES = {}
+
+def registrar_template(nome: str):
+    """Decorator: registra um template pelo nome usado em template_certificado."""
+    def decorator(cls):
+        TEMPLATES[nome] = cls()
+        return cls
+    return decorator
+
+def obter_template(nome: str) -> TemplateCertificado:
+    return TEMPLATES.get((nome or "default").lower(), TEMPLATES["default"])
+
+def compilar_templates():
+    """Pré-compila a camada estática de todos os templates (chamado na inicialização)."""
+    for template in TEMPLATES.values():
+        template.fundo_compilado()
+
 # --- ESTILOS VISUAIS ---
 
-def _draw_default_style(c, w, h, data):
+@registrar_template("default")
+class TemplateDefault(TemplateCertificado):
     """Estilo Clássico / Corporativo"""
-    # Borda Azul
-    c.setStrokeColor(colors.darkblue)
-    c.setLineWidth(5)
-    c.rect(1*cm, 1*cm, w-2*cm, h-2*cm)
-    
-    # Textos
-    c.setFont("Helvetica-Bold", 36)
-    c.drawCentredString(w/2, h - 5*cm, "CERTIFICADO DE PARTICIPAÇÃO")
-    
-    c.setFont("Helvetica", 18)
-    c.drawCentredString(w/2, h - 8*cm, "Certificamos que")
-    
-    c.setFont("Helvetica-Bold", 28)
-    c.setFillColor(colors.darkblue)
-    c.drawCentredString(w/2, h - 10*cm, data.participante_nome)
-    
-    c.setFont("Helvetica", 18)
-    c.setFillColor(colors.black)
-    c.drawCentredString(w/2, h - 12*cm, f"participou do evento {data.evento_nome}")
-    c.drawCentredString(w/2, h - 13.5*cm, f"realizado em {data.evento_data}")
 
-    _draw_validation_footer(c, w, 2*cm, data.codigo_unico, colors.gray)
+    def desenhar_fundo(self, c, w, h):
+        # Borda Azul
+        c.setStrokeColor(colors.darkblue)
+        c.setLineWidth(5)
+        c.rect(1*cm, 1*cm, w-2*cm, h-2*cm)
+
+    def desenhar_conteudo(self, c, w, h, data):
+        c.setFont("Helvetica-Bold", 36)
+        c.drawCentredString(w/2, h - 5*cm, "CERTIFICADO DE PARTICIPAÇÃO")
+        
+        c.setFont("Helvetica", 18)
+        c.drawCentredString(w/2, h - 8*cm, "Certificamos que")
+        
+        c.setFont("Helvetica-Bold", 28)
+        c.setFillColor(colors.darkblue)
+        c.drawCentredString(w/2, h - 10*cm, data.participante_nome)
+        
+        c.setFont("Helvetica", 18)
+        c.setFillColor(colors.black)
+        c.drawCentredString(w/2, h - 12*cm, f"participou do evento {data.evento_nome}")
+        c.drawCentredString(w/2, h - 13.5*cm, f"realizado em {data.evento_data}")
+
+        _draw_validation_footer(c, w, 2*cm, data.codigo_unico, colors.gray)
 
-def _draw_tech_style(c, w, h, data):
+@registrar_template("tech")
+class TemplateTech(TemplateCertificado):
     """Estilo Tecnologia (Dark/Neon)"""
-    # Fundo Escuro (Simulado com retangulo)
-    c.setFillColorRGB(0.1, 0.1, 0.15) # Azul muito escuro
-    c.rect(0, 0, w, h, fill=1)
-    
-    # Elementos Geométricos (Matrix style)
-    c.setStrokeColor(colors.lawngreen)
-    c.setLineWidth(2)
-    c.line(2*cm, h-2*cm, 5*cm, h-2*cm) # Top Left
-    c.line(2*cm, h-2*cm, 2*cm, h-5*cm)
-    
-    c.line(w-2*cm, 2*cm, w-5*cm, 2*cm) # Bottom Right
-    c.line(w-2*cm, 2*cm, w-2*cm, 5*cm)
 
-    # Textos
-    c.setFillColor(colors.white)
-    c.setFont("Courier-Bold", 40)
-    c.drawCentredString(w/2, h - 5*cm, "< CERTIFICADO_DE_PARTICIPACAO />")
-    
-    c.setFont("Courier", 20)
-    c.drawCentredString(w/2, h - 8*cm, "user.certified = True")
-    
-    c.setFillColor(colors.lawngreen) # Verde Neon
-    c.setFont("Courier-Bold", 32)
-    c.drawCentredString(w/2, h - 10*cm, data.participante_nome.upper())
-    
-    c.setFillColor(colors.white)
-    c.setFont("Courier", 16)
-    c.drawCentredString(w/2, h - 13*cm, f"Event: {data.evento_nome}")
-    c.drawCentredString(w/2, h - 14*cm, f"Date: {data.evento_data}")
-    
-    _draw_validation_footer(c, w, 2*cm, data.codigo_unico, colors.lightgrey, font="Courier")
+    def desenhar_fundo(self, c, w, h):
+        # Fundo Escuro (Simulado com retangulo)
+        c.setFillColorRGB(0.1, 0.1, 0.15) # Azul muito escuro
+        c.rect(0, 0, w, h, fill=1)
+        
+        # Elementos Geométricos (Matrix style)
+        c.setStrokeColor(colors.lawngreen)
+        c.setLineWidth(2)
+        c.line(2*cm, h-2*cm, 5*cm, h-2*cm) # Top Left
+        c.line(2*cm, h-2*cm, 2*cm, h-5*cm)
+        
+        c.line(w-2*cm, 2*cm, w-5*cm, 2*cm) # Bottom Right
+        c.line(w-2*cm, 2*cm, w-2*cm, 5*cm)
+
+    def desenhar_conteudo(self, c, w, h, data):
+        c.setFillColor(colors.white)
+        c.setFont("Courier-Bold", 40)
+        c.drawCentredString(w/2, h - 5*cm, "< CERTIFICADO_DE_PARTICIPACAO />")
+        
+        c.setFont("Courier", 20)
+        c.drawCentredString(w/2, h - 8*cm, "user.certified = True")
+        
+        c.setFillColor(colors.lawngreen) # Verde Neon
+        c.setFont("Courier-Bold", 32)
+        c.drawCentredString(w/2, h - 10*cm, data.participante_nome.upper())
+        
+        c.setFillColor(colors.white)
+        c.setFont("Courier", 16)
+        c.drawCentredString(w/2, h - 13*cm, f"Event: {data.evento_nome}")
+        c.drawCentredString(w/2, h - 14*cm, f"Date: {data.evento_data}")
+        
+        _draw_validation_footer(c, w, 2*cm, data.codigo_unico, colors.lightgrey, font="Courier")
 
-def _draw_health_style(c, w, h, data):
+@registrar_template("saude")
+class TemplateSaude(TemplateCertificado):
     """Estilo Saúde (Clean/Minimalista)"""
-    # Cor Suave (Ciano/Branco)
-    c.setStrokeColor(colors.lightseagreen)
-    c.setLineWidth(10)
-    c.circle(w/2, h/2, h/1.5, stroke=1, fill=0) # Circulo central decorativo
-    
-    # Cruz simbólica sutil no topo
-    c.setFillColor(colors.lightseagreen)
-    c.rect(w/2 - 15, h - 3*cm, 30, 10, fill=1, stroke=0)
-    c.rect(w/2 - 10, h - 3*cm - 10, 10, 30, fill=1, stroke=0)
-
-    c.setFillColor(colors.darkslategray)
-    c.setFont("Helvetica", 32)
-    c.drawCentredString(w/2, h - 5.5*cm, "Certificado de Atualização")
-    
-    c.setFont("Helvetica-Oblique", 18)
-    c.drawCentredString(w/2, h - 8*cm, "Conferido a")
-    
-    c.setFont("Helvetica-Bold", 30)
-    c.setFillColor(colors.lightseagreen)
-    c.drawCentredString(w/2, h - 10*cm, data.participante_nome)
-    
-    c.setFillColor(colors.darkslategray)
-    c.setFont("Helvetica", 16)
-    c.drawCentredString(w/2, h - 12.5*cm, f"Pela participação no evento de saúde e bem-estar:")
-    c.setFont("Helvetica-Bold", 18)
-    c.drawCentredString(w/2, h - 13.5*cm, data.evento_nome)
-    
-    _draw_validation_footer(c, w, 1.5*cm, data.codigo_unico, colors.gray)
 
-def _draw_education_style(c, w, h, data):
+    def desenhar_fundo(self, c, w, h):
+        # Cor Suave (Ciano/Branco)
+        c.setStrokeColor(colors.lightseagreen)
+        c.setLineWidth(10)
+        c.circle(w/2, h/2, h/1.5, stroke=1, fill=0) # Circulo central decorativo
+        
+        # Cruz simbólica sutil no topo
+        c.setFillColor(colors.lightseagreen)
+        c.rect(w/2 - 15, h - 3*cm, 30, 10, fill=1, stroke=0)
+        c.rect(w/2 - 10, h - 3*cm - 10, 10, 30, fill=1, stroke=0)
+
+    def desenhar_conteudo(self, c, w, h, data):
+        c.setFillColor(colors.darkslategray)
+        c.setFont("Helvetica", 32)
+        c.drawCentredString(w/2, h - 5.5*cm, "Certificado de Atualização")
+        
+        c.setFont("Helvetica-Oblique", 18)
+        c.drawCentredString(w/2, h - 8*cm, "Conferido a")
+        
+        c.setFont("Helvetica-Bold", 30)
+        c.setFillColor(colors.lightseagreen)
+        c.drawCentredString(w/2, h - 10*cm, data.participante_nome)
+        
+        c.setFillColor(colors.darkslategray)
+        c.setFont("Helvetica", 16)
+        c.drawCentredString(w/2, h - 12.5*cm, f"Pela participação no evento de saúde e bem-estar:")
+        c.setFont("Helvetica-Bold", 18)
+        c.drawCentredString(w/2, h - 13.5*cm, data.evento_nome)
+        
+        _draw_validation_footer(c, w, 1.5*cm, data.codigo_unico, colors.gray)
+
+@registrar_template("educacao")
+class TemplateEducacao(TemplateCertificado):
     """Estilo Educação (Acadêmico/Pergaminho)"""
-    # Fundo Bege Claro
-    c.setFillColorRGB(0.98, 0.96, 0.90)
-    c.rect(0, 0, w, h, fill=1)
-    
-    # Borda Dupla
-    c.setStrokeColor(colors.maroon)
-    c.setLineWidth(3)
-    c.rect(1.5*cm, 1.5*cm, w-3*cm, h-3*cm)
-    c.setLineWidth(1)
-    c.rect(1.8*cm, 1.8*cm, w-3.6*cm, h-3.6*cm)
 
-    c.setFillColor(colors.black)
-    c.setFont("Times-Roman", 42)
-    c.drawCentredString(w/2, h - 6*cm, "Certificado de Conclusão")
-    
-    c.setFont("Times-Roman", 20)
-    c.drawCentredString(w/2, h - 9*cm, "A instituição certifica que")
-    
-    c.setFont("Times-BoldItalic", 34)
-    c.drawCentredString(w/2, h - 11*cm, data.participante_nome)
-    
-    c.setFont("Times-Roman", 18)
-    c.drawCentredString(w/2, h - 13.5*cm, f"concluiu as atividades do evento {data.evento_nome}")
-    c.drawCentredString(w/2, h - 14.5*cm, f"em {data.evento_data}")
+    def desenhar_fundo(self, c, w, h):
+        # Fundo Bege Claro
+        c.setFillColorRGB(0.98, 0.96, 0.90)
+        c.rect(0, 0, w, h, fill=1)
+        
+        # Borda Dupla
+        c.setStrokeColor(colors.maroon)
+        c.setLineWidth(3)
+        c.rect(1.5*cm, 1.5*cm, w-3*cm, h-3*cm)
+        c.setLineWidth(1)
+        c.rect(1.8*cm, 1.8*cm, w-3.6*cm, h-3.6*cm)
 
-    _draw_validation_footer(c, w, 2.5*cm, data.codigo_unico, colors.maroon, font="Times-Roman")
+    def desenhar_conteudo(self, c, w, h, data):
+        c.setFillColor(colors.black)
+        c.setFont("Times-Roman", 42)
+        c.drawCentredString(w/2, h - 6*cm, "Certificado de Conclusão")
+        
+        c.setFont("Times-Roman", 20)
+        c.drawCentredString(w/2, h - 9*cm, "A instituição certifica que")
+        
+        c.setFont("Times-BoldItalic", 34)
+        c.drawCentredString(w/2, h - 11*cm, data.participante_nome)
+        
+        c.setFont("Times-Roman", 18)
+        c.drawCentredString(w/2, h - 13.5*cm, f"concluiu as atividades do evento {data.evento_nome}")
+        c.drawCentredString(w/2, h - 14.5*cm, f"em {data.evento_data}")
+
+        _draw_validation_footer(c, w, 2.5*cm, data.codigo_unico, colors.maroon, font="Times-Roman")
 
 def _draw_validation_footer(c, w, y, codigo, color, font="Helvetica"):
     """Desenha texto de validação e o QR Code."""
     
     # 1. URL de Validação Direta
     # Aponta para o front-end passando o código como query param
-    base_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
-    if base_url.endswith("/"):
-        base_url = base_url[:-1]
+    base_url = frontend_base_url()
     url_validacao = f"{base_url}/validar?codigo={codigo}"
     
-    # 2. Gerar QR Code em Memória
-    qr_img = qrcode.make(url_validacao)
-    qr_buffer = io.BytesIO()
-    qr_img.save(qr_buffer, format="PNG")
-    qr_buffer.seek(0)
-    
-    # 3. Desenhar QR Code no PDF (Canto Inferior Direito)
+    # 2. Desenhar QR Code vetorial no PDF (Canto Inferior Direito)
     qr_size = 2.5 * cm
     # x = largura - margem - tamanho, y = altura_do_rodape
     qr_x = w - 4 * cm 
     qr_y = y - 0.5 * cm
     
-    c.drawImage(ImageReader(qr_buffer), qr_x, qr_y, width=qr_size, height=qr_size)
+    _draw_qr_code(c, qr_x, qr_y, qr_size, url_validacao)
     
-    # 4. Desenhar Textos
+    # 3. Desenhar Textos
     c.setFont(font, 9)
     c.setFillColor(color)
     
@@ -195,3 +278,45 @@ def _draw_validation_footer(c, w, y, codigo, color, font="Helvetica"):
     c.drawCentredString(text_center, y + 10, f"Código de Autenticidade: {codigo}")
     c.drawCentredString(text_center, y, "Para validar, escaneie o QR Code ao lado")
     c.drawCentredString(text_center, y - 10, f"ou acesse: {base_url}/validar")
+
+@lru_cache(maxsize=QR_CACHE_TAMANHO)
+def _qr_modulos(conteudo: str):
+    """
+    Matriz do QR Code (com zona de silêncio) convertida em faixas horizontais
+    de módulos escuros: (coluna, linha, comprimento). Linha 0 é o topo.
+    """
+    qr = qrcode.QRCode(border=4)
+    qr.add_data(conteudo)
+    qr.make(fit=True)
+    matriz = qr.get_matrix()
+
+    faixas = []
+    for linha, modulos in enumerate(matriz):
+        coluna = 0
+        total = len(modulos)
+        while coluna < total:
+            if not modulos[coluna]:
+                coluna += 1
+                continue
+            inicio = coluna
+            while coluna < total and modulos[coluna]:
+                coluna += 1
+            faixas.append((inicio, linha, coluna - inicio))
+    return len(matriz), tuple(faixas)
+
+def _draw_qr_code(c, x, y, tamanho, conteudo):
+    """Desenha o QR Code como retângulos vetoriais (sem PNG intermediário)."""
+    n_modulos, faixas = _qr_modulos(conteudo)
+    modulo = tamanho / n_modulos
+
+    c.saveState()
+    # Fundo branco garante leitura também nos templates escuros
+    c.setFillColor(colors.white)
+    c.rect(x, y, tamanho, tamanho, stroke=0, fill=1)
+
+    c.setFillColor(colors.black)
+    path = c.beginPath()
+    for coluna, linha, comprimento in faixas:
+        path.rect(x + coluna * modulo, y + tamanho - (linha + 1) * modulo, comprimento * modulo, modulo)
+    c.drawPath(path, stroke=0, fill=1)
+    c.restoreState()
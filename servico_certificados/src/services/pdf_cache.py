@@ -0,0 +1,157 @@
+# servico_certificados/src/services/pdf_cache.py
+
+"""
+Cache de PDFs renderizados.
+
+Dois níveis:
+- Memória: LRU limitado por bytes (respostas mais quentes).
+- Disco: armazenamento endereçado por conteúdo, chaveado por
+  (codigo_unico, template, versão do layout). Os arquivos são imutáveis,
+  então podem ser servidos diretamente com FileResponse.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from servico_comum.logger import configure_logger
+from services.gerador import LAYOUT_VERSAO, frontend_base_url
+
+logger = configure_logger("servico_certificados.pdf_cache")
+
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", "/var/cache/certificados")
+PDF_CACHE_MEMORIA_MB = int(os.getenv("PDF_CACHE_MEMORIA_MB", "64"))
+
+
+class PDFCache:
+
+    def __init__(self, diretorio: Optional[str], memoria_max_bytes: int):
+        self.memoria_max_bytes = memoria_max_bytes
+        self._memoria: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memoria_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits_memoria": 0, "hits_disco": 0, "nao_modificados": 0, "misses": 0}
+        self.diretorio = self._preparar_diretorio(diretorio)
+
+    @staticmethod
+    def _preparar_diretorio(diretorio: Optional[str]) -> Optional[Path]:
+        if not diretorio:
+            return None
+        try:
+            path = Path(diretorio)
+            path.mkdir(parents=True, exist_ok=True)
+            return path
+        except OSError as e:
+            logger.warning("pdf_cache_disco_desativado", extra={"dir": diretorio, "error": str(e)})
+            return None
+
+    # ------------------------------------------------------------
+    #  Chaves
+    # ------------------------------------------------------------
+
+    @staticmethod
+    def chave(codigo: str, template: str) -> str:
+        """Identificador estável do PDF; também usado como ETag."""
+        raw = f"{LAYOUT_VERSAO}:{frontend_base_url()}:{(template or 'default').lower()}:{codigo}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _caminho(self, chave: str) -> Path:
+        # Fan-out em subpastas para não concentrar milhares de arquivos em um diretório
+        return self.diretorio / chave[:2] / f"{chave}.pdf"
+
+    # ------------------------------------------------------------
+    #  Leitura
+    # ------------------------------------------------------------
+
+    def obter_memoria(self, chave: str) -> Optional[bytes]:
+        with self._lock:
+            conteudo = self._memoria.get(chave)
+            if conteudo is not None:
+                self._memoria.move_to_end(chave)
+                self._stats["hits_memoria"] += 1
+            return conteudo
+
+    def obter_disco(self, chave: str) -> Optional[Path]:
+        if self.diretorio is None:
+            return None
+        caminho = self._caminho(chave)
+        if not caminho.is_file():
+            return None
+        with self._lock:
+            self._stats["hits_disco"] += 1
+        return caminho
+
+    def registrar_miss(self):
+        with self._lock:
+            self._stats["misses"] += 1
+
+    def registrar_nao_modificado(self):
+        """Revalidação por If-None-Match respondida com 304 (conta como hit)."""
+        with self._lock:
+            self._stats["nao_modificados"] += 1
+
+    def contem(self, chave: str) -> bool:
+        """Verifica presença sem afetar LRU nem estatísticas."""
+        with self._lock:
+            if chave in self._memoria:
+                return True
+        return self.diretorio is not None and self._caminho(chave).is_file()
+
+    # ------------------------------------------------------------
+    #  Escrita
+    # ------------------------------------------------------------
+
+    def salvar(self, chave: str, conteudo: bytes) -> Optional[Path]:
+        """Grava nos dois níveis. A escrita em disco é atômica (tmp + rename)."""
+        self._guardar_memoria(chave, conteudo)
+
+        if self.diretorio is None:
+            return None
+
+        caminho = self._caminho(chave)
+        try:
+            caminho.parent.mkdir(exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=caminho.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(conteudo)
+            os.replace(tmp, caminho)
+            return caminho
+        except OSError as e:
+            logger.error("pdf_cache_falha_escrita", extra={"chave": chave, "error": str(e)})
+            return None
+
+    def _guardar_memoria(self, chave: str, conteudo: bytes):
+        tamanho = len(conteudo)
+        if tamanho > self.memoria_max_bytes:
+            return
+        with self._lock:
+            anterior = self._memoria.pop(chave, None)
+            if anterior is not None:
+                self._memoria_bytes -= len(anterior)
+            self._memoria[chave] = conteudo
+            self._memoria_bytes += tamanho
+            while self._memoria_bytes > self.memoria_max_bytes:
+                _, removido = self._memoria.popitem(last=False)
+                self._memoria_bytes -= len(removido)
+
+    # ------------------------------------------------------------
+    #  Métricas
+    # ------------------------------------------------------------
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entradas_memoria"] = len(self._memoria)
+            stats["bytes_memoria"] = self._memoria_bytes
+        total = stats["hits_memoria"] + stats["hits_disco"] + stats["nao_modificados"] + stats["misses"]
+        stats["hit_ratio"] = round((total - stats["misses"]) / total, 4) if total else 0.0
+        stats["memoria_max_bytes"] = self.memoria_max_bytes
+        stats["disco_ativo"] = self.diretorio is not None
+        return stats
+
+
+pdf_cache = PDFCache(PDF_CACHE_DIR, PDF_CACHE_MEMORIA_MB * 1024 * 1024)
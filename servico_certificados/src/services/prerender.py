@@ -0,0 +1,231 @@
+# servico_certificados/src/services/prerender.py
+
+"""
+Pré-renderização de certificados em segundo plano.
+
+Acompanha novas linhas de CertificadoMetadata (marca d'água por id),
+renderiza os PDFs no pool de renderização e grava no cache de PDFs.
+Assim, o primeiro download após um evento já é uma leitura de cache.
+
+Com vários workers web (gunicorn), cada um sobe o seu PrerenderWorker,
+mas só o que segura o pg_try_advisory_lock coleta: sem isso cada
+certificado novo seria renderizado uma vez por worker. O lock fica com o
+mesmo worker entre ciclos (a marca d'água é dele) e cai junto com a
+conexão se ele morrer; os demais tentam de novo a cada ciclo.
+"""
+
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, text
+
+import models
+from database import SessionLocal, engine
+from servico_comum.logger import configure_logger
+from services.gerador import dados_renderizacao
+from services.pdf_cache import pdf_cache
+from services.renderizador import renderizador, RenderizacaoSaturada
+
+logger = configure_logger("servico_certificados.prerender")
+
+PRERENDER_ATIVO = os.getenv("PRERENDER_ATIVO", "1") == "1"
+PRERENDER_CONCORRENCIA = int(os.getenv("PRERENDER_CONCORRENCIA", "2"))
+PRERENDER_INTERVALO = float(os.getenv("PRERENDER_INTERVALO", "5"))
+PRERENDER_LOTE = int(os.getenv("PRERENDER_LOTE", "100"))
+# 1 = ao iniciar, percorre todo o histórico (itens já em cache são pulados)
+PRERENDER_DESDE_INICIO = os.getenv("PRERENDER_DESDE_INICIO", "0") == "1"
+# Nome do advisory lock (hashtext -> chave int) que elege o worker que coleta
+PRERENDER_LOCK = "servico_certificados.prerender"
+
+
+class PrerenderWorker:
+
+    def __init__(self, concorrencia: int, intervalo: float, lote: int):
+        self.concorrencia = concorrencia
+        self.intervalo = intervalo
+        self.lote = lote
+        self.ultimo_id: Optional[int] = None
+        self._fila: Optional[asyncio.Queue] = None
+        self._acordar: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tarefas = []
+        # id -> created_at de tudo que está na fila ou renderizando (ordem de chegada)
+        self._pendentes = {}
+        self._ultimo_lag: Optional[float] = None
+        self._conexao_lock = None  # conexão que segura o lock enquanto este worker coleta
+        self._stats = {
+            "renderizados": 0, "ja_em_cache": 0, "falhas": 0, "adiados": 0, "ciclos_sem_lock": 0,
+        }
+
+    # ------------------------------------------------------------
+    #  Ciclo de vida
+    # ------------------------------------------------------------
+
+    async def iniciar(self):
+        self._loop = asyncio.get_running_loop()
+        self._fila = asyncio.Queue()
+        self._acordar = asyncio.Event()
+        if self.ultimo_id is None:
+            self.ultimo_id = 0 if PRERENDER_DESDE_INICIO else await run_in_threadpool(self._maior_id)
+
+        self._tarefas = [asyncio.create_task(self._coletar())]
+        self._tarefas += [
+            asyncio.create_task(self._renderizar()) for _ in range(self.concorrencia)
+        ]
+        logger.info(
+            "prerender_iniciado",
+            extra={"concorrencia": self.concorrencia, "ultimo_id": self.ultimo_id}
+        )
+
+    async def encerrar(self):
+        for tarefa in self._tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*self._tarefas, return_exceptions=True)
+        self._tarefas = []
+        await run_in_threadpool(self._soltar_lock)
+
+    def notificar(self):
+        """Antecipa a próxima coleta. Seguro para chamar a partir de threads."""
+        if self._loop is not None and self._acordar is not None:
+            self._loop.call_soon_threadsafe(self._acordar.set)
+
+    # ------------------------------------------------------------
+    #  Coleta de novas linhas
+    # ------------------------------------------------------------
+
+    @staticmethod
+    def _maior_id() -> int:
+        with SessionLocal() as db:
+            return db.query(func.max(models.CertificadoMetadata.id)).scalar() or 0
+
+    def _buscar_novos(self, ultimo_id: int):
+        with SessionLocal() as db:
+            return (
+                db.query(models.CertificadoMetadata)
+                .filter(models.CertificadoMetadata.id > ultimo_id)
+                .order_by(models.CertificadoMetadata.id)
+                .limit(self.lote)
+                .all()
+            )
+
+    def _segurar_lock(self) -> bool:
+        """True se este worker é (ou acabou de virar) o que coleta."""
+        if self._conexao_lock is not None:
+            try:
+                # Conexão perdida = lock perdido: outro worker pode ter assumido
+                self._conexao_lock.scalar(text("SELECT 1"))
+                return True
+            except Exception:
+                self._soltar_lock()
+
+        # AUTOCOMMIT: a conexão segura o lock sem ficar "idle in transaction"
+        conexao = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            if conexao.scalar(text("SELECT pg_try_advisory_lock(hashtext(:nome))"), {"nome": PRERENDER_LOCK}):
+                self._conexao_lock, conexao = conexao, None
+                logger.info("prerender_coletor_eleito", extra={"ultimo_id": self.ultimo_id})
+                return True
+            return False
+        finally:
+            if conexao is not None:
+                conexao.close()
+
+    def _soltar_lock(self):
+        conexao, self._conexao_lock = self._conexao_lock, None
+        if conexao is None:
+            return
+        try:
+            conexao.execute(text("SELECT pg_advisory_unlock(hashtext(:nome))"), {"nome": PRERENDER_LOCK})
+        except Exception:
+            pass  # conexão já caiu: o lock caiu com ela
+        finally:
+            # invalidate: a conexão não volta ao pool ainda segurando o lock
+            conexao.invalidate()
+            conexao.close()
+
+    async def _coletar(self):
+        while True:
+            # Limpa antes de buscar: avisos que chegarem durante a busca não se perdem
+            self._acordar.clear()
+            try:
+                novos = []
+                if not await run_in_threadpool(self._segurar_lock):
+                    self._stats["ciclos_sem_lock"] += 1
+                # Só busca mais quando a fila local está curta (memória limitada)
+                elif self._fila.qsize() < self.lote:
+                    novos = await run_in_threadpool(self._buscar_novos, self.ultimo_id)
+                for cert in novos:
+                    self._pendentes[cert.id] = cert.created_at
+                    self._fila.put_nowait((cert.id, cert.created_at, dados_renderizacao(cert)))
+                    self.ultimo_id = cert.id
+                if len(novos) == self.lote:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("prerender_falha_coleta", extra={"error": str(e)})
+
+            try:
+                await asyncio.wait_for(self._acordar.wait(), timeout=self.intervalo)
+            except asyncio.TimeoutError:
+                pass
+
+    # ------------------------------------------------------------
+    #  Renderização
+    # ------------------------------------------------------------
+
+    async def _renderizar(self):
+        while True:
+            cert_id, criado_em, dados = await self._fila.get()
+            try:
+                chave = pdf_cache.chave(dados["codigo_unico"], dados["template_nome"])
+                if await run_in_threadpool(pdf_cache.contem, chave):
+                    self._stats["ja_em_cache"] += 1
+                else:
+                    conteudo = await renderizador.renderizar(dados)
+                    await run_in_threadpool(pdf_cache.salvar, chave, conteudo)
+                    self._stats["renderizados"] += 1
+                if criado_em is not None:
+                    self._ultimo_lag = (datetime.now(timezone.utc) - criado_em).total_seconds()
+                self._pendentes.pop(cert_id, None)
+            except RenderizacaoSaturada as e:
+                # Downloads têm prioridade: devolve para a fila e espera
+                self._stats["adiados"] += 1
+                await asyncio.sleep(e.retry_after)
+                self._fila.put_nowait((cert_id, criado_em, dados))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats["falhas"] += 1
+                self._pendentes.pop(cert_id, None)
+                logger.error("prerender_falha", extra={"cert_id": cert_id, "error": str(e)})
+            finally:
+                self._fila.task_done()
+
+    # ------------------------------------------------------------
+    #  Status
+    # ------------------------------------------------------------
+
+    def status(self) -> dict:
+        lag_atual = 0.0
+        if self._pendentes:
+            mais_antigo = next(iter(self._pendentes.values()))
+            if mais_antigo is not None:
+                lag_atual = (datetime.now(timezone.utc) - mais_antigo).total_seconds()
+        return {
+            "ativo": bool(self._tarefas),
+            "coletor": self._conexao_lock is not None,
+            "concorrencia": self.concorrencia,
+            "ultimo_id_visto": self.ultimo_id,
+            "fila": self._fila.qsize() if self._fila else 0,
+            "pendentes": len(self._pendentes),
+            "lag_segundos": round(lag_atual, 3),
+            "ultimo_lag_segundos": round(self._ultimo_lag, 3) if self._ultimo_lag is not None else None,
+            **self._stats,
+        }
+
+
+prerender = PrerenderWorker(PRERENDER_CONCORRENCIA, PRERENDER_INTERVALO, PRERENDER_LOTE)
@@ -0,0 +1,147 @@
+# servico_certificados/src/services/renderizador.py
+
+"""
+Backend de renderização de PDFs fora do event loop.
+
+A geração (reportlab + qrcode) é CPU-bound; por padrão roda em um pool de
+processos dimensionado pelos núcleos disponíveis no container. A fila é
+limitada: quando saturada, a requisição é recusada imediatamente com
+RenderizacaoSaturada (mapeada para 503 + Retry-After no router).
+
+Uma renderização que passa do timeout continua ocupando o worker: a vaga
+na fila só é liberada quando o job termina de fato.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from servico_comum.logger import configure_logger
+from servico_comum.metrics import LatencyHistogram
+from servico_comum.runtime import cpus_disponiveis, workers_web
+from services.gerador import compilar_templates, renderizar_pdf
+
+logger = configure_logger("servico_certificados.renderizador")
+
+
+# "process" (padrão) ou "thread" (útil em desenvolvimento com --reload)
+PDF_RENDER_BACKEND = os.getenv("PDF_RENDER_BACKEND", "process").lower()
+# Com vários workers web, os núcleos são repartidos entre os pools de cada um
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "0")) or max(1, cpus_disponiveis() // workers_web())
+PDF_RENDER_FILA_MAX = int(os.getenv("PDF_RENDER_FILA_MAX", "0")) or PDF_RENDER_WORKERS * 4
+PDF_RENDER_TIMEOUT = float(os.getenv("PDF_RENDER_TIMEOUT", "30"))
+PDF_RENDER_RETRY_AFTER = int(os.getenv("PDF_RENDER_RETRY_AFTER", "2"))
+
+
+class RenderizacaoSaturada(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Fila de renderização cheia")
+        self.retry_after = retry_after
+
+
+class RenderizacaoExpirada(Exception):
+    """A renderização passou de PDF_RENDER_TIMEOUT (o job segue no worker)."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Tempo de renderização esgotado")
+        self.retry_after = retry_after
+
+
+def _aquecer_worker():
+    # Importa reportlab/qrcode e compila os fundos no worker antes da primeira requisição
+    compilar_templates()
+
+
+class RenderizadorPDF:
+
+    def __init__(self, backend: str, workers: int, fila_max: int, timeout: float):
+        self.backend = backend
+        self.workers = workers
+        self.fila_max = fila_max
+        self.timeout = timeout
+        self._executor = None
+        self._pendentes = 0
+        self._stats = {"concluidas": 0, "rejeitadas": 0, "falhas": 0, "timeouts": 0}
+        # Tempo total (fila + renderização) e tempo apenas dentro do worker
+        self.latencia_total = LatencyHistogram()
+        self.latencia_render = LatencyHistogram()
+
+    def iniciar(self):
+        if self._executor is not None:
+            return
+        compilar_templates()
+        if self.backend == "thread":
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="render-pdf"
+            )
+        else:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_aquecer_worker,
+            )
+        logger.info(
+            "renderizador_iniciado",
+            extra={"backend": self.backend, "workers": self.workers, "fila_max": self.fila_max}
+        )
+
+    def encerrar(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def renderizar(self, dados: dict) -> bytes:
+        """Renderiza um certificado. `dados` vem de gerador.dados_renderizacao()."""
+        if self._pendentes >= self.fila_max:
+            self._stats["rejeitadas"] += 1
+            raise RenderizacaoSaturada(PDF_RENDER_RETRY_AFTER)
+
+        if self._executor is None:
+            self.iniciar()
+
+        inicio = time.perf_counter()
+        job = self._executor.submit(renderizar_pdf, dados)
+        self._pendentes += 1
+        futuro = asyncio.wrap_future(job)
+        futuro.add_done_callback(self._liberar)
+        try:
+            # shield: o timeout não marca o job como cancelado antes de ele terminar
+            conteudo, duracao_render = await asyncio.wait_for(asyncio.shield(futuro), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            # Se ainda não saiu da fila do executor, nem chega a rodar
+            job.cancel()
+            self._stats["timeouts"] += 1
+            raise RenderizacaoExpirada(PDF_RENDER_RETRY_AFTER)
+        except Exception:
+            self._stats["falhas"] += 1
+            raise
+
+        self._stats["concluidas"] += 1
+        self.latencia_total.observe(time.perf_counter() - inicio)
+        self.latencia_render.observe(duracao_render)
+        return conteudo
+
+    def _liberar(self, futuro: asyncio.Future):
+        """Callback de término do job (no loop): devolve a vaga da fila."""
+        self._pendentes -= 1
+        if not futuro.cancelled():
+            # Resultado de um job que expirou ninguém mais lê
+            futuro.exception()
+
+    def estatisticas(self) -> dict:
+        return {
+            "backend": self.backend,
+            "workers": self.workers,
+            "fila_max": self.fila_max,
+            "pendentes": self._pendentes,
+            **self._stats,
+            "latencia_total": self.latencia_total.snapshot(),
+            "latencia_render": self.latencia_render.snapshot(),
+        }
+
+
+renderizador = RenderizadorPDF(
+    PDF_RENDER_BACKEND, PDF_RENDER_WORKERS, PDF_RENDER_FILA_MAX, PDF_RENDER_TIMEOUT
+)
@@ -0,0 +1,57 @@
+# servico_certificados/tests/test_prerender_lock.py
+
+"""Só um PrerenderWorker (entre os workers web) coleta por vez."""
+
+import os
+
+import pytest
+from sqlalchemy import text
+
+from database import engine
+from services.prerender import PRERENDER_LOCK, PrerenderWorker
+
+
+@pytest.fixture
+def workers():
+    if not os.getenv("TESTES_DATABASE_URL"):
+        pytest.skip("TESTES_DATABASE_URL não definida")
+    workers = [PrerenderWorker(concorrencia=1, intervalo=60, lote=10) for _ in range(3)]
+    yield workers
+    for w in workers:
+        w._soltar_lock()
+
+
+def test_um_coletor_por_vez_e_o_lock_fica_com_ele(workers):
+    primeiro, segundo, terceiro = workers
+
+    assert primeiro._segurar_lock()
+    assert not segundo._segurar_lock()
+    assert not terceiro._segurar_lock()
+    # O coletor continua coletando nos ciclos seguintes
+    assert primeiro._segurar_lock()
+    assert [w.status()["coletor"] for w in workers] == [True, False, False]
+
+
+def test_coletor_que_sai_libera_para_outro(workers):
+    primeiro, segundo, _ = workers
+    assert primeiro._segurar_lock()
+
+    primeiro._soltar_lock()
+    assert segundo._segurar_lock()
+    assert not primeiro._segurar_lock()
+
+
+def test_conexao_perdida_devolve_a_eleicao(workers):
+    primeiro, segundo, _ = workers
+    assert primeiro._segurar_lock()
+
+    # Derruba a sessão do coletor, como um restart do Postgres faria
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(
+            "SELECT pg_terminate_backend(pid) FROM pg_locks WHERE locktype = 'advisory' "
+            "AND objid = (hashtext(:nome)::bigint & 4294967295)"
+        ), {"nome": PRERENDER_LOCK})
+
+    assert segundo._segurar_lock()
+    # O antigo coletor percebe a conexão perdida no próximo ciclo
+    assert not primeiro._segurar_lock()
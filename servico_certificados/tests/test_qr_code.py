@@ -0,0 +1,42 @@
+# servico_certificados/tests/test_qr_code.py
+
+"""Matriz do QR Code em faixas vetoriais, servida de um LRU."""
+
+import qrcode
+
+import services.gerador as gerador
+from services.gerador import _qr_modulos
+
+
+def _matriz_das_faixas(n_modulos, faixas):
+    matriz = [[False] * n_modulos for _ in range(n_modulos)]
+    for coluna, linha, comprimento in faixas:
+        for i in range(coluna, coluna + comprimento):
+            assert not matriz[linha][i], "faixas sobrepostas"
+            matriz[linha][i] = True
+    return matriz
+
+
+def test_faixas_reproduzem_a_matriz_do_qrcode():
+    conteudo = "http://localhost:3000/validar?codigo=ABC123"
+    qr = qrcode.QRCode(border=4)
+    qr.add_data(conteudo)
+    qr.make(fit=True)
+    esperado = qr.get_matrix()
+
+    n_modulos, faixas = _qr_modulos(conteudo)
+
+    assert n_modulos == len(esperado)
+    assert _matriz_das_faixas(n_modulos, faixas) == esperado
+
+
+def test_matriz_vem_do_lru_para_codigos_repetidos():
+    _qr_modulos.cache_clear()
+    primeira = _qr_modulos("codigo-repetido")
+    segunda = _qr_modulos("codigo-repetido")
+    _qr_modulos("outro-codigo")
+
+    info = _qr_modulos.cache_info()
+    assert segunda is primeira
+    assert (info.hits, info.misses) == (1, 2)
+    assert info.maxsize == gerador.QR_CACHE_TAMANHO
@@ -0,0 +1,94 @@
+# servico_certificados/tests/test_renderizador.py
+
+"""Fila limitada do renderizador: saturação e jobs que passam do timeout."""
+
+import asyncio
+import threading
+
+import pytest
+
+import services.renderizador as modulo
+from services.renderizador import RenderizadorPDF, RenderizacaoExpirada, RenderizacaoSaturada
+
+
+@pytest.fixture
+def render_lento(monkeypatch):
+    """Substitui o render por um que espera o teste liberar."""
+    liberar = threading.Event()
+
+    def renderizar_pdf(dados):
+        liberar.wait(5)
+        return b"%PDF", 0.0
+
+    monkeypatch.setattr(modulo, "renderizar_pdf", renderizar_pdf)
+    yield liberar
+    liberar.set()
+
+
+def _renderizador(fila_max=1, timeout=0.05):
+    return RenderizadorPDF("thread", workers=1, fila_max=fila_max, timeout=timeout)
+
+
+def test_timeout_mantem_a_vaga_ate_o_job_terminar(render_lento):
+    async def cenario():
+        r = _renderizador()
+        try:
+            with pytest.raises(RenderizacaoExpirada):
+                await r.renderizar({})
+            # O job segue no worker: a fila continua cheia
+            assert r.estatisticas()["pendentes"] == 1
+            with pytest.raises(RenderizacaoSaturada):
+                await r.renderizar({})
+
+            render_lento.set()
+            for _ in range(100):
+                if r.estatisticas()["pendentes"] == 0:
+                    break
+                await asyncio.sleep(0.01)
+            assert r.estatisticas()["pendentes"] == 0
+            assert r.estatisticas()["timeouts"] == 1
+            assert r.estatisticas()["rejeitadas"] == 1
+        finally:
+            render_lento.set()
+            r.encerrar()
+
+    asyncio.run(cenario())
+
+
+def test_job_na_fila_do_executor_e_cancelado_no_timeout(render_lento):
+    async def cenario():
+        r = _renderizador(fila_max=2)
+        try:
+            # O primeiro ocupa o único worker; o segundo expira ainda na fila
+            primeiro = asyncio.ensure_future(r.renderizar({}))
+            await asyncio.sleep(0)
+            with pytest.raises(RenderizacaoExpirada):
+                await r.renderizar({})
+            await asyncio.sleep(0.01)
+            assert r.estatisticas()["pendentes"] == 1
+
+            render_lento.set()
+            with pytest.raises(RenderizacaoExpirada):
+                await primeiro
+        finally:
+            render_lento.set()
+            r.encerrar()
+
+    asyncio.run(cenario())
+
+
+def test_renderizacao_concluida_libera_a_vaga(monkeypatch):
+    monkeypatch.setattr(modulo, "renderizar_pdf", lambda dados: (b"%PDF-ok", 0.001))
+
+    async def cenario():
+        r = _renderizador(timeout=5)
+        try:
+            assert await r.renderizar({}) == b"%PDF-ok"
+            await asyncio.sleep(0)
+            stats = r.estatisticas()
+            assert stats["pendentes"] == 0
+            assert stats["concluidas"] == 1
+        finally:
+            r.encerrar()
+
+    asyncio.run(cenario())
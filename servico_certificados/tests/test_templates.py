@@ -0,0 +1,79 @@
+# servico_certificados/tests/test_templates.py
+
+"""Registro de templates e camada estática compilada uma única vez."""
+
+import pytest
+
+import services.gerador as gerador
+from services.gerador import (
+    TemplateCertificado, compilar_templates, obter_template,
+    registrar_template, renderizar_pdf,
+)
+
+
+def _dados(template: str, codigo: str = "ABC123") -> dict:
+    return {
+        "codigo_unico": codigo,
+        "participante_nome": "Maria Silva",
+        "evento_nome": "Semana de Tecnologia",
+        "evento_data": "18/10/2026",
+        "template_nome": template,
+    }
+
+
+@pytest.fixture
+def registro_isolado(monkeypatch):
+    monkeypatch.setattr(gerador, "TEMPLATES", dict(gerador.TEMPLATES))
+    return gerador.TEMPLATES
+
+
+def test_templates_embutidos_registrados():
+    assert {"default", "tech", "saude", "educacao"} <= set(gerador.TEMPLATES)
+
+
+def test_nome_desconhecido_ou_vazio_cai_no_default():
+    default = gerador.TEMPLATES["default"]
+    assert obter_template("inexistente") is default
+    assert obter_template(None) is default
+    assert obter_template("") is default
+
+
+def test_nome_nao_diferencia_maiusculas():
+    assert obter_template("TECH") is gerador.TEMPLATES["tech"]
+
+
+def test_novo_template_entra_pelo_decorator(registro_isolado):
+    desenhos = []
+
+    @registrar_template("teste")
+    class TemplateTeste(TemplateCertificado):
+        def desenhar_fundo(self, c, w, h):
+            desenhos.append("fundo")
+            c.rect(0, 0, w, h)
+
+        def desenhar_conteudo(self, c, w, h, data):
+            desenhos.append(data.participante_nome)
+
+    assert isinstance(obter_template("teste"), TemplateTeste)
+
+    conteudo, _ = renderizar_pdf(_dados("teste"))
+    renderizar_pdf(_dados("teste", "XYZ789"))
+
+    assert conteudo.startswith(b"%PDF")
+    # Fundo compilado uma vez; conteúdo variável a cada certificado
+    assert desenhos == ["fundo", "Maria Silva", "Maria Silva"]
+
+
+def test_fundo_compilado_isola_o_estado_grafico(registro_isolado):
+    compilar_templates()
+    for template in registro_isolado.values():
+        fundo = template.fundo_compilado()
+        assert fundo.startswith("q\n") and fundo.endswith("\nQ")
+        assert template.fundo_compilado() is fundo
+
+
+@pytest.mark.parametrize("template", ["default", "tech", "saude", "educacao"])
+def test_renderiza_cada_template(template):
+    conteudo, duracao = renderizar_pdf(_dados(template))
+    assert conteudo.startswith(b"%PDF") and conteudo.rstrip().endswith(b"%%EOF")
+    assert duracao >= 0
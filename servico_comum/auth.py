@@ -2,13 +2,24 @@ from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
+from collections import OrderedDict
+import hashlib
 import os
+import threading
+import time
 
 security = HTTPBearer()
 
 JWT_SECRET = os.getenv("JWT_SECRET", "CHANGE_ME")
 JWT_ALGORITHM = "HS256"
 JWT_ISSUER = "sistema-eventos"
+# Emissores aceitos (tokens antigos ainda podem vir com o nome do serviço)
+JWT_ISSUERS_VALIDOS = frozenset(
+    i.strip() for i in os.getenv(
+        "JWT_ISSUERS_VALIDOS", "sistema-eventos,servico-eventos,servico-usuarios"
+    ).split(",") if i.strip()
+)
+JWT_CACHE_MAX = int(os.getenv("JWT_CACHE_MAX", "10000"))
 
 def create_access_token(sub: str, roles=None, expires_minutes=60, extra_claims: dict = None):
     now = datetime.utcnow()
@@ -23,20 +34,81 @@ def create_access_token(sub: str, roles=None, expires_minutes=60, extra_claims:
         payload.update(extra_claims)
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
-def decode_token(token: str):
-    try:
-        return jwt.decode(
-            token,
-            JWT_SECRET,
-            algorithms=[JWT_ALGORITHM],
-            issuer=JWT_ISSUER
-        )
-    except JWTError:
-        raise HTTPException(
+class VerificadorToken:
+    """
+    Decodifica o JWT uma única vez (assinatura + exp), confere o `iss`
+    contra um conjunto de emissores e guarda o payload verificado em um
+    LRU limitado, indexado pelo hash do token, até o `exp`.
+    """
+
+    def __init__(self, secret: str, algoritmo: str, issuers, max_itens: int):
+        self.secret = secret
+        self.algoritmo = algoritmo
+        self.issuers = frozenset(issuers)
+        self.max_itens = max_itens
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidos": 0}
+
+    def _invalido(self, detalhe: str):
+        self._stats["invalidos"] += 1
+        return HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token inválido"
+            detail=detalhe,
+            headers={"WWW-Authenticate": "Bearer"},
         )
 
+    def verificar(self, token: str) -> dict:
+        chave = hashlib.sha256(token.encode()).digest()
+        agora = time.time()
+
+        with self._lock:
+            item = self._cache.get(chave)
+            if item is not None:
+                exp, payload = item
+                if exp > agora:
+                    self._cache.move_to_end(chave)
+                    self._stats["hits"] += 1
+                    # Cópia: quem chama pode alterar o dict (request.state.user)
+                    return dict(payload)
+                del self._cache[chave]
+
+        self._stats["misses"] += 1
+        try:
+            # Sem `issuer`: o jose não confere o iss; a checagem é feita abaixo
+            payload = jwt.decode(token, self.secret, algorithms=[self.algoritmo])
+        except JWTError:
+            raise self._invalido("Token inválido")
+
+        if payload.get("iss") not in self.issuers:
+            raise self._invalido("Token inválido ou emissor desconhecido.")
+
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            with self._lock:
+                self._cache[chave] = (exp, payload)
+                self._cache.move_to_end(chave)
+                while len(self._cache) > self.max_itens:
+                    self._cache.popitem(last=False)
+
+        return dict(payload)
+
+    def estatisticas(self) -> dict:
+        consultas = self._stats["hits"] + self._stats["misses"]
+        return {
+            "itens": len(self._cache),
+            "max_itens": self.max_itens,
+            **self._stats,
+            "taxa_acerto": round(self._stats["hits"] / consultas, 4) if consultas else 0.0,
+        }
+
+
+verificador = VerificadorToken(JWT_SECRET, JWT_ALGORITHM, JWT_ISSUERS_VALIDOS, JWT_CACHE_MAX)
+
+
+def decode_token(token: str):
+    return verificador.verificar(token)
+
 async def get_current_user(req: Request, creds=Depends(security)):
     token = creds.credentials
     payload = decode_token(token)
@@ -0,0 +1,84 @@
+# servico_comum/benchmarks/bench_jwt.py
+
+"""
+Custo por requisição da validação do JWT: o laço antigo de
+servico_usuarios (um jwt.decode por emissor aceito, até acertar), um
+único decode com o `iss` conferido à parte, e o VerificadorToken de
+servico_comum.auth sem cache (miss) e com o token já verificado (hit).
+
+    python servico_comum/benchmarks/bench_jwt.py --decodes 20000
+
+O laço antigo é medido com o token de cada emissor: o primeiro da lista
+é o melhor caso (um decode) e o último, o pior (três). Nenhum serviço ou
+banco é necessário.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[2]
+sys.path[:0] = [str(RAIZ)]
+
+from jose import JWTError, jwt
+
+from servico_comum import auth
+from servico_comum.auth import JWT_ALGORITHM, JWT_SECRET, VerificadorToken
+
+# Ordem do laço antigo (servico_usuarios/src/auth.py antes do VerificadorToken)
+ISSUERS_LACO = ["servico-eventos", "sistema-eventos", "servico-usuarios"]
+
+
+def decode_por_emissor(token: str) -> dict:
+    for issuer in ISSUERS_LACO:
+        try:
+            return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM], issuer=issuer)
+        except JWTError:
+            continue
+    raise JWTError("emissor desconhecido")
+
+
+def decode_unico(token: str) -> dict:
+    payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    if payload.get("iss") not in ISSUERS_LACO:
+        raise JWTError("emissor desconhecido")
+    return payload
+
+
+def token_de(issuer: str) -> str:
+    return auth.create_access_token("bench", roles=["user"], extra_claims={"iss": issuer})
+
+
+def medir(funcao, token: str, total: int) -> dict:
+    funcao(token)  # aquece e confere que o token é aceito
+    inicio = time.perf_counter()
+    for _ in range(total):
+        funcao(token)
+    duracao = time.perf_counter() - inicio
+    return {"us_por_decode": round(duracao / total * 1e6, 2), "decodes_por_s": round(total / duracao, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--decodes", type=int, default=20000)
+    args = parser.parse_args()
+
+    for posicao, issuer in enumerate(ISSUERS_LACO, start=1):
+        print({"modo": "laco_emissores", "iss": issuer, "decodes_por_token": posicao,
+               **medir(decode_por_emissor, token_de(issuer), args.decodes)})
+
+    token = token_de(ISSUERS_LACO[-1])
+    print({"modo": "decode_unico", **medir(decode_unico, token, args.decodes)})
+
+    # max_itens=0: todo token sai do LRU assim que entra, cada chamada é um miss
+    sem_cache = VerificadorToken(JWT_SECRET, JWT_ALGORITHM, ISSUERS_LACO, max_itens=0)
+    print({"modo": "verificador_miss", **medir(sem_cache.verificar, token, args.decodes)})
+
+    com_cache = VerificadorToken(JWT_SECRET, JWT_ALGORITHM, ISSUERS_LACO, max_itens=1000)
+    print({"modo": "verificador_hit", **medir(com_cache.verificar, token, args.decodes),
+           "cache": com_cache.estatisticas()})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# servico_comum/benchmarks/bench_servidor.py
+
+"""
+Tempo de subida e vazão por núcleo de cada serviço no perfil de produção.
+
+Sobe o serviço como o entrypoint faz com APP_ENV=production (gunicorn +
+workers uvicorn, servico_comum/gunicorn_conf.py), mede o tempo até o
+health check responder e depois a vazão do GET / com N workers:
+
+    python servico_comum/benchmarks/bench_servidor.py --servicos eventos usuarios --workers 1 2 4
+
+Os serviços conectam no Postgres das variáveis POSTGRES_* (o schema já
+migrado); o health check não toca no banco, então o número mede o custo do
+servidor + middlewares por requisição, não o das consultas.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[2]
+sys.path[:0] = [str(RAIZ)]
+
+import httpx
+
+from servico_comum.runtime import cpus_disponiveis
+
+SERVICOS = ("usuarios", "eventos", "certificados")
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def subir(servico: str, workers: int, porta: int) -> subprocess.Popen:
+    src = RAIZ / f"servico_{servico}" / "src"
+    env = {
+        **os.environ,
+        "APP_ENV": "production",
+        "WEB_CONCURRENCY": str(workers),
+        "BIND": f"127.0.0.1:{porta}",
+        "DB_TESTAR_CONEXAO": "0",
+        "LOG_LEVEL": "warning",
+        "PYTHONPATH": os.pathsep.join([str(src), str(RAIZ)]),
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", str(RAIZ / "servico_comum" / "gunicorn_conf.py"), "main:app"],
+        cwd=src, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+async def aguardar_subida(base_url: str, processo: subprocess.Popen, limite: float = 60) -> float:
+    inicio = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url, timeout=1.0) as client:
+        while time.perf_counter() - inicio < limite:
+            if processo.poll() is not None:
+                raise RuntimeError(f"o servidor saiu com código {processo.returncode}")
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return time.perf_counter() - inicio
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.05)
+    raise TimeoutError("o servidor não respondeu ao health check")
+
+
+async def carga(base_url: str, duracao: float, concorrencia: int) -> int:
+    limites = httpx.Limits(max_connections=concorrencia, max_keepalive_connections=concorrencia)
+    fim = time.perf_counter() + duracao
+    total = 0
+
+    async def cliente(client):
+        nonlocal total
+        while time.perf_counter() < fim:
+            resposta = await client.get("/")
+            resposta.raise_for_status()
+            total += 1
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limites, timeout=10.0) as client:
+        await asyncio.gather(*(cliente(client) for _ in range(concorrencia)))
+    return total
+
+
+async def medir(servico: str, workers: int, duracao: float, concorrencia: int) -> dict:
+    porta = porta_livre()
+    base_url = f"http://127.0.0.1:{porta}"
+    processo = subir(servico, workers, porta)
+    try:
+        subida = await aguardar_subida(base_url, processo)
+        # Aquecimento: todos os workers aceitam conexões e carregam as rotas
+        await carga(base_url, 1.0, concorrencia)
+        inicio = time.perf_counter()
+        total = await carga(base_url, duracao, concorrencia)
+        req_s = total / (time.perf_counter() - inicio)
+    finally:
+        processo.terminate()
+        processo.wait(timeout=30)
+
+    return {
+        "servico": servico,
+        "workers": workers,
+        "subida_s": round(subida, 2),
+        "req_por_s": round(req_s, 1),
+        # O gerador de carga divide a máquina com o servidor: vale para comparar
+        "req_por_s_por_worker": round(req_s / workers, 1),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--servicos", nargs="+", choices=SERVICOS, default=list(SERVICOS))
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, cpus_disponiveis()])
+    parser.add_argument("--duracao", type=float, default=10.0)
+    parser.add_argument("--concorrencia", type=int, default=32)
+    args = parser.parse_args()
+
+    print(f"núcleos disponíveis: {cpus_disponiveis()}")
+    for servico in args.servicos:
+        for workers in sorted(set(args.workers)):
+            print(await medir(servico, workers, args.duracao, args.concorrencia))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
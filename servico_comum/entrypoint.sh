@@ -0,0 +1,18 @@
+#!/bin/sh
+# Entrypoint comum dos serviços Python.
+#   APP_ENV=production -> gunicorn + workers uvicorn (sem teste de conexão no boot)
+#   qualquer outro     -> uvicorn --reload (desenvolvimento)
+set -e
+
+# Schema só via Alembic, antes de subir (uma vez, não por worker; a aplicação
+# não executa DDL). DB_MIGRAR=0 quando as migrações rodam num passo de deploy à parte.
+if [ -f alembic.ini ] && [ "${DB_MIGRAR:-1}" = "1" ]; then
+    alembic upgrade head
+fi
+
+if [ "$APP_ENV" = "production" ]; then
+    export DB_TESTAR_CONEXAO="${DB_TESTAR_CONEXAO:-0}"
+    exec gunicorn -c servico_comum/gunicorn_conf.py main:app
+fi
+
+exec uvicorn main:app --host 0.0.0.0 --port 8000 --reload
@@ -0,0 +1,42 @@
+# servico_comum/gunicorn_conf.py
+
+"""
+Perfil de produção dos serviços Python:
+    gunicorn -c servico_comum/gunicorn_conf.py main:app
+"""
+
+import os
+import sys
+
+# O arquivo é carregado antes da app: garante /app no path para importar servico_comum
+sys.path.insert(0, os.getcwd())
+
+from servico_comum.runtime import cpus_disponiveis
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+
+# Workers async (uvicorn): um por núcleo costuma saturar a CPU
+workers = int(os.getenv("WEB_CONCURRENCY", "0")) or cpus_disponiveis()
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Exportado antes do fork: database.py divide o orçamento de conexões por worker
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+# Cada worker importa a app sozinho (engines, pools de processos e
+# clientes HTTP não podem ser herdados pelo fork)
+preload_app = False
+
+# Encerramento gracioso: SIGTERM -> termina requisições em andamento e
+# roda o shutdown do lifespan antes do SIGKILL
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+
+# Recicla workers periodicamente (fragmentação de memória)
+max_requests = int(os.getenv("MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "1000"))
+
+worker_tmp_dir = "/dev/shm"
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
@@ -1,24 +1,355 @@
+# servico_comum/idempotency.py
+
+"""
+Idempotência por cabeçalho `Idempotency-Key` em rotas POST.
+
+O middleware grava a primeira resposta de cada chave e a devolve para
+repetições (com `Idempotent-Replayed: true`). Duplicatas que chegam
+enquanto a original ainda está em andamento esperam pelo resultado em
+vez de executar de novo.
+
+A chave é escopada por método + rota + credencial (hash do Authorization)
+e amarrada ao hash do corpo: reutilizar a chave com outro corpo é 422.
+O corpo é lido em memória para o hash: acima de IDEMPOTENCIA_REQUISICAO_MAX
+a requisição é recusada com 413.
+
+Só ficam gravadas pelo TTL completo as respostas 2xx e 409 (resultado
+definitivo da operação). Os demais 4xx (validação, 401/403, 404 de algo
+que ainda pode ser criado) ficam só por IDEMPOTENCIA_TTL_4XX; 5xx, outros
+códigos e exceções não são gravados: a chave é liberada para nova tentativa.
+
+Backends:
+    memoria (padrão) -> por processo, TTL + limite de itens
+    redis            -> compartilhado entre workers/instâncias (requer `redis`)
+"""
+
+import asyncio
+import base64
 import hashlib
+import importlib.util
+import json
+import os
+import threading
 import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from starlette.responses import JSONResponse
+
+from .logger import configure_logger
+
+logger = configure_logger("idempotency")
+
+IDEMPOTENCIA_BACKEND = os.getenv("IDEMPOTENCIA_BACKEND", "memoria").lower()
+IDEMPOTENCIA_TTL = int(os.getenv("IDEMPOTENCIA_TTL", "86400"))
+IDEMPOTENCIA_MAX = int(os.getenv("IDEMPOTENCIA_MAX", "10000"))
+# Reserva de uma requisição em andamento (protege contra worker que morreu no meio)
+IDEMPOTENCIA_TTL_EM_ANDAMENTO = int(os.getenv("IDEMPOTENCIA_TTL_EM_ANDAMENTO", "60"))
+# Quanto uma duplicata espera pela original antes de desistir com 409
+IDEMPOTENCIA_ESPERA = float(os.getenv("IDEMPOTENCIA_ESPERA", "30"))
+# Erros do cliente podem ser corrigidos e reenviados com a mesma chave
+IDEMPOTENCIA_TTL_4XX = int(os.getenv("IDEMPOTENCIA_TTL_4XX", "60"))
+# Maior resposta gravada (acima disso a chave é liberada) e maior corpo aceito
+IDEMPOTENCIA_CORPO_MAX = int(os.getenv("IDEMPOTENCIA_CORPO_MAX", str(1024 * 1024)))
+IDEMPOTENCIA_REQUISICAO_MAX = int(os.getenv("IDEMPOTENCIA_REQUISICAO_MAX", str(1024 * 1024)))
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+
+CABECALHO = "idempotency-key"
+EM_ANDAMENTO = "em_andamento"
+CONCLUIDA = "concluida"
+
+# Cabeçalhos que pertencem à requisição original e não são repetidos
+_CABECALHOS_NAO_GRAVADOS = {b"x-request-id", b"set-cookie", b"date", b"server"}
+
+
+# ============================================================
+#  BACKENDS
+# ============================================================
+
+class BackendMemoria:
+    """Registros em memória do processo, com TTL e limite de itens (LRU)."""
+
+    nome = "memoria"
+
+    def __init__(self, max_itens: int):
+        self.max_itens = max_itens
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _vivo(self, chave: str) -> Optional[dict]:
+        item = self._itens.get(chave)
+        if item is None:
+            return None
+        expira_em, registro = item
+        if expira_em <= time.monotonic():
+            del self._itens[chave]
+            return None
+        return registro
+
+    def _gravar(self, chave: str, registro: dict, ttl: int):
+        self._itens[chave] = (time.monotonic() + ttl, registro)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+
+    async def reservar(self, chave: str, registro: dict, ttl: int) -> Optional[dict]:
+        """Grava `registro` se a chave estiver livre (None) ou devolve o existente."""
+        with self._lock:
+            existente = self._vivo(chave)
+            if existente is not None:
+                return existente
+            self._gravar(chave, registro, ttl)
+            return None
+
+    async def salvar(self, chave: str, registro: dict, ttl: int):
+        with self._lock:
+            self._gravar(chave, registro, ttl)
+
+    async def obter(self, chave: str) -> Optional[dict]:
+        with self._lock:
+            return self._vivo(chave)
+
+    async def remover(self, chave: str):
+        with self._lock:
+            self._itens.pop(chave, None)
+
+
+class BackendRedis:
+    """Qualquer servidor que fale o protocolo Redis (SET NX EX / GET / DEL)."""
+
+    nome = "redis"
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.Redis.from_url(url, socket_timeout=1.0)
+
+    @staticmethod
+    def _k(chave: str) -> str:
+        return f"idem:{chave}"
 
-# Em produção → Redis
-CACHE = {}
+    async def reservar(self, chave: str, registro: dict, ttl: int) -> Optional[dict]:
+        if await self._redis.set(self._k(chave), json.dumps(registro), nx=True, ex=ttl):
+            return None
+        existente = await self.obter(chave)
+        # Expirou entre o SET e o GET: tenta reservar de novo
+        return existente if existente is not None else await self.reservar(chave, registro, ttl)
 
-def make_key(raw: str):
-    return hashlib.sha256(raw.encode()).hexdigest()
+    async def salvar(self, chave: str, registro: dict, ttl: int):
+        await self._redis.set(self._k(chave), json.dumps(registro), ex=ttl)
 
-def idempotent(route: str, user_id: str, idem_key: str):
+    async def obter(self, chave: str) -> Optional[dict]:
+        bruto = await self._redis.get(self._k(chave))
+        return json.loads(bruto) if bruto else None
+
+    async def remover(self, chave: str):
+        await self._redis.delete(self._k(chave))
+
+
+def criar_backend():
+    if IDEMPOTENCIA_BACKEND == "redis":
+        if importlib.util.find_spec("redis") is not None:
+            return BackendRedis(REDIS_URL)
+        logger.warning("idempotencia_redis_indisponivel", extra={"fallback": "memoria"})
+    return BackendMemoria(IDEMPOTENCIA_MAX)
+
+
+# ============================================================
+#  MIDDLEWARE
+# ============================================================
+
+def _ttl_resposta(status: Optional[int]) -> int:
+    """TTL do registro de uma resposta; 0 = não gravar."""
+    if status is None:
+        return 0
+    if 200 <= status < 300 or status == 409:
+        return IDEMPOTENCIA_TTL
+    if 400 <= status < 500:
+        return IDEMPOTENCIA_TTL_4XX
+    return 0
+
+
+def _hash(*partes: bytes) -> str:
+    h = hashlib.sha256()
+    for parte in partes:
+        h.update(parte)
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class IdempotenciaMiddleware:
     """
-    Retorna:
-    - resposta anterior (se já feita)
-    - ou chave gerada (se nova)
+    Middleware ASGI. `rotas` são os caminhos (POST) que honram o cabeçalho;
+    as demais requisições passam direto.
     """
-    key = make_key(f"{route}:{user_id}:{idem_key}")
 
-    if key in CACHE:
-        return CACHE[key]
+    def __init__(self, app, rotas: Iterable[str], backend=None):
+        self.app = app
+        self.rotas = frozenset(rotas)
+        self.backend = backend or criar_backend()
+        # Duplicatas no mesmo processo esperam por evento, sem polling
+        self._eventos = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.rotas:
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        chave_cliente = headers.get(CABECALHO.encode())
+        if not chave_cliente:
+            return await self.app(scope, receive, send)
+
+        corpo = await self._ler_corpo(receive, headers)
+        if corpo is None:
+            logger.warning("idempotencia_corpo_grande", extra={"path": scope["path"]})
+            return await self._erro(scope, receive, send, 413,
+                "Corpo da requisição grande demais.")
+        chave = _hash(
+            scope["method"].encode(), scope["path"].encode(),
+            headers.get(b"authorization", b""), chave_cliente,
+        )
+        impressao = _hash(corpo)
+
+        limite = time.monotonic() + IDEMPOTENCIA_ESPERA
+        while True:
+            existente = await self.backend.reservar(
+                chave, {"estado": EM_ANDAMENTO, "impressao": impressao}, IDEMPOTENCIA_TTL_EM_ANDAMENTO
+            )
+            if existente is None:
+                return await self._executar(scope, corpo, send, chave, impressao)
+
+            if existente.get("impressao") != impressao:
+                logger.warning("idempotencia_corpo_divergente", extra={"path": scope["path"]})
+                return await self._erro(scope, receive, send, 422,
+                    "Idempotency-Key já utilizada com outro corpo de requisição.")
+
+            if existente.get("estado") == CONCLUIDA:
+                logger.info("idempotencia_repetida", extra={"path": scope["path"]})
+                return await self._repetir(existente, send)
+
+            # Original em andamento: espera o resultado
+            registro = await self._aguardar(chave, limite)
+            if registro is not None and registro.get("estado") == CONCLUIDA:
+                logger.info("idempotencia_repetida", extra={"path": scope["path"], "aguardou": True})
+                return await self._repetir(registro, send)
+            if registro is None and time.monotonic() < limite:
+                # A original falhou e liberou a chave: esta requisição assume
+                continue
+
+            logger.warning("idempotencia_em_andamento", extra={"path": scope["path"]})
+            return await self._erro(scope, receive, send, 409,
+                "Requisição com esta Idempotency-Key ainda em processamento.", retry_after=1)
+
+    # --------------------------------------------------------
+
+    @staticmethod
+    async def _ler_corpo(receive, headers: dict) -> Optional[bytes]:
+        """Corpo completo, ou None se passar de IDEMPOTENCIA_REQUISICAO_MAX."""
+        try:
+            declarado = int(headers.get(b"content-length", b"0"))
+        except ValueError:
+            declarado = 0
+        if declarado > IDEMPOTENCIA_REQUISICAO_MAX:
+            return None
+
+        partes, tamanho = [], 0
+        while True:
+            mensagem = await receive()
+            if mensagem["type"] != "http.request":
+                break
+            parte = mensagem.get("body", b"")
+            tamanho += len(parte)
+            # Chunked (sem Content-Length): para de acumular ao passar do limite
+            if tamanho > IDEMPOTENCIA_REQUISICAO_MAX:
+                return None
+            partes.append(parte)
+            if not mensagem.get("more_body"):
+                break
+        return b"".join(partes)
+
+    async def _executar(self, scope, corpo, send, chave, impressao):
+        evento = self._eventos.setdefault(chave, asyncio.Event())
+        entregue = False
+
+        async def receive_corpo():
+            nonlocal entregue
+            if not entregue:
+                entregue = True
+                return {"type": "http.request", "body": corpo, "more_body": False}
+            return {"type": "http.disconnect"}
+
+        resposta = {"status": None, "headers": [], "corpo": [], "tamanho": 0}
+
+        async def send_capturando(mensagem):
+            if mensagem["type"] == "http.response.start":
+                resposta["status"] = mensagem["status"]
+                resposta["headers"] = [
+                    [k.decode("latin-1"), v.decode("latin-1")]
+                    for k, v in mensagem.get("headers", [])
+                    if k.lower() not in _CABECALHOS_NAO_GRAVADOS
+                ]
+            elif mensagem["type"] == "http.response.body":
+                parte = mensagem.get("body", b"")
+                resposta["tamanho"] += len(parte)
+                if resposta["tamanho"] <= IDEMPOTENCIA_CORPO_MAX:
+                    resposta["corpo"].append(parte)
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive_corpo, send_capturando)
+        except BaseException:
+            await self.backend.remover(chave)
+            raise
+        else:
+            status = resposta["status"]
+            ttl = _ttl_resposta(status)
+            if ttl > 0 and resposta["tamanho"] <= IDEMPOTENCIA_CORPO_MAX:
+                await self.backend.salvar(chave, {
+                    "estado": CONCLUIDA,
+                    "impressao": impressao,
+                    "status": status,
+                    "headers": resposta["headers"],
+                    "corpo": base64.b64encode(b"".join(resposta["corpo"])).decode(),
+                }, ttl)
+            else:
+                await self.backend.remover(chave)
+        finally:
+            evento.set()
+            self._eventos.pop(chave, None)
+
+    async def _aguardar(self, chave: str, limite: float) -> Optional[dict]:
+        evento = self._eventos.get(chave)
+        if evento is not None:
+            try:
+                await asyncio.wait_for(evento.wait(), timeout=max(0.0, limite - time.monotonic()))
+            except asyncio.TimeoutError:
+                pass
+            return await self.backend.obter(chave)
+
+        # Original em outro processo: consulta o backend até concluir ou liberar
+        while time.monotonic() < limite:
+            registro = await self.backend.obter(chave)
+            if registro is None or registro.get("estado") == CONCLUIDA:
+                return registro
+            await asyncio.sleep(0.1)
+        return await self.backend.obter(chave)
 
-    return key
+    @staticmethod
+    async def _repetir(registro: dict, send):
+        headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in registro["headers"]]
+        headers.append((b"idempotent-replayed", b"true"))
+        await send({"type": "http.response.start", "status": registro["status"], "headers": headers})
+        await send({"type": "http.response.body", "body": base64.b64decode(registro["corpo"])})
 
-def store_response(key, response):
-    CACHE[key] = response
\ No newline at end of file
+    @staticmethod
+    async def _erro(scope, receive, send, status_code: int, mensagem: str, retry_after: int = None):
+        resposta = JSONResponse(
+            status_code=status_code,
+            content={
+                "success": False,
+                "message": mensagem,
+                "request_id": scope.get("state", {}).get("request_id"),
+            },
+            headers={"Retry-After": str(retry_after)} if retry_after else None,
+        )
+        await resposta(scope, receive, send)
@@ -0,0 +1,62 @@
+# servico_comum/metrics.py
+import bisect
+import threading
+
+# Limites dos buckets em segundos (1ms .. 30s)
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+class LatencyHistogram:
+    """
+    Histograma de latência em memória, seguro para threads.
+    Percentis são estimados pelo limite superior do bucket.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        idx = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[idx] += 1
+            self._count += 1
+            self._sum += seconds
+            if seconds > self._max:
+                self._max = seconds
+
+    def _percentile(self, counts, total, maximo, q):
+        if not total:
+            return 0.0
+        target = q * total
+        acc = 0
+        for idx, n in enumerate(counts):
+            acc += n
+            if acc >= target:
+                limite = self.buckets[idx] if idx < len(self.buckets) else maximo
+                return min(limite, maximo)
+        return maximo
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total, soma, maximo = self._count, self._sum, self._max
+
+        buckets = {f"le_{b}": n for b, n in zip(self.buckets, counts)}
+        buckets["le_inf"] = counts[-1]
+        return {
+            "count": total,
+            "avg_ms": round(soma / total * 1000, 3) if total else 0.0,
+            "max_ms": round(maximo * 1000, 3),
+            "p50_ms": round(self._percentile(counts, total, maximo, 0.50) * 1000, 3),
+            "p95_ms": round(self._percentile(counts, total, maximo, 0.95) * 1000, 3),
+            "p99_ms": round(self._percentile(counts, total, maximo, 0.99) * 1000, 3),
+            "buckets": buckets,
+        }
@@ -0,0 +1,120 @@
+# servico_comum/migracoes.py
+
+"""
+Apoio às migrações Alembic dos serviços.
+
+Os três serviços usam o mesmo banco: cada um tem a sua tabela de versão
+(alembic_version_<servico>) e o autogenerate só olha as tabelas do
+próprio metadata.
+
+Índices em tabelas já povoadas são criados com CREATE INDEX CONCURRENTLY,
+fora da transação da migração, para não bloquear escritas durante o build.
+
+O entrypoint roda `alembic upgrade head` em cada réplica que sobe: as
+migrações de todos os serviços são serializadas por um pg_advisory_lock,
+e quem chega depois só encontra o banco já em head.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+
+from alembic import context, op
+from sqlalchemy import create_engine, inspect, pool, text
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# Um lock para os três serviços: as migrações de um leem tabelas dos outros
+LOCK_MIGRACOES = "sistema-eventos.migracoes"
+
+
+# ============================================================
+#  env.py
+# ============================================================
+
+def executar_migracoes(database_url: str, metadata, servico: str):
+    """Corpo do env.py: modo offline (--sql) ou conectado."""
+    tabelas = set(metadata.tables)
+
+    def _incluir(nome, tipo, *_):
+        # Tabelas dos outros serviços não aparecem no autogenerate
+        return tipo != "table" or nome in tabelas
+
+    opcoes = {
+        "target_metadata": metadata,
+        "version_table": f"alembic_version_{servico}",
+        "include_name": _incluir,
+    }
+
+    if context.is_offline_mode():
+        context.configure(
+            url=database_url,
+            literal_binds=True,
+            dialect_opts={"paramstyle": "named"},
+            **opcoes,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    connectable = create_engine(database_url, poolclass=pool.NullPool)
+    with _lock_migracoes(connectable), connectable.connect() as connection:
+        context.configure(connection=connection, **opcoes)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+@contextmanager
+def _lock_migracoes(connectable):
+    """
+    Segura o advisory lock das migrações em uma conexão à parte, ociosa e
+    em autocommit. Quem espera tenta de novo em vez de bloquear em
+    pg_advisory_lock: uma consulta bloqueada mantém um snapshot aberto, e o
+    CREATE INDEX CONCURRENTLY de quem tem o lock esperaria por ela (deadlock).
+    O lock é de sessão: cai junto com a conexão se o processo morrer.
+    """
+    with connectable.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        parametros = {"nome": LOCK_MIGRACOES}
+        if not conn.scalar(text("SELECT pg_try_advisory_lock(hashtext(:nome))"), parametros):
+            logger.info("Aguardando migrações em andamento em outro processo")
+            while not conn.scalar(text("SELECT pg_try_advisory_lock(hashtext(:nome))"), parametros):
+                time.sleep(1)
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(hashtext(:nome))"), parametros)
+
+
+# ============================================================
+#  OPERAÇÕES
+# ============================================================
+
+def tabelas_existentes() -> set:
+    """Tabelas já presentes no banco (vazio no modo offline: script para banco novo)."""
+    if context.is_offline_mode():
+        return set()
+    return set(inspect(op.get_bind()).get_table_names())
+
+
+def criar_indice_concorrente(nome: str, tabela: str, colunas, **kw):
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS. Um build concorrente que
+    falhou deixa o índice INVALID com o mesmo nome: ele é removido antes.
+    """
+    with op.get_context().autocommit_block():
+        if not context.is_offline_mode():
+            invalido = op.get_bind().execute(text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :nome AND NOT i.indisvalid"
+            ), {"nome": nome}).first()
+            if invalido:
+                op.drop_index(nome, table_name=tabela, postgresql_concurrently=True)
+        op.create_index(
+            nome, tabela, colunas,
+            postgresql_concurrently=True, if_not_exists=True, **kw,
+        )
+
+
+def remover_indice_concorrente(nome: str, tabela: str):
+    with op.get_context().autocommit_block():
+        op.drop_index(nome, table_name=tabela, postgresql_concurrently=True, if_exists=True)
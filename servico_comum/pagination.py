@@ -0,0 +1,53 @@
+# servico_comum/pagination.py
+from typing import Optional
+
+from fastapi import Query, Response
+
+MAX_LIMIT = 1000
+
+
+def filtro_prefixo(coluna, prefixo: str):
+    """LIKE 'prefixo%' com curingas escapados (usa índices *_pattern_ops)."""
+    escapado = (
+        prefixo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    )
+    return coluna.like(f"{escapado}%", escape="\\")
+
+
+class Paginacao:
+    """
+    Dependência de paginação por cursor (keyset): ?after_id=&limit=&incluir_total=
+
+    Sem `limit` a listagem continua completa (compatibilidade com clientes
+    antigos). O cursor da próxima página vai no header X-Next-After-Id e,
+    se solicitado, o total filtrado em X-Total-Count.
+    """
+
+    def __init__(
+        self,
+        after_id: Optional[int] = Query(None, ge=0, description="Retorna itens com id maior que este cursor."),
+        limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT, description="Tamanho da página."),
+        incluir_total: bool = Query(False, description="Inclui o total filtrado em X-Total-Count."),
+    ):
+        self.after_id = after_id
+        self.limit = limit
+        self.incluir_total = incluir_total
+
+    def preparar(self, query, coluna_id, response: Response):
+        """Aplica cursor/limite à query já filtrada, sem executá-la."""
+        if self.incluir_total:
+            response.headers["X-Total-Count"] = str(query.order_by(None).count())
+
+        if self.after_id is not None:
+            query = query.filter(coluna_id > self.after_id)
+        query = query.order_by(coluna_id)
+        if self.limit is not None:
+            query = query.limit(self.limit)
+        return query
+
+    def aplicar(self, query, coluna_id, response: Response):
+        """Executa a página e preenche o header do próximo cursor."""
+        itens = self.preparar(query, coluna_id, response).all()
+        if self.limit is not None and len(itens) == self.limit:
+            response.headers["X-Next-After-Id"] = str(itens[-1].id)
+        return itens
@@ -0,0 +1,52 @@
+# servico_comum/runtime.py
+
+"""
+Dimensionamento do processo: núcleos do container, workers web e
+tamanho dos pools de conexão a partir de um orçamento global.
+"""
+
+import os
+
+
+def cpus_disponiveis() -> int:
+    """Núcleos efetivos do container (afinidade + quota do cgroup v2)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, periodo = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(periodo))))
+    except (OSError, ValueError):
+        pass
+
+    return max(1, cpus)
+
+
+def workers_web() -> int:
+    """
+    Quantidade de processos web do serviço. O gunicorn_conf exporta
+    WEB_CONCURRENCY antes do fork; em desenvolvimento (uvicorn) é 1.
+    """
+    return max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+
+
+def dimensionar_pool(orcamento_padrao: int, fracao: float = 1.0):
+    """
+    Divide o orçamento global de conexões (DB_CONEXOES_MAX, somando todos
+    os workers do serviço) entre os workers. `fracao` reparte a cota de
+    um worker entre engines do mesmo processo (ex.: sync + async).
+    Retorna (pool_size, max_overflow).
+    """
+    orcamento = int(os.getenv("DB_CONEXOES_MAX", str(orcamento_padrao)))
+    por_worker = max(2, int(orcamento * fracao) // workers_web())
+    # ~1/3 fixas, o restante só sob pico (mesma proporção dos valores antigos)
+    pool_size = max(1, por_worker // 3)
+    return pool_size, por_worker - pool_size
+
+
+# Teste de conexão no import (fail-fast em desenvolvimento)
+TESTAR_CONEXAO = os.getenv("DB_TESTAR_CONEXAO", "1") == "1"
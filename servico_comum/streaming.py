@@ -0,0 +1,48 @@
+# servico_comum/streaming.py
+
+"""
+Exportação em streaming NDJSON (um objeto JSON por linha).
+
+Usado pelas leituras em massa (sync do app desktop): as linhas são lidas
+do Postgres com cursor no servidor (yield_per) e serializadas em blocos,
+então a memória fica limitada ao tamanho do bloco, não ao da tabela.
+"""
+
+import os
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_LOTE = int(os.getenv("STREAM_LOTE", "500"))
+
+
+def aceita_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def resposta_ndjson(query, session_factory, schema, response: Response = None, lote: int = STREAM_LOTE):
+    """
+    Transmite `query` (Query ORM já filtrada/ordenada) como NDJSON.
+
+    A query é reexecutada em uma sessão própria, aberta e fechada pelo
+    gerador: a sessão da requisição pode ser encerrada antes do fim do envio.
+    Headers X-* já definidos em `response` (ex.: X-Total-Count) são repassados.
+    """
+    headers = {}
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k.lower().startswith("x-")}
+
+    def gerar():
+        with session_factory() as db:
+            linhas = []
+            # yield_per ativa stream_results: o psycopg2 usa cursor nomeado no servidor
+            for obj in query.with_session(db).yield_per(lote):
+                linhas.append(schema.model_validate(obj).model_dump_json())
+                if len(linhas) >= lote:
+                    yield "\n".join(linhas) + "\n"
+                    linhas.clear()
+            if linhas:
+                yield "\n".join(linhas) + "\n"
+
+    return StreamingResponse(gerar(), media_type=NDJSON_MEDIA_TYPE, headers=headers)
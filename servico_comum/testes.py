@@ -0,0 +1,91 @@
+# servico_comum/testes.py
+
+"""
+Apoio aos conftests dos serviços.
+
+Os serviços têm módulos homônimos (models, database...). Com a suíte de
+mais de um serviço no mesmo processo, o pytest carrega todos os conftests
+antes de coletar: cada serviço reativa os seus módulos ao coletar o seu
+diretório e ao rodar os seus testes. No conftest do serviço:
+
+    servico = ServicoEmTeste(SRC)
+    servico.ativar()
+    pytest_collect_file, pytest_itemcollected, _servico_ativo = servico.ganchos()
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parents[1]
+
+MODULOS_LOCAIS = ("models", "database", "schemas", "security", "main", "auth", "routers", "services")
+_SRCS = {str(p) for p in RAIZ.glob("servico_*/src")}
+
+
+def configurar_banco(url: Optional[str] = None):
+    """
+    Preenche POSTGRES_* a partir da URL de testes (TESTES_DATABASE_URL).
+    Sem ela, database.py só exige as variáveis definidas: os engines só
+    conectam sob demanda.
+    """
+    if url:
+        partes = urlparse(url)
+        os.environ.update({
+            "POSTGRES_USER": partes.username or "",
+            "POSTGRES_PASSWORD": partes.password or "",
+            "POSTGRES_DB": partes.path.lstrip("/"),
+            "POSTGRES_HOST": partes.hostname or "localhost",
+            "POSTGRES_PORT": str(partes.port or 5432),
+        })
+    else:
+        for var in ("POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+            os.environ.setdefault(var, "teste")
+    os.environ.setdefault("DB_TESTAR_CONEXAO", "0")
+
+
+class ServicoEmTeste:
+    """Módulos de um serviço (src/) guardados e reativados em sys.modules."""
+
+    def __init__(self, src: Path):
+        self.src = str(src)
+        self._modulos = {}
+
+    def _do_servico(self, modulo) -> bool:
+        # `services` não tem __init__: pacote de namespace, só com __path__
+        caminhos = [getattr(modulo, "__file__", None), *getattr(modulo, "__path__", [])]
+        return any(c and str(c).startswith(self.src) for c in caminhos)
+
+    def guardar(self):
+        for nome, modulo in list(sys.modules.items()):
+            if nome.split(".")[0] in MODULOS_LOCAIS and self._do_servico(modulo):
+                self._modulos[nome] = modulo
+
+    def ativar(self):
+        self.guardar()
+        for nome in list(sys.modules):
+            if nome.split(".")[0] in MODULOS_LOCAIS:
+                del sys.modules[nome]
+        sys.modules.update(self._modulos)
+        sys.path[:] = [c for c in sys.path if c not in _SRCS and c != str(RAIZ)]
+        sys.path[:0] = [self.src, str(RAIZ)]
+
+    def ganchos(self) -> tuple:
+        """Hooks e fixture a expor no conftest com estes nomes."""
+
+        def pytest_collect_file(file_path, parent):
+            self.ativar()
+
+        def pytest_itemcollected(item):
+            # Antes que a coleta do próximo serviço tire estes módulos do cache
+            self.guardar()
+
+        @pytest.fixture(autouse=True, scope="module")
+        def _servico_ativo():
+            self.ativar()
+
+        return pytest_collect_file, pytest_itemcollected, _servico_ativo
@@ -0,0 +1,14 @@
+# servico_comum/tests/conftest.py
+
+"""
+Testes da biblioteca compartilhada:
+
+    python -m pytest -q servico_comum/tests
+"""
+
+import sys
+from pathlib import Path
+
+RAIZ = str(Path(__file__).resolve().parents[2])
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
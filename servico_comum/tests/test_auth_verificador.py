@@ -0,0 +1,104 @@
+# servico_comum/tests/test_auth_verificador.py
+
+"""Cache de JWTs verificados: hits, expiração, LRU e checagem do emissor."""
+
+import time
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+import servico_comum.auth as auth
+from servico_comum.auth import VerificadorToken
+
+SEGREDO = "segredo-de-teste"
+
+
+def _token(iss="sistema-eventos", exp_em=3600, segredo=SEGREDO, **claims):
+    payload = {"sub": "ana", "roles": ["participante"], "exp": int(time.time()) + exp_em, **claims}
+    if iss is not None:
+        payload["iss"] = iss
+    return jwt.encode(payload, segredo, algorithm="HS256")
+
+
+@pytest.fixture
+def verificador():
+    return VerificadorToken(SEGREDO, "HS256", {"sistema-eventos", "servico-usuarios"}, max_itens=2)
+
+
+def test_segunda_verificacao_vem_do_cache(verificador):
+    token = _token()
+
+    primeiro = verificador.verificar(token)
+    primeiro["roles"] = ["admin"]
+    segundo = verificador.verificar(token)
+
+    # Quem chama recebe uma cópia: alterar o dict não contamina o cache
+    assert segundo["roles"] == ["participante"]
+    stats = verificador.estatisticas()
+    assert (stats["hits"], stats["misses"], stats["itens"]) == (1, 1, 1)
+
+
+def test_item_expirado_sai_do_cache_e_o_token_e_verificado_de_novo(verificador, monkeypatch):
+    token = _token(exp_em=60)
+    verificador.verificar(token)
+
+    agora = time.time()
+    monkeypatch.setattr(auth.time, "time", lambda: agora + 120)
+    verificador.verificar(token)
+
+    stats = verificador.estatisticas()
+    assert (stats["hits"], stats["misses"]) == (0, 2)
+
+
+def test_token_expirado_e_recusado(verificador):
+    with pytest.raises(HTTPException) as erro:
+        verificador.verificar(_token(exp_em=-10))
+    assert erro.value.status_code == 401
+    assert verificador.estatisticas()["itens"] == 0
+
+
+def test_lru_descarta_o_menos_usado(verificador):
+    a, b, c = _token(sub="a"), _token(sub="b"), _token(sub="c")
+    verificador.verificar(a)
+    verificador.verificar(b)
+    verificador.verificar(a)  # `a` passa a ser o mais recente
+    verificador.verificar(c)  # estoura max_itens=2: sai `b`
+
+    verificador.verificar(a)
+    verificador.verificar(b)
+    stats = verificador.estatisticas()
+    assert stats["itens"] == 2
+    assert (stats["hits"], stats["misses"]) == (2, 4)
+
+
+def test_emissor_antigo_da_lista_e_aceito(verificador):
+    assert verificador.verificar(_token(iss="servico-usuarios"))["sub"] == "ana"
+
+
+@pytest.mark.parametrize("iss", ["outro-sistema", None])
+def test_emissor_desconhecido_ou_ausente_e_recusado_e_nao_entra_no_cache(verificador, iss):
+    token = _token(iss=iss)
+    for _ in range(2):
+        with pytest.raises(HTTPException) as erro:
+            verificador.verificar(token)
+        assert erro.value.status_code == 401
+
+    stats = verificador.estatisticas()
+    assert (stats["hits"], stats["misses"], stats["invalidos"], stats["itens"]) == (0, 2, 2, 0)
+
+
+def test_assinatura_invalida_e_recusada(verificador):
+    with pytest.raises(HTTPException) as erro:
+        verificador.verificar(_token(segredo="outro-segredo"))
+    assert erro.value.status_code == 401
+    assert erro.value.headers == {"WWW-Authenticate": "Bearer"}
+
+
+def test_create_access_token_usa_o_emissor_padrao(monkeypatch):
+    monkeypatch.setattr(auth, "JWT_SECRET", SEGREDO)
+    token = auth.create_access_token("ana", roles=["admin"], extra_claims={"user_id": 7})
+
+    v = VerificadorToken(SEGREDO, "HS256", auth.JWT_ISSUERS_VALIDOS, max_itens=10)
+    payload = v.verificar(token)
+    assert (payload["iss"], payload["roles"], payload["user_id"]) == ("sistema-eventos", ["admin"], 7)
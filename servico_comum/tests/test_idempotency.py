@@ -0,0 +1,109 @@
+# servico_comum/tests/test_idempotency.py
+
+"""IdempotenciaMiddleware: quais respostas são gravadas e limite do corpo."""
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+import servico_comum.idempotency as idem
+from servico_comum.idempotency import BackendMemoria, IdempotenciaMiddleware
+
+
+class BackendEspiao(BackendMemoria):
+    """Memória que registra o TTL de cada resposta gravada."""
+
+    def __init__(self):
+        super().__init__(max_itens=100)
+        self.ttls = []
+
+    async def salvar(self, chave, registro, ttl):
+        self.ttls.append((registro["status"], ttl))
+        await super().salvar(chave, registro, ttl)
+
+
+@pytest.fixture
+def cenario():
+    app = FastAPI()
+    execucoes = []
+
+    @app.post("/acao")
+    async def acao(request: Request):
+        corpo = await request.json()
+        execucoes.append(corpo)
+        return JSONResponse({"execucao": len(execucoes)}, status_code=corpo.get("status", 201))
+
+    backend = BackendEspiao()
+    app.add_middleware(IdempotenciaMiddleware, rotas=["/acao"], backend=backend)
+    return TestClient(app), execucoes, backend
+
+
+def _post(client, corpo, chave="k1", **kw):
+    return client.post("/acao", json=corpo, headers={"Idempotency-Key": chave}, **kw)
+
+
+@pytest.mark.parametrize("status", [201, 409])
+def test_resultado_definitivo_fica_pelo_ttl_completo(cenario, status):
+    client, execucoes, backend = cenario
+
+    primeira = _post(client, {"status": status})
+    repetida = _post(client, {"status": status})
+
+    assert (primeira.status_code, repetida.status_code) == (status, status)
+    assert repetida.headers["idempotent-replayed"] == "true"
+    assert repetida.json() == primeira.json()
+    assert len(execucoes) == 1
+    assert backend.ttls == [(status, idem.IDEMPOTENCIA_TTL)]
+
+
+def test_outros_4xx_ficam_por_ttl_curto(cenario):
+    client, execucoes, backend = cenario
+
+    _post(client, {"status": 404})
+    assert backend.ttls == [(404, idem.IDEMPOTENCIA_TTL_4XX)]
+
+
+def test_4xx_nao_e_gravado_com_ttl_zero(cenario, monkeypatch):
+    client, execucoes, backend = cenario
+    monkeypatch.setattr(idem, "IDEMPOTENCIA_TTL_4XX", 0)
+
+    _post(client, {"status": 422})
+    assert _post(client, {"status": 422}).headers.get("idempotent-replayed") is None
+    assert len(execucoes) == 2
+    assert backend.ttls == []
+
+
+@pytest.mark.parametrize("status", [500, 302])
+def test_5xx_e_outros_codigos_liberam_a_chave(cenario, status):
+    client, execucoes, backend = cenario
+
+    _post(client, {"status": status}, follow_redirects=False)
+    _post(client, {"status": status}, follow_redirects=False)
+    assert len(execucoes) == 2
+    assert backend.ttls == []
+
+
+def test_corpo_acima_do_limite_e_413_sem_executar(cenario, monkeypatch):
+    client, execucoes, backend = cenario
+    monkeypatch.setattr(idem, "IDEMPOTENCIA_REQUISICAO_MAX", 64)
+
+    resposta = _post(client, {"status": 201, "dados": "x" * 100})
+    assert resposta.status_code == 413
+    assert execucoes == []
+
+    # Sem Content-Length (chunked): o limite vale na leitura
+    def pedacos():
+        yield b'{"status": 201, "dados": "'
+        yield b"x" * 100
+        yield b'"}'
+
+    resposta = client.post(
+        "/acao", content=pedacos(),
+        headers={"Idempotency-Key": "k2", "Content-Type": "application/json"},
+    )
+    assert resposta.status_code == 413
+    assert execucoes == []
+
+    # Sem a chave o middleware não lê o corpo: a rota decide
+    assert client.post("/acao", json={"status": 201, "dados": "x" * 100}).status_code == 201
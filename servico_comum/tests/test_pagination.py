@@ -0,0 +1,107 @@
+# servico_comum/tests/test_pagination.py
+
+"""Cursor keyset (after_id/limit), headers de paginação e filtro por prefixo."""
+
+import pytest
+from fastapi import Response
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import DeclarativeBase, Session
+
+from servico_comum.pagination import Paginacao, filtro_prefixo
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Item(Base):
+    __tablename__ = "itens"
+    id = Column(Integer, primary_key=True)
+    nome = Column(String(50))
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as sessao:
+        # ids fora de ordem de inserção e com buracos
+        sessao.add_all(Item(id=i, nome=f"item{i}") for i in (7, 3, 12, 1, 9, 4, 15))
+        sessao.add_all([
+            Item(id=20, nome="50%_off"),
+            Item(id=21, nome="50xyoff"),
+            Item(id=22, nome="a\\b"),
+        ])
+        sessao.commit()
+        yield sessao
+
+
+def _pagina(after_id=None, limit=None, incluir_total=False):
+    return Paginacao(after_id=after_id, limit=limit, incluir_total=incluir_total)
+
+
+def _todas_as_paginas(db, limit):
+    ids, cursores, after_id = [], [], None
+    while True:
+        response = Response()
+        itens = _pagina(after_id, limit).aplicar(db.query(Item), Item.id, response)
+        ids.extend(i.id for i in itens)
+        after_id = response.headers.get("X-Next-After-Id")
+        if after_id is None:
+            return ids, cursores
+        cursores.append(after_id)
+        after_id = int(after_id)
+
+
+def test_percorre_tudo_em_ordem_sem_repetir(db):
+    ids, cursores = _todas_as_paginas(db, limit=3)
+
+    assert ids == [1, 3, 4, 7, 9, 12, 15, 20, 21, 22]
+    # O cursor é o id do último item de cada página cheia
+    assert cursores == ["4", "12", "21"]
+
+
+def test_ultima_pagina_incompleta_nao_tem_cursor(db):
+    response = Response()
+    itens = _pagina(after_id=20, limit=5).aplicar(db.query(Item), Item.id, response)
+
+    assert [i.id for i in itens] == [21, 22]
+    assert "X-Next-After-Id" not in response.headers
+
+
+def test_pagina_cheia_no_fim_aponta_para_pagina_vazia(db):
+    response = Response()
+    _pagina(after_id=15, limit=3).aplicar(db.query(Item), Item.id, response)
+    assert response.headers["X-Next-After-Id"] == "22"
+
+    response = Response()
+    assert _pagina(after_id=22, limit=3).aplicar(db.query(Item), Item.id, response) == []
+    assert "X-Next-After-Id" not in response.headers
+
+
+def test_sem_limit_lista_tudo_como_antes(db):
+    response = Response()
+    itens = _pagina().aplicar(db.query(Item), Item.id, response)
+
+    assert len(itens) == 10
+    assert "X-Next-After-Id" not in response.headers
+    assert "X-Total-Count" not in response.headers
+
+
+def test_total_conta_o_filtro_e_ignora_o_cursor(db):
+    response = Response()
+    query = db.query(Item).filter(Item.id < 20)
+    itens = _pagina(after_id=4, limit=2, incluir_total=True).aplicar(query, Item.id, response)
+
+    assert [i.id for i in itens] == [7, 9]
+    assert response.headers["X-Total-Count"] == "7"
+
+
+def test_filtro_prefixo_escapa_curingas(db):
+    def nomes(prefixo):
+        return sorted(i.nome for i in db.query(Item).filter(filtro_prefixo(Item.nome, prefixo)))
+
+    assert nomes("50%") == ["50%_off"]
+    assert nomes("50%_") == ["50%_off"]
+    assert nomes("a\\") == ["a\\b"]
+    assert nomes("item1") == ["item1", "item12", "item15"]
@@ -0,0 +1,145 @@
+# servico_eventos/benchmarks/bench_checkin_engines.py
+
+"""
+Check-ins por QR Code por segundo em UM processo: engine síncrono
+(psycopg2, chamadas bloqueando o event loop, como as rotas async faziam
+antes do AsyncEngine) versus engine assíncrono (asyncpg).
+
+Os dois modos executam o mesmo comando de check-in (services.checkin)
+para participantes distintos de um evento criado pelo script, com N
+"requisições" concorrentes no mesmo loop. Precisa de um Postgres local
+com as migrações aplicadas (alembic upgrade head):
+
+    POSTGRES_USER=postgres POSTGRES_PASSWORD=postgres POSTGRES_DB=eventos_bench \\
+    POSTGRES_HOST=localhost python servico_eventos/benchmarks/bench_checkin_engines.py \\
+        --checkins 2000 --concorrencia 50
+
+O evento, as inscrições, presenças, contadores e tarefas de outbox criados
+são removidos ao final.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path[:0] = [str(Path(__file__).resolve().parents[1] / "src"), str(Path(__file__).resolve().parents[2])]
+os.environ.setdefault("DB_TESTAR_CONEXAO", "0")
+
+from sqlalchemy import delete, text
+
+import models
+from database import engine, async_engine
+from services.checkin import _comando_checkin, checkin_por_token, tokens_checkin
+
+# Ids fora da faixa dos usuários reais
+USUARIO_BASE = 900_000_000
+
+
+class Participante:
+
+    def __init__(self, indice: int):
+        self.id = USUARIO_BASE + indice
+        self.username = f"bench{indice}"
+        self.email = f"bench{indice}@exemplo.com"
+        self.full_name = None
+
+
+def criar_evento() -> tuple:
+    with engine.begin() as conn:
+        evento_id = conn.execute(
+            models.Evento.__table__.insert()
+            .values(nome=f"bench-checkin-{uuid.uuid4().hex[:8]}", data_evento=datetime.now(timezone.utc))
+            .returning(models.Evento.id)
+        ).scalar_one()
+        token = str(uuid.uuid4())
+        conn.execute(models.CheckinToken.__table__.insert().values(
+            token=token, evento_id=evento_id, is_active=True,
+            data_expiracao=datetime.now(timezone.utc) + timedelta(hours=1),
+        ))
+    return evento_id, token
+
+
+def remover_evento(evento_id: int):
+    I, P, O = models.Inscricao, models.Presenca, models.TarefaOutbox
+    with engine.begin() as conn:
+        ids = [i for (i,) in conn.execute(I.__table__.select().with_only_columns(I.id).where(I.evento_id == evento_id))]
+        if ids:
+            conn.execute(delete(O).where(text("(payload->>'inscricao_id')::int = ANY(:ids)")), {"ids": ids})
+        conn.execute(delete(P).where(P.evento_id == evento_id))
+        conn.execute(delete(I).where(I.evento_id == evento_id))
+        conn.execute(delete(models.CheckinToken).where(models.CheckinToken.evento_id == evento_id))
+        # contadores_evento / checkins_por_minuto: ON DELETE CASCADE
+        conn.execute(delete(models.Evento).where(models.Evento.id == evento_id))
+
+
+def _checkin_sincrono(evento_id: int, participante, origem: str):
+    """O mesmo comando, pelo engine síncrono e bloqueando o loop."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        return conn.execute(_comando_checkin(evento_id, participante, origem)).first()
+
+
+async def rodar(modo: str, total: int, concorrencia: int) -> dict:
+    evento_id, token = criar_evento()
+    participantes = [Participante(i) for i in range(total)]
+    origem = models.PresencaOrigem.QR_CODE.value
+    limite = asyncio.Semaphore(concorrencia)
+    latencias = []
+
+    async def um_checkin(participante):
+        async with limite:
+            inicio = time.perf_counter()
+            if modo == "async":
+                resultado = await checkin_por_token(token, participante, origem)
+            else:
+                resultado = _checkin_sincrono(evento_id, participante, origem)
+                await asyncio.sleep(0)  # devolve o loop, como ao fim de um handler
+            latencias.append(time.perf_counter() - inicio)
+            assert resultado is not None
+
+    try:
+        # Aquece pools e o cache de tokens fora da medição
+        await um_checkin(Participante(total))
+        latencias.clear()
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(um_checkin(p) for p in participantes))
+        duracao = time.perf_counter() - inicio
+    finally:
+        remover_evento(evento_id)
+        tokens_checkin.invalidar_evento(evento_id)
+
+    latencias.sort()
+    return {
+        "modo": modo,
+        "checkins": total,
+        "concorrencia": concorrencia,
+        "checkins_por_s": round(total / duracao, 1),
+        "p50_ms": round(statistics.median(latencias) * 1000, 2),
+        "p95_ms": round(latencias[int(len(latencias) * 0.95) - 1] * 1000, 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--checkins", type=int, default=1000)
+    parser.add_argument("--concorrencia", type=int, default=50)
+    parser.add_argument("--modo", choices=["sync", "async", "ambos"], default="ambos")
+    args = parser.parse_args()
+
+    modos = ["sync", "async"] if args.modo == "ambos" else [args.modo]
+    try:
+        for modo in modos:
+            print(await rodar(modo, args.checkins, args.concorrencia))
+    finally:
+        await async_engine.dispose()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
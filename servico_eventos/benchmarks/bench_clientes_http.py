@@ -0,0 +1,105 @@
+# servico_eventos/benchmarks/bench_clientes_http.py
+
+"""
+Latência das chamadas entre serviços contra um servidor stub local:
+um httpx.AsyncClient novo por chamada (conexão + handshake a cada vez,
+como antes) versus o ClienteServico compartilhado com keep-alive.
+
+    python servico_eventos/benchmarks/bench_clientes_http.py --chamadas 2000 --concorrencia 20
+
+O stub (uvicorn em uma thread, porta livre em 127.0.0.1) responde como
+o serviço de notificações; nenhum serviço real é necessário.
+"""
+
+import argparse
+import asyncio
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path[:0] = [str(Path(__file__).resolve().parents[1] / "src"), str(Path(__file__).resolve().parents[2])]
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from services.integracao import ClienteServico
+
+stub = FastAPI()
+
+
+@stub.post("/emails", status_code=202)
+async def receber_email(payload: dict):
+    return {"status": "enfileirado"}
+
+
+def subir_stub() -> tuple:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        porta = s.getsockname()[1]
+    servidor = uvicorn.Server(uvicorn.Config(stub, host="127.0.0.1", port=porta, log_level="warning"))
+    thread = threading.Thread(target=servidor.run, daemon=True)
+    thread.start()
+    while not servidor.started:
+        time.sleep(0.05)
+    return servidor, thread, f"http://127.0.0.1:{porta}"
+
+
+async def medir(chamada, total: int, concorrencia: int) -> dict:
+    limite = asyncio.Semaphore(concorrencia)
+    latencias = []
+
+    async def uma():
+        async with limite:
+            inicio = time.perf_counter()
+            resposta = await chamada()
+            latencias.append(time.perf_counter() - inicio)
+            resposta.raise_for_status()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(uma() for _ in range(total)))
+    duracao = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "chamadas_por_s": round(total / duracao, 1),
+        "p50_ms": round(statistics.median(latencias) * 1000, 2),
+        "p95_ms": round(latencias[int(len(latencias) * 0.95) - 1] * 1000, 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--chamadas", type=int, default=1000)
+    parser.add_argument("--concorrencia", type=int, default=20)
+    args = parser.parse_args()
+
+    servidor, thread, base_url = subir_stub()
+    payload = {"tipo": "checkin", "destinatario": "bench@exemplo.com"}
+    try:
+        async def cliente_novo():
+            async with httpx.AsyncClient(base_url=base_url, timeout=3.0) as client:
+                return await client.post("/emails", json=payload)
+
+        compartilhado = ClienteServico("stub", base_url, timeout=3.0)
+
+        async def cliente_compartilhado():
+            return await compartilhado.post("/emails", json=payload)
+
+        # Aquecimento: stub, imports e o pool do cliente compartilhado
+        await medir(cliente_compartilhado, args.concorrencia, args.concorrencia)
+
+        print({"modo": "cliente_por_chamada", **await medir(cliente_novo, args.chamadas, args.concorrencia)})
+        print({"modo": "compartilhado", **await medir(cliente_compartilhado, args.chamadas, args.concorrencia)})
+        print({"histograma_compartilhado": compartilhado.estatisticas()["latencia"]})
+        await compartilhado.encerrar()
+    finally:
+        servidor.should_exit = True
+        thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
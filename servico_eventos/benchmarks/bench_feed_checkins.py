@@ -0,0 +1,118 @@
+# servico_eventos/benchmarks/bench_feed_checkins.py
+
+"""
+Capacidade do feed de check-ins ao vivo (FeedCheckins) em UM worker:
+quantos painéis SSE um event loop sustenta a uma taxa de check-ins.
+
+Para cada nível de assinantes, abre N streams (stream_sse, consumidos no
+mesmo loop como o servidor ASGI faria), publica check-ins no ritmo pedido
+durante alguns segundos e informa a latência de publicar(), a latência
+até o painel ler o quadro, o atraso acumulado em relação ao ritmo pedido
+(loop saturado) e quantos assinantes foram descartados por fila cheia:
+
+    python servico_eventos/benchmarks/bench_feed_checkins.py \\
+        --niveis 100 500 1000 2000 5000 --checkins-por-s 50 --duracao 5
+
+Backend local (fan-out no processo), sem banco nem rede: o número mede o
+custo do fan-out e dos geradores SSE, não o envio pelos sockets.
+--lentos simula painéis que levam esse tempo para processar cada quadro.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path[:0] = [str(Path(__file__).resolve().parents[1] / "src"), str(Path(__file__).resolve().parents[2])]
+os.environ.setdefault("DB_TESTAR_CONEXAO", "0")
+# O backend local nunca conecta; database.py só exige as variáveis definidas
+for _var in ("POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+    os.environ.setdefault(_var, "bench")
+
+import services.feed_checkins as modulo
+from services.feed_checkins import FEED_CHECKINS_FILA, FeedCheckins, evento_checkin, stream_sse
+
+EVENTO = 1
+
+
+def percentil(valores: list, p: float) -> float:
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[max(int(len(valores) * p) - 1, 0)]
+
+
+async def painel(assinante, publicados: dict, entregas: list, atraso: float):
+    """Lê o stream como o painel e anota quanto cada quadro levou para chegar."""
+    async for quadro in stream_sse(assinante, keepalive=60):
+        if not quadro.startswith("id: "):
+            continue
+        presenca_id = int(quadro[4:quadro.index("\n")])
+        entregas.append(time.perf_counter() - publicados[presenca_id])
+        if atraso:
+            await asyncio.sleep(atraso)
+
+
+async def rodar(assinantes: int, taxa: float, duracao: float, fila: int, lentos: float) -> dict:
+    feed = FeedCheckins("local", tamanho_fila=fila, max_assinantes=assinantes)
+    # stream_sse libera a assinatura no singleton do módulo
+    modulo.feed_checkins = feed
+
+    publicados, entregas, latencias = {}, [], []
+    paineis = [
+        asyncio.create_task(painel(feed.assinar(EVENTO), publicados, entregas, lentos))
+        for _ in range(assinantes)
+    ]
+    await asyncio.sleep(0.1)  # todos os streams abertos e esperando
+
+    total = int(taxa * duracao)
+    intervalo = 1 / taxa
+    inicio = time.perf_counter()
+    for presenca_id in range(1, total + 1):
+        # Horários fixos: se o loop atrasou, publica logo em seguida para recuperar o ritmo
+        alvo = inicio + (presenca_id - 1) * intervalo
+        await asyncio.sleep(max(alvo - time.perf_counter(), 0))
+        publicados[presenca_id] = time.perf_counter()
+        await feed.publicar([evento_checkin(presenca_id, presenca_id, presenca_id, EVENTO, "qrcode", None)])
+        latencias.append(time.perf_counter() - publicados[presenca_id])
+    atraso_publicacao = time.perf_counter() - inicio - (total - 1) * intervalo
+
+    # Dá tempo de os painéis esvaziarem as filas antes de encerrar
+    await asyncio.sleep(min(1.0, duracao))
+    await feed.encerrar()
+    await asyncio.gather(*paineis, return_exceptions=True)
+
+    stats = feed.estatisticas()
+    return {
+        "assinantes": assinantes,
+        "checkins": total,
+        "publicar_p50_ms": round(statistics.median(latencias) * 1000, 3),
+        "publicar_p95_ms": round(percentil(latencias, 0.95) * 1000, 3),
+        "entrega_p50_ms": round(statistics.median(entregas) * 1000, 2) if entregas else None,
+        "entrega_p95_ms": round(percentil(entregas, 0.95) * 1000, 2),
+        "atraso_ritmo_ms": round(max(atraso_publicacao, 0) * 1000, 1),
+        "esperados": total * assinantes,
+        "enfileirados": stats["entregues"],
+        "lidos": len(entregas),
+        "descartados": stats["descartados"],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--niveis", type=int, nargs="+", default=[100, 500, 1000, 2000])
+    parser.add_argument("--checkins-por-s", type=float, default=50)
+    parser.add_argument("--duracao", type=float, default=5, help="Segundos de publicação por nível.")
+    parser.add_argument("--fila", type=int, default=FEED_CHECKINS_FILA)
+    parser.add_argument("--lentos", type=float, default=0, help="Segundos por quadro em cada painel.")
+    args = parser.parse_args()
+
+    for assinantes in args.niveis:
+        print(await rodar(assinantes, args.checkins_por_s, args.duracao, args.fila, args.lentos))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
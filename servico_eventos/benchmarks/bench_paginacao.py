@@ -0,0 +1,120 @@
+# servico_eventos/benchmarks/bench_paginacao.py
+
+"""
+Latência de GET /admin/inscricoes?evento_id= em uma tabela grande: a
+listagem completa (sem `limit`, como os clientes antigos) versus páginas
+por cursor (after_id/limit), cada uma com e sem incluir_total.
+
+O script semeia N inscrições em um evento próprio (um INSERT ... SELECT
+generate_series) e chama a rota como o FastAPI chamaria, serializando o
+resultado pelo response_model. A página "profunda" começa no meio do
+evento, para mostrar que o custo do cursor não cresce com o deslocamento.
+Precisa de um Postgres local com as migrações aplicadas (alembic upgrade head):
+
+    POSTGRES_USER=postgres POSTGRES_PASSWORD=postgres POSTGRES_DB=eventos_bench \\
+    POSTGRES_HOST=localhost python servico_eventos/benchmarks/bench_paginacao.py \\
+        --linhas 200000 --limit 100 --repeticoes 20
+
+O evento e as inscrições criados são removidos ao final.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path[:0] = [str(Path(__file__).resolve().parents[1] / "src"), str(Path(__file__).resolve().parents[2])]
+os.environ.setdefault("DB_TESTAR_CONEXAO", "0")
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import text
+
+import schemas
+from bench_checkin_engines import USUARIO_BASE, criar_evento, remover_evento
+from database import SessionLocal, engine
+from routers.inscricoes import listar_todas_inscricoes_admin
+from servico_comum.pagination import Paginacao
+
+RESPOSTA = TypeAdapter(List[schemas.Inscricao])
+
+
+def semear(total: int) -> tuple:
+    """Evento com `total` inscrições; devolve (evento_id, id do meio)."""
+    evento_id, _ = criar_evento()
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO inscricoes (usuario_id, evento_id, usuario_username, status) "
+            "SELECT :base + g, :evento_id, 'bench' || g, 'ATIVA' FROM generate_series(1, :total) g"
+        ), {"base": USUARIO_BASE, "evento_id": evento_id, "total": total})
+        meio = conn.execute(text(
+            "SELECT id FROM inscricoes WHERE evento_id = :evento_id ORDER BY id OFFSET :offset LIMIT 1"
+        ), {"evento_id": evento_id, "offset": total // 2}).scalar_one()
+        conn.execute(text("ANALYZE inscricoes"))
+    return evento_id, meio
+
+
+def listar(evento_id: int, pagina: Paginacao) -> tuple:
+    """Uma requisição: consulta + serialização, como o FastAPI faria."""
+    db = SessionLocal()
+    try:
+        response = Response()
+        itens = listar_todas_inscricoes_admin(
+            Request({"type": "http", "headers": []}), response,
+            evento_id=evento_id, status=None, username=None,
+            data_inicio=None, data_fim=None, since=None,
+            pagina=pagina, db=db, admin=None,
+        )
+        corpo = RESPOSTA.dump_json(itens)
+        return len(itens), len(corpo)
+    finally:
+        db.close()
+
+
+def medir(evento_id: int, pagina: Paginacao, repeticoes: int) -> dict:
+    listar(evento_id, pagina)  # aquece cache de planos e páginas do Postgres
+    latencias = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        itens, tamanho = listar(evento_id, pagina)
+        latencias.append(time.perf_counter() - inicio)
+    latencias.sort()
+    return {
+        "itens": itens,
+        "kb": round(tamanho / 1024, 1),
+        "p50_ms": round(statistics.median(latencias) * 1000, 2),
+        "p95_ms": round(latencias[max(int(len(latencias) * 0.95) - 1, 0)] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--linhas", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeticoes", type=int, default=10)
+    args = parser.parse_args()
+
+    evento_id, meio = semear(args.linhas)
+    cenarios = [
+        ("completa", None, None),
+        ("primeira_pagina", None, args.limit),
+        ("pagina_profunda", meio, args.limit),
+    ]
+    try:
+        for nome, after_id, limit in cenarios:
+            for incluir_total in (False, True):
+                pagina = Paginacao(after_id=after_id, limit=limit, incluir_total=incluir_total)
+                print({
+                    "modo": nome, "linhas": args.linhas, "incluir_total": incluir_total,
+                    **medir(evento_id, pagina, args.repeticoes),
+                })
+    finally:
+        remover_evento(evento_id)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
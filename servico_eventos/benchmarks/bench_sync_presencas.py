@@ -0,0 +1,216 @@
+# servico_eventos/benchmarks/bench_sync_presencas.py
+
+"""
+Itens por segundo no sync offline de presenças (/admin/sync/presencas):
+o laço antigo, item a item (duas consultas + um commit + uma chamada de
+emissão por presença), versus o fluxo em lote atual (uma consulta, um
+INSERT multi-linha e a emissão em /interno/certificados/emitir_lote).
+
+Cada rodada cria um evento com N inscrições e sincroniza todas em um único
+payload. O serviço de certificados é um stub local (uvicorn em uma thread);
+--latencia-ms simula o custo de cada requisição a ele. Precisa de um
+Postgres local com as migrações aplicadas (alembic upgrade head):
+
+    POSTGRES_USER=postgres POSTGRES_PASSWORD=postgres POSTGRES_DB=eventos_bench \\
+    POSTGRES_HOST=localhost python servico_eventos/benchmarks/bench_sync_presencas.py \\
+        --itens 1000 --latencia-ms 2
+
+Eventos, inscrições, presenças, certificados e contadores criados são
+removidos ao final.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path[:0] = [str(Path(__file__).resolve().parents[1] / "src"), str(Path(__file__).resolve().parents[2])]
+os.environ.setdefault("DB_TESTAR_CONEXAO", "0")
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+from sqlalchemy import delete, insert
+
+import models, schemas
+from bench_checkin_engines import USUARIO_BASE, criar_evento, remover_evento
+from database import AsyncSessionLocal, SessionLocal, async_engine, engine
+from routers.presencas import sync_presencas_offline
+from services.integracao import certificados, encerrar_clientes
+
+stub = FastAPI()
+LATENCIA_S = 0.0
+
+
+@stub.post("/interno/certificados/emitir_automatico")
+async def emitir_automatico(payload: dict):
+    await asyncio.sleep(LATENCIA_S)
+    return {"codigo_unico": uuid.uuid4().hex}
+
+
+@stub.post("/interno/certificados/emitir_lote")
+async def emitir_lote(payload: dict):
+    await asyncio.sleep(LATENCIA_S)
+    return {"certificados": [{"codigo_unico": uuid.uuid4().hex} for _ in payload["certificados"]]}
+
+
+def subir_stub() -> tuple:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        porta = s.getsockname()[1]
+    servidor = uvicorn.Server(uvicorn.Config(stub, host="127.0.0.1", port=porta, log_level="warning"))
+    thread = threading.Thread(target=servidor.run, daemon=True)
+    thread.start()
+    while not servidor.started:
+        time.sleep(0.05)
+    return servidor, thread, f"http://127.0.0.1:{porta}"
+
+
+def preparar(total: int) -> tuple:
+    """Evento com `total` inscrições ativas; devolve (evento_id, payload)."""
+    evento_id, _ = criar_evento()
+    with engine.begin() as conn:
+        ids = conn.execute(
+            insert(models.Inscricao).returning(models.Inscricao.id),
+            [
+                {"usuario_id": USUARIO_BASE + i, "evento_id": evento_id,
+                 "usuario_username": f"bench{i}", "status": models.InscricaoStatus.ATIVA}
+                for i in range(total)
+            ],
+        ).scalars().all()
+    agora = datetime.now(timezone.utc)
+    payload = schemas.SyncPayload(
+        presencas=[{"inscricao_id": i, "data_checkin": agora} for i in ids],
+        timestamp_cliente=agora,
+    )
+    return evento_id, payload
+
+
+def limpar(evento_id: int):
+    with engine.begin() as conn:
+        conn.execute(delete(models.Certificado).where(models.Certificado.evento_id == evento_id))
+    remover_evento(evento_id)
+
+
+# ==== LAÇO ANTIGO (reproduzido para comparação) ====
+
+async def _emitir_certificado_sincrono(base_url: str, inscricao, evento):
+    """Uma chamada por presença, com um cliente HTTP novo a cada vez, como antes."""
+    payload = {
+        "inscricao_id": inscricao.id,
+        "usuario_id": inscricao.usuario_id,
+        "evento_id": inscricao.evento_id,
+        "usuario_nome": inscricao.usuario_username,
+        "usuario_email": "usuario@sistema.com",
+        "evento_nome": evento.nome,
+        "evento_data": str(evento.data_evento),
+        "template_certificado": getattr(evento, "template_certificado", "default"),
+    }
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        resp = await client.post(f"{base_url}/interno/certificados/emitir_automatico", json=payload)
+        resp.raise_for_status()
+        return resp.json()
+
+
+async def sync_por_item(payload, base_url: str) -> int:
+    db = SessionLocal()
+    try:
+        sincronizadas = 0
+        for item in payload.presencas:
+            insc = db.query(models.Inscricao).filter_by(id=item.inscricao_id).first()
+            if not insc:
+                continue
+            if db.query(models.Presenca).filter_by(inscricao_id=insc.id).first():
+                continue
+            db.add(models.Presenca(
+                inscricao_id=insc.id,
+                usuario_id=insc.usuario_id,
+                evento_id=insc.evento_id,
+                origem=models.PresencaOrigem.SINCRONIZADO.value,
+                data_checkin=item.data_checkin,
+            ))
+            db.commit()
+            sincronizadas += 1
+
+            cert_data = await _emitir_certificado_sincrono(base_url, insc, insc.evento)
+            if cert_data and cert_data.get("codigo_unico"):
+                if not db.query(models.Certificado).filter_by(inscricao_id=insc.id).first():
+                    db.add(models.Certificado(
+                        inscricao_id=insc.id,
+                        evento_id=insc.evento_id,
+                        codigo_unico=cert_data["codigo_unico"],
+                    ))
+                    db.commit()
+        return sincronizadas
+    finally:
+        db.close()
+
+
+# ==== FLUXO EM LOTE (a rota atual) ====
+
+async def sync_em_lote(payload, base_url: str) -> int:
+    async with AsyncSessionLocal() as db:
+        resposta = await sync_presencas_offline(payload, db=db, admin=None)
+    return resposta["data"]["sincronizadas"]
+
+
+async def rodar(modo: str, total: int, base_url: str) -> dict:
+    evento_id, payload = preparar(total)
+    sincronizar = sync_por_item if modo == "por_item" else sync_em_lote
+    try:
+        inicio = time.perf_counter()
+        sincronizadas = await sincronizar(payload, base_url)
+        duracao = time.perf_counter() - inicio
+        with engine.connect() as conn:
+            emitidos = conn.execute(
+                models.Certificado.__table__.select()
+                .with_only_columns(models.Certificado.id)
+                .where(models.Certificado.evento_id == evento_id)
+            ).all()
+    finally:
+        limpar(evento_id)
+
+    assert sincronizadas == total, (modo, sincronizadas)
+    return {
+        "modo": modo,
+        "itens": total,
+        "certificados": len(emitidos),
+        "duracao_s": round(duracao, 3),
+        "itens_por_s": round(total / duracao, 1),
+    }
+
+
+async def main():
+    global LATENCIA_S
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--itens", type=int, default=500)
+    parser.add_argument("--latencia-ms", type=float, default=2.0)
+    parser.add_argument("--modo", choices=["por_item", "lote", "ambos"], default="ambos")
+    args = parser.parse_args()
+    LATENCIA_S = args.latencia_ms / 1000
+
+    servidor, thread, base_url = subir_stub()
+    certificados.base_url = base_url
+    modos = ["por_item", "lote"] if args.modo == "ambos" else [args.modo]
+    try:
+        # Aquecimento: pools, stub e imports fora da medição
+        for modo in modos:
+            await rodar(modo, 10, base_url)
+        for modo in modos:
+            print(await rodar(modo, args.itens, base_url))
+    finally:
+        await encerrar_clientes()
+        await async_engine.dispose()
+        engine.dispose()
+        servidor.should_exit = True
+        thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,172 @@
+# servico_eventos/benchmarks/carga_checkin_qr.py
+
+"""
+Carga HTTP no check-in por QR Code: scans por segundo contra um serviço
+de eventos já no ar (uvicorn ou gunicorn, como em produção).
+
+    JWT_SECRET=... python servico_eventos/benchmarks/carga_checkin_qr.py \\
+        --url http://localhost:8002 --participantes 2000 --concorrencia 50
+
+O script cria um evento e um token de check-in pelas rotas de admin e
+dispara um POST /checkin-qr/{token} por participante (ids acima de
+900.000.000, com JWTs assinados com o mesmo JWT_SECRET do serviço).
+--repeticoes > 1 reenvia o scan dos mesmos participantes: o caminho
+"Já registrado" (token em cache, presença existente).
+
+O gerador é asyncio puro (HTTP/1.1 com keep-alive sobre
+asyncio.open_connection, uma conexão por cliente virtual) para que o
+custo do cliente não entre na medida. Os dados criados ficam no banco:
+use um banco de teste.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlparse
+
+sys.path[:0] = [str(Path(__file__).resolve().parents[2])]
+
+from servico_comum.auth import create_access_token
+
+# Ids fora da faixa dos usuários reais (mesma faixa do bench_checkin_engines)
+USUARIO_BASE = 900_000_000
+
+
+def jwt_participante(indice: int) -> str:
+    usuario_id = USUARIO_BASE + indice
+    return create_access_token(
+        f"carga{indice}", roles=["participante"],
+        extra_claims={"user_id": usuario_id, "email": f"carga{indice}@exemplo.com"},
+    )
+
+
+class ConexaoHTTP:
+    """Cliente HTTP/1.1 mínimo com keep-alive (respostas com Content-Length)."""
+
+    def __init__(self, host: str, porta: int):
+        self.host = host
+        self.porta = porta
+        self._leitor = None
+        self._escritor = None
+
+    async def requisitar(self, metodo: str, caminho: str, token: str, corpo: dict = None) -> tuple:
+        if self._escritor is None:
+            self._leitor, self._escritor = await asyncio.open_connection(self.host, self.porta)
+
+        dados = json.dumps(corpo).encode() if corpo is not None else b""
+        cabecalho = (
+            f"{metodo} {caminho} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.porta}\r\n"
+            f"Authorization: Bearer {token}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(dados)}\r\n\r\n"
+        )
+        self._escritor.write(cabecalho.encode() + dados)
+
+        linha_status = await self._leitor.readline()
+        status = int(linha_status.split()[1])
+        tamanho, fechar = 0, False
+        while (linha := await self._leitor.readline()) not in (b"\r\n", b""):
+            nome, _, valor = linha.decode("latin-1").partition(":")
+            nome = nome.strip().lower()
+            if nome == "content-length":
+                tamanho = int(valor)
+            elif nome == "connection" and valor.strip().lower() == "close":
+                fechar = True
+        resposta = await self._leitor.readexactly(tamanho)
+        if fechar:
+            await self.fechar()
+        return status, resposta
+
+    async def fechar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+            await self._escritor.wait_closed()
+            self._leitor = self._escritor = None
+
+
+async def preparar(conexao: ConexaoHTTP, duracao_minutos: int) -> tuple:
+    admin = create_access_token("carga-admin", roles=["admin"], extra_claims={"user_id": USUARIO_BASE})
+    status, corpo = await conexao.requisitar("POST", "/admin/eventos", admin, {
+        "nome": f"Carga check-in {datetime.now(timezone.utc):%Y-%m-%d %H:%M:%S}",
+        "data_evento": datetime.now(timezone.utc).isoformat(),
+    })
+    if status != 201:
+        raise SystemExit(f"criação do evento falhou: {status} {corpo[:200]!r}")
+    evento_id = json.loads(corpo)["id"]
+
+    status, corpo = await conexao.requisitar("POST", "/admin/checkin/generate", admin, {
+        "evento_id": evento_id, "duracao_minutos": duracao_minutos,
+    })
+    if status != 200:
+        raise SystemExit(f"geração do token falhou: {status} {corpo[:200]!r}")
+    return evento_id, json.loads(corpo)["token"]
+
+
+async def rodada(host: str, porta: int, caminho: str, jwts: list, concorrencia: int) -> dict:
+    fila = asyncio.Queue()
+    for jwt in jwts:
+        fila.put_nowait(jwt)
+    latencias, status = [], Counter()
+
+    async def cliente():
+        conexao = ConexaoHTTP(host, porta)
+        try:
+            while not fila.empty():
+                jwt = fila.get_nowait()
+                inicio = time.perf_counter()
+                codigo, _ = await conexao.requisitar("POST", caminho, jwt)
+                latencias.append(time.perf_counter() - inicio)
+                status[codigo] += 1
+        finally:
+            await conexao.fechar()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "scans": len(latencias),
+        "scans_por_s": round(len(latencias) / duracao, 1),
+        "p50_ms": round(statistics.median(latencias) * 1000, 2),
+        "p95_ms": round(latencias[max(0, int(len(latencias) * 0.95) - 1)] * 1000, 2),
+        "p99_ms": round(latencias[max(0, int(len(latencias) * 0.99) - 1)] * 1000, 2),
+        "status": dict(status),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--participantes", type=int, default=1000)
+    parser.add_argument("--concorrencia", type=int, default=50)
+    parser.add_argument("--repeticoes", type=int, default=1)
+    args = parser.parse_args()
+
+    url = urlparse(args.url)
+    host, porta = url.hostname, url.port or 80
+
+    conexao = ConexaoHTTP(host, porta)
+    try:
+        evento_id, token = await preparar(conexao, duracao_minutos=60)
+    finally:
+        await conexao.fechar()
+    print({"evento_id": evento_id, "token": token})
+
+    # JWTs assinados antes da medida (HMAC no gerador não conta como scan)
+    jwts = [jwt_participante(i) for i in range(args.participantes)]
+    caminho = f"/checkin-qr/{token}"
+    for repeticao in range(1, args.repeticoes + 1):
+        resultado = await rodada(host, porta, caminho, jwts, args.concorrencia)
+        print({"rodada": repeticao, "caminho": "novo" if repeticao == 1 else "ja_registrado", **resultado})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
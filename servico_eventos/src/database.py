@@ -6,10 +6,12 @@ Módulo de configuração de banco de dados para o serviço de eventos.
 
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from sqlalchemy.exc import OperationalError
 
 from servico_comum.logger import configure_logger
+from servico_comum.runtime import dimensionar_pool, TESTAR_CONEXAO
 
 # ============================================================
 #  LOGGER DO SERVIÇO
@@ -47,20 +49,31 @@ POSTGRES_HOST = os.getenv("POSTGRES_HOST", "db")
 # Porta padrão
 POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
 
-DATABASE_URL = (
+# DSN libpq puro (conexões asyncpg diretas, ex.: LISTEN do feed de check-ins)
+DSN_POSTGRES = (
     f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}"
     f"@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 )
 
+# Driver explícito: a partir do SQLAlchemy 2.1 `postgresql://` usa psycopg 3
+DATABASE_URL = DSN_POSTGRES.replace("postgresql://", "postgresql+psycopg2://", 1)
+
+# Mesmo banco, driver asyncpg (rotas async)
+ASYNC_DATABASE_URL = DSN_POSTGRES.replace("postgresql://", "postgresql+asyncpg://", 1)
+
 
 # ============================================================
 #  ENGINE PROFISSIONAL
 # ============================================================
 
+# Orçamento de conexões do serviço (todos os workers), dividido meio a meio
+# entre o engine síncrono e o assíncrono
+POOL_SIZE, MAX_OVERFLOW = dimensionar_pool(40, fracao=0.5)
+
 engine = create_engine(
     DATABASE_URL,
-    pool_size=15,              # mais conexões para serviços que lidam com eventos
-    max_overflow=25,
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
     pool_pre_ping=True,
     pool_recycle=600,         # recicla após 30m (evita timeouts do Postgres)
     connect_args={
@@ -74,16 +87,36 @@ engine = create_engine(
 )
 
 
-# Teste inicial (log obrigatório)
-try:
-    with engine.connect() as conn:
-        logger.info("Conexão com o banco de eventos estabelecida com sucesso.")
-except OperationalError as e:
-    logger.error(
-        "Falha ao conectar-se ao banco de dados do serviço de eventos",
-        extra={"error": str(e)}
-    )
-    raise e
+# Teste inicial (desligado no perfil de produção: DB_TESTAR_CONEXAO=0)
+if TESTAR_CONEXAO:
+    try:
+        with engine.connect() as conn:
+            logger.info("Conexão com o banco de eventos estabelecida com sucesso.")
+    except OperationalError as e:
+        logger.error(
+            "Falha ao conectar-se ao banco de dados do serviço de eventos",
+            extra={"error": str(e)}
+        )
+        raise e
+
+
+# ============================================================
+#  ENGINE ASSÍNCRONO (asyncpg)
+# ============================================================
+
+# Usado pelas rotas `async def`: as consultas não bloqueiam o event loop.
+# O engine síncrono acima continua atendendo rotas `def` (threadpool)
+# e os jobs em segundo plano.
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
+    pool_pre_ping=True,
+    pool_recycle=600,
+    connect_args={
+        "server_settings": {"application_name": "servico_eventos_async"}
+    }
+)
 
 
 # ============================================================
@@ -97,6 +130,13 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,   # objetos seguem legíveis após commit, sem lazy load implícito
+)
+
 
 # ============================================================
 #  DEPENDÊNCIA DO FASTAPI
@@ -112,3 +152,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Versão assíncrona de get_db para rotas `async def`.
+    Relacionamentos devem vir por eager loading (joinedload/selectinload):
+    lazy load em AsyncSession gera erro.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
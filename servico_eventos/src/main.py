@@ -1,25 +1,55 @@
 # servico_eventos/src/main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from servico_comum.logger import configure_logger
 from servico_comum.middleware import RequestIDMiddleware
+from servico_comum.idempotency import IdempotenciaMiddleware
 from servico_comum.exceptions import ServiceError, service_error_handler
 
-from database import engine
-import models
+from database import engine, async_engine
 from routers import eventos, inscricoes, presencas
-
-# Inicializa Banco
-models.Base.metadata.create_all(bind=engine)
+from services.integracao import iniciar_clientes, encerrar_clientes, estatisticas_clientes
+from services.outbox import despachante, contar_tarefas, OUTBOX_ATIVO
+from services.reconciliador import reconciliador, RECONCILIADOR_ATIVO
+from services.checkin import tokens_checkin
+from services.feed_checkins import feed_checkins
 
 # Configura Logs
 logger = configure_logger("servico_eventos")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Clientes HTTP compartilhados (keep-alive) para os outros serviços
+    iniciar_clientes()
+    # Despachante do outbox (certificados e e-mails pós-check-in)
+    if OUTBOX_ATIVO:
+        await despachante.iniciar()
+    if RECONCILIADOR_ATIVO:
+        await reconciliador.iniciar()
+    # Feed SSE de check-ins (LISTEN no Postgres com FEED_CHECKINS_BACKEND=postgres)
+    await feed_checkins.iniciar()
+    yield
+    await feed_checkins.encerrar()
+    await reconciliador.encerrar()
+    await despachante.encerrar()
+    await encerrar_clientes()
+    await async_engine.dispose()
+    engine.dispose()
+
 app = FastAPI(
     title="Serviço de Eventos",
     version="2.1.0",
     description="API Modularizada para gestão de eventos e sync offline.",
+    lifespan=lifespan,
 )
 
+# POSTs que honram o cabeçalho Idempotency-Key (retries de clientes/offline)
+ROTAS_IDEMPOTENTES = (
+    "/inscricoes",
+    "/admin/inscricoes",
+    "/admin/sync/presencas",
+)
+app.add_middleware(IdempotenciaMiddleware, rotas=ROTAS_IDEMPOTENTES)
 app.add_middleware(RequestIDMiddleware)
 app.add_exception_handler(ServiceError, service_error_handler)
 app.add_exception_handler(Exception, service_error_handler)
@@ -38,3 +68,28 @@ async def log_requests(request: Request, call_next):
 @app.get("/")
 def health_check():
     return {"status": "ok", "service": "servico_eventos"}
+
+@app.get("/interno/integracao/metricas")
+def metricas_integracao():
+    """Latência e erros das chamadas aos outros serviços, por destino."""
+    return estatisticas_clientes()
+
+@app.get("/interno/outbox/status")
+def status_outbox():
+    """Backlog do outbox por tipo/status e contadores do despachante."""
+    return {**despachante.status(), **contar_tarefas()}
+
+@app.get("/interno/certificados/reconciliacao")
+def status_reconciliacao():
+    """Backlog de presenças sem certificado e resultado do último ciclo."""
+    return reconciliador.status()
+
+@app.get("/interno/checkin/tokens")
+def metricas_tokens_checkin():
+    """Acertos do cache de tokens de check-in por QR Code."""
+    return tokens_checkin.estatisticas()
+
+@app.get("/interno/checkin/feed")
+def metricas_feed_checkins():
+    """Assinantes do feed SSE de check-ins e mensagens entregues/descartadas."""
+    return feed_checkins.estatisticas()
@@ -0,0 +1,124 @@
+"""Esquema inicial do serviço de eventos
+
+Tabelas como eram criadas pelo create_all antes do Alembic. Bancos que já
+existem não são alterados (cada tabela só é criada se estiver faltando);
+nesse caso basta `alembic upgrade head`, sem stamp manual.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from servico_comum.migracoes import tabelas_existentes
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _agora():
+    return sa.text("now()")
+
+
+def upgrade():
+    existentes = tabelas_existentes()
+
+    if "eventos" not in existentes:
+        op.create_table(
+            "eventos",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("nome", sa.String(150), nullable=False),
+            sa.Column("descricao", sa.Text),
+            sa.Column("data_evento", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("template_certificado", sa.String(50), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=_agora()),
+            sa.Column("updated_at", sa.DateTime(timezone=True)),
+        )
+        op.create_index("ix_eventos_id", "eventos", ["id"])
+        op.create_index("ix_eventos_nome", "eventos", ["nome"])
+
+    if "inscricoes" not in existentes:
+        op.create_table(
+            "inscricoes",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("usuario_id", sa.Integer, nullable=False),
+            sa.Column("evento_id", sa.Integer, sa.ForeignKey("eventos.id"), nullable=False),
+            sa.Column("data_inscricao", sa.DateTime(timezone=True), server_default=_agora()),
+            sa.Column("usuario_username", sa.String(50)),
+            sa.Column(
+                "status",
+                sa.Enum("ATIVA", "CANCELADA", "PENDENTE_SYNC", name="inscricaostatus"),
+                nullable=False,
+            ),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=_agora()),
+            sa.Column("updated_at", sa.DateTime(timezone=True)),
+        )
+        op.create_index("ix_inscricoes_id", "inscricoes", ["id"])
+        op.create_index("ix_inscricoes_usuario_id", "inscricoes", ["usuario_id"])
+        op.create_index("ix_inscricoes_evento_id", "inscricoes", ["evento_id"])
+        op.create_index("ix_inscricoes_usuario_username", "inscricoes", ["usuario_username"])
+
+    if "presencas" not in existentes:
+        op.create_table(
+            "presencas",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("usuario_id", sa.Integer, nullable=False),
+            sa.Column("evento_id", sa.Integer, sa.ForeignKey("eventos.id"), nullable=False),
+            sa.Column("inscricao_id", sa.Integer, sa.ForeignKey("inscricoes.id"), nullable=False),
+            sa.Column("data_checkin", sa.DateTime(timezone=True), server_default=_agora()),
+            sa.Column("origem", sa.String),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=_agora()),
+        )
+        op.create_index("ix_presencas_id", "presencas", ["id"])
+        op.create_index("ix_presencas_usuario_id", "presencas", ["usuario_id"])
+        op.create_index("ix_presencas_evento_id", "presencas", ["evento_id"])
+        op.create_index("ix_presencas_inscricao_id", "presencas", ["inscricao_id"])
+
+    if "certificados" not in existentes:
+        op.create_table(
+            "certificados",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("inscricao_id", sa.Integer, sa.ForeignKey("inscricoes.id"), nullable=False, unique=True),
+            sa.Column("evento_id", sa.Integer, sa.ForeignKey("eventos.id"), nullable=False),
+            sa.Column("codigo_unico", sa.String(64)),
+            sa.Column("data_emissao", sa.DateTime(timezone=True), server_default=_agora()),
+        )
+        op.create_index("ix_certificados_id", "certificados", ["id"])
+        op.create_index("ix_certificados_codigo_unico", "certificados", ["codigo_unico"], unique=True)
+
+    if "checkin_tokens" not in existentes:
+        op.create_table(
+            "checkin_tokens",
+            sa.Column("token", postgresql.UUID(as_uuid=False), primary_key=True),
+            sa.Column("evento_id", sa.Integer, sa.ForeignKey("eventos.id"), nullable=False),
+            sa.Column("data_criacao", sa.DateTime(timezone=True), server_default=_agora()),
+            sa.Column("data_expiracao", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("is_active", sa.Boolean, nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=_agora()),
+        )
+        op.create_index("ix_checkin_tokens_evento_id", "checkin_tokens", ["evento_id"])
+
+    if "outbox" not in existentes:
+        op.create_table(
+            "outbox",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("tipo", sa.String(20), nullable=False),
+            sa.Column("payload", sa.JSON, nullable=False),
+            sa.Column("status", sa.String(20), nullable=False),
+            sa.Column("tentativas", sa.Integer, nullable=False),
+            sa.Column("proxima_tentativa", sa.DateTime(timezone=True), server_default=_agora(), nullable=False),
+            sa.Column("ultimo_erro", sa.Text),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=_agora()),
+            sa.Column("processado_em", sa.DateTime(timezone=True)),
+        )
+
+
+def downgrade():
+    for tabela in ("outbox", "checkin_tokens", "certificados", "presencas", "inscricoes", "eventos"):
+        op.drop_table(tabela)
+    sa.Enum(name="inscricaostatus").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,91 @@
+"""Unicidade de inscrições, presenças e certificados
+
+Remove as duplicatas criadas pelo antigo "consulta e depois insere" e
+cria as constraints únicas usadas pelos INSERT ... ON CONFLICT:
+    inscricoes(usuario_id, evento_id)
+    presencas(inscricao_id)
+    certificados(inscricao_id)
+
+Entre inscrições duplicadas fica a que tem presença, depois a ativa,
+depois a mais antiga; presenças e certificados das demais passam para
+ela (mantendo um de cada).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def _constraints_unicas(tabela: str) -> dict:
+    # --sql (offline): banco criado pela 0001, só com a constraint de certificados
+    if context.is_offline_mode():
+        return {("inscricao_id",): "certificados_inscricao_id_key"} if tabela == "certificados" else {}
+    inspetor = sa.inspect(op.get_bind())
+    return {tuple(c["column_names"]): c["name"] for c in inspetor.get_unique_constraints(tabela)}
+
+
+def upgrade():
+    # 1. Inscrição duplicada -> inscrição que fica
+    op.execute("""
+        CREATE TEMP TABLE inscricoes_duplicadas ON COMMIT DROP AS
+        SELECT id, mantida FROM (
+            SELECT i.id,
+                   first_value(i.id) OVER (
+                       PARTITION BY i.usuario_id, i.evento_id
+                       ORDER BY EXISTS (SELECT 1 FROM presencas p WHERE p.inscricao_id = i.id) DESC,
+                                (i.status = 'ATIVA') DESC,
+                                i.id
+                   ) AS mantida
+            FROM inscricoes i
+        ) t
+        WHERE id <> mantida
+    """)
+
+    # 2. Presenças e certificados: um por inscrição resultante, o mais antigo
+    for tabela in ("presencas", "certificados"):
+        op.execute(f"""
+            DELETE FROM {tabela} x
+            USING (
+                SELECT t.id, row_number() OVER (
+                    PARTITION BY coalesce(d.mantida, t.inscricao_id) ORDER BY t.id
+                ) AS n
+                FROM {tabela} t
+                LEFT JOIN inscricoes_duplicadas d ON d.id = t.inscricao_id
+            ) r
+            WHERE x.id = r.id AND r.n > 1
+        """)
+        op.execute(f"""
+            UPDATE {tabela} t SET inscricao_id = d.mantida
+            FROM inscricoes_duplicadas d
+            WHERE t.inscricao_id = d.id
+        """)
+
+    # 3. Inscrições duplicadas (já sem dependentes)
+    op.execute("DELETE FROM inscricoes i USING inscricoes_duplicadas d WHERE i.id = d.id")
+
+    # 4. Constraints
+    if ("usuario_id", "evento_id") not in _constraints_unicas("inscricoes"):
+        op.create_unique_constraint("uq_inscricoes_usuario_evento", "inscricoes", ["usuario_id", "evento_id"])
+
+    if ("inscricao_id",) not in _constraints_unicas("presencas"):
+        op.create_unique_constraint("uq_presencas_inscricao_id", "presencas", ["inscricao_id"])
+    # A constraint já indexa inscricao_id
+    op.execute("DROP INDEX IF EXISTS ix_presencas_inscricao_id")
+
+    # certificados.inscricao_id já nasce único (unique=True); garante em bancos antigos
+    if ("inscricao_id",) not in _constraints_unicas("certificados"):
+        op.create_unique_constraint("certificados_inscricao_id_key", "certificados", ["inscricao_id"])
+
+
+def downgrade():
+    op.create_index("ix_presencas_inscricao_id", "presencas", ["inscricao_id"])
+    op.drop_constraint("uq_presencas_inscricao_id", "presencas", type_="unique")
+    op.drop_constraint("uq_inscricoes_usuario_evento", "inscricoes", type_="unique")
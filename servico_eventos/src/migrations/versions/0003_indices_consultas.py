@@ -0,0 +1,65 @@
+"""Índices das consultas quentes (CREATE INDEX CONCURRENTLY)
+
+Índices que antes só existiam via create_all, mais os compostos e
+parciais dos caminhos quentes:
+    inscricoes(evento_id, id) WHERE status <> 'CANCELADA'
+    presencas(evento_id, data_checkin)
+    checkin_tokens(evento_id) WHERE is_active
+Remove os simples que ficaram cobertos por um composto.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+
+from servico_comum.migracoes import criar_indice_concorrente, remover_indice_concorrente
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+INDICES = [
+    # Listagem de eventos: período e prefixo do nome
+    ("ix_eventos_data_evento_id", "eventos", ["data_evento", "id"], {}),
+    ("ix_eventos_nome_prefixo", "eventos", ["nome"],
+     {"postgresql_ops": {"nome": "varchar_pattern_ops"}}),
+    # Listagem admin de inscrições e sync incremental
+    ("ix_inscricoes_evento_id_id", "inscricoes", ["evento_id", "id"], {}),
+    ("ix_inscricoes_evento_status_id", "inscricoes", ["evento_id", "status", "id"], {}),
+    ("ix_inscricoes_username_prefixo", "inscricoes", ["usuario_username"],
+     {"postgresql_ops": {"usuario_username": "varchar_pattern_ops"}}),
+    ("ix_inscricoes_alterado_em", "inscricoes", [sa.text("coalesce(updated_at, created_at)")], {}),
+    ("ix_inscricoes_evento_ativas", "inscricoes", ["evento_id", "id"],
+     {"postgresql_where": sa.text("status <> 'CANCELADA'")}),
+    # Check-ins por evento em ordem de chegada
+    ("ix_presencas_evento_data_checkin", "presencas", ["evento_id", "data_checkin"], {}),
+    ("ix_checkin_tokens_evento_ativos", "checkin_tokens", ["evento_id"],
+     {"postgresql_where": sa.text("is_active")}),
+    # Fila do despachante
+    ("ix_outbox_pendentes", "outbox", ["tipo", "proxima_tentativa"],
+     {"postgresql_where": sa.text("status = 'pendente'")}),
+]
+
+# Prefixos de um composto acima (ou da constraint única de inscrições)
+REDUNDANTES = [
+    ("ix_inscricoes_usuario_id", "inscricoes", ["usuario_id"]),
+    ("ix_presencas_evento_id", "presencas", ["evento_id"]),
+]
+
+
+def upgrade():
+    for nome, tabela, colunas, opcoes in INDICES:
+        criar_indice_concorrente(nome, tabela, colunas, **opcoes)
+    for nome, tabela, _ in REDUNDANTES:
+        remover_indice_concorrente(nome, tabela)
+
+
+def downgrade():
+    for nome, tabela, colunas in REDUNDANTES:
+        criar_indice_concorrente(nome, tabela, colunas)
+    for nome, tabela, _, _ in reversed(INDICES):
+        remover_indice_concorrente(nome, tabela)
@@ -0,0 +1,57 @@
+"""Contadores de estatísticas por evento
+
+Tabelas contadores_evento e checkins_por_minuto, já preenchidas com o
+que existe hoje (mesmo cálculo de services.estatisticas.reconstruir).
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "contadores_evento",
+        sa.Column("evento_id", sa.Integer, sa.ForeignKey("eventos.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("chave", sa.String(40), primary_key=True),
+        sa.Column("fatia", sa.SmallInteger, primary_key=True),
+        sa.Column("valor", sa.BigInteger, nullable=False),
+    )
+    op.create_table(
+        "checkins_por_minuto",
+        sa.Column("evento_id", sa.Integer, sa.ForeignKey("eventos.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("minuto", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("fatia", sa.SmallInteger, primary_key=True),
+        sa.Column("total", sa.Integer, nullable=False),
+    )
+
+    op.execute("""
+        INSERT INTO contadores_evento (evento_id, chave, fatia, valor)
+        SELECT evento_id, 'inscricoes.' || lower(status::text), 0, count(*)
+        FROM inscricoes GROUP BY evento_id, status
+        UNION ALL
+        SELECT evento_id, 'checkins.' || coalesce(origem, 'online'), 0, count(*)
+        FROM presencas GROUP BY evento_id, coalesce(origem, 'online')
+        UNION ALL
+        SELECT evento_id, 'certificados', 0, count(*)
+        FROM certificados GROUP BY evento_id
+    """)
+    op.execute("""
+        INSERT INTO checkins_por_minuto (evento_id, minuto, fatia, total)
+        SELECT evento_id, date_trunc('minute', data_checkin), 0, count(*)
+        FROM presencas WHERE data_checkin IS NOT NULL
+        GROUP BY evento_id, date_trunc('minute', data_checkin)
+    """)
+
+
+def downgrade():
+    op.drop_table("checkins_por_minuto")
+    op.drop_table("contadores_evento")
@@ -0,0 +1,36 @@
+"""Índice do despachante na ordem em que ele lê o outbox
+
+_reservar pega as pendentes de um tipo em ordem de id (FIFO) com LIMIT;
+o índice (tipo, proxima_tentativa) não servia a essa ordem e o planner
+preferia percorrer a PK filtrando as concluídas. O novo índice parcial
+(tipo, id) entrega as pendentes já ordenadas.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+
+from servico_comum.migracoes import criar_indice_concorrente, remover_indice_concorrente
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    criar_indice_concorrente(
+        "ix_outbox_pendentes_tipo_id", "outbox", ["tipo", "id"],
+        postgresql_where=sa.text("status = 'pendente'"),
+    )
+    remover_indice_concorrente("ix_outbox_pendentes", "outbox")
+
+
+def downgrade():
+    criar_indice_concorrente(
+        "ix_outbox_pendentes", "outbox", ["tipo", "proxima_tentativa"],
+        postgresql_where=sa.text("status = 'pendente'"),
+    )
+    remover_indice_concorrente("ix_outbox_pendentes_tipo_id", "outbox")
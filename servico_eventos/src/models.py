@@ -1,7 +1,8 @@
 # servico_eventos/src/models.py
 
 from sqlalchemy import (
-    Column, Integer, String, DateTime, ForeignKey, Boolean, Text, Enum
+    Column, Integer, BigInteger, SmallInteger, String, DateTime, ForeignKey, Boolean, Text, Enum,
+    Index, JSON, text, UniqueConstraint
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -20,6 +21,17 @@ class InscricaoStatus(str, enum.Enum):
     PENDENTE_SYNC = "pendente_sync"  # usado no modo offline
 
 
+class OutboxTipo(str, enum.Enum):
+    CERTIFICADO = "certificado"
+    NOTIFICACAO = "notificacao"
+
+
+class OutboxStatus(str, enum.Enum):
+    PENDENTE = "pendente"
+    CONCLUIDA = "concluida"
+    FALHA = "falha"  # esgotou as tentativas
+
+
 # ============================================================
 #  EVENTO
 # ============================================================
@@ -44,6 +56,12 @@ class Evento(Base):
     certificados = relationship("Certificado", back_populates="evento", cascade="all,delete")
     checkin_tokens = relationship("CheckinToken", back_populates="evento", cascade="all,delete")
 
+    # Listagem paginada: filtro por período e busca por prefixo do nome
+    __table_args__ = (
+        Index("ix_eventos_data_evento_id", "data_evento", "id"),
+        Index("ix_eventos_nome_prefixo", "nome", postgresql_ops={"nome": "varchar_pattern_ops"}),
+    )
+
     def __repr__(self):
         return f"<Evento id={self.id} nome='{self.nome}'>"
     
@@ -57,7 +75,8 @@ class Inscricao(Base):
     __tablename__ = "inscricoes"
 
     id = Column(Integer, primary_key=True, index=True)
-    usuario_id = Column(Integer, nullable=False, index=True)
+    # Buscas por usuário usam a constraint única (usuario_id, evento_id)
+    usuario_id = Column(Integer, nullable=False)
 
     evento_id = Column(Integer, ForeignKey("eventos.id"), nullable=False, index=True)
     evento = relationship("Evento", back_populates="inscricoes")
@@ -79,6 +98,21 @@ class Inscricao(Base):
     presencas = relationship("Presenca", back_populates="inscricao", cascade="all,delete")
     certificado = relationship("Certificado", back_populates="inscricao", uselist=False)
 
+    __table_args__ = (
+        # Uma inscrição por usuário/evento: alvo do ON CONFLICT das inscrições
+        UniqueConstraint("usuario_id", "evento_id", name="uq_inscricoes_usuario_evento"),
+        # Listagem admin paginada por id com filtros por evento/status/username
+        Index("ix_inscricoes_evento_id_id", "evento_id", "id"),
+        Index("ix_inscricoes_evento_status_id", "evento_id", "status", "id"),
+        Index("ix_inscricoes_username_prefixo", "usuario_username",
+              postgresql_ops={"usuario_username": "varchar_pattern_ops"}),
+        # Sync incremental (?since=)
+        Index("ix_inscricoes_alterado_em", func.coalesce(updated_at, created_at)),
+        # Participantes de um evento (contagens, estatísticas): canceladas ficam de fora
+        Index("ix_inscricoes_evento_ativas", "evento_id", "id",
+              postgresql_where=text("status <> 'CANCELADA'")),
+    )
+
     def __repr__(self):
         return f"<Inscricao id={self.id} usuario={self.usuario_username} evento={self.evento_id} status={self.status}>"
     
@@ -97,8 +131,8 @@ class Presenca(Base):
     id = Column(Integer, primary_key=True, index=True)
 
     usuario_id = Column(Integer, nullable=False, index=True)
-    evento_id = Column(Integer, ForeignKey("eventos.id"), nullable=False, index=True)
-    inscricao_id = Column(Integer, ForeignKey("inscricoes.id"), nullable=False, index=True)
+    evento_id = Column(Integer, ForeignKey("eventos.id"), nullable=False)
+    inscricao_id = Column(Integer, ForeignKey("inscricoes.id"), nullable=False)
 
     data_checkin = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -111,6 +145,13 @@ class Presenca(Base):
     data_checkin = Column(DateTime(timezone=True), server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Uma presença por inscrição: alvo do ON CONFLICT do check-in
+        UniqueConstraint("inscricao_id", name="uq_presencas_inscricao_id"),
+        # Check-ins de um evento em ordem de chegada (linha do tempo, painel)
+        Index("ix_presencas_evento_data_checkin", "evento_id", "data_checkin"),
+    )
+
     def __repr__(self):
         return f"<Presenca usuario={self.usuario_id} evento={self.evento_id} origem={self.origem}>"
 
@@ -152,7 +193,11 @@ def gerar_token_uuid():
 
 class CheckinToken(Base):
     __tablename__ = "checkin_tokens"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Só os tokens ativos são consultados/desativados por evento
+        Index("ix_checkin_tokens_evento_ativos", "evento_id", postgresql_where=text("is_active")),
+        {'extend_existing': True},
+    )
     # Token UUID é a chave primária e o valor que vai no QR Code
     token = Column(UUID(as_uuid=False), primary_key=True, default=gerar_token_uuid)
 
@@ -171,3 +216,73 @@ class CheckinToken(Base):
 
     def __repr__(self):
         return f"<CheckinToken token={self.token} evento={self.evento_id}>"
+
+
+# ============================================================
+#  OUTBOX (TRABALHO PÓS-CHECK-IN)
+# ============================================================
+
+class TarefaOutbox(Base):
+    """
+    Trabalho pendente para outros serviços (certificado, e-mail), gravado
+    na mesma transação da presença e executado pelo despachante assíncrono.
+    """
+    __tablename__ = "outbox"
+
+    id = Column(Integer, primary_key=True)
+    tipo = Column(String(20), nullable=False)
+    payload = Column(JSON, nullable=False)
+
+    status = Column(String(20), default=OutboxStatus.PENDENTE.value, nullable=False)
+    tentativas = Column(Integer, default=0, nullable=False)
+    proxima_tentativa = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    ultimo_erro = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    processado_em = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Só as pendentes interessam ao despachante, que as lê em ordem de id
+        Index(
+            "ix_outbox_pendentes_tipo_id", "tipo", "id",
+            postgresql_where=text("status = 'pendente'"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<TarefaOutbox id={self.id} tipo={self.tipo} status={self.status}>"
+
+
+# ============================================================
+#  ESTATÍSTICAS POR EVENTO (CONTADORES INCREMENTAIS)
+# ============================================================
+
+class ContadorEvento(Base):
+    """
+    Contadores de um evento (inscrições por status, check-ins por origem,
+    certificados), atualizados na mesma transação de cada escrita.
+    Cada contador é dividido em `fatia`s para que check-ins simultâneos
+    não disputem a mesma linha; o valor é a soma das fatias.
+    """
+    __tablename__ = "contadores_evento"
+
+    evento_id = Column(Integer, ForeignKey("eventos.id", ondelete="CASCADE"), primary_key=True)
+    chave = Column(String(40), primary_key=True)  # ex.: "inscricoes.ativa", "checkins.qrcode"
+    fatia = Column(SmallInteger, primary_key=True, default=0)
+    valor = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ContadorEvento evento={self.evento_id} {self.chave}[{self.fatia}]={self.valor}>"
+
+
+class CheckinsPorMinuto(Base):
+    """Linha do tempo de check-ins de um evento, por minuto (fatiada como os contadores)."""
+    __tablename__ = "checkins_por_minuto"
+
+    evento_id = Column(Integer, ForeignKey("eventos.id", ondelete="CASCADE"), primary_key=True)
+    minuto = Column(DateTime(timezone=True), primary_key=True)
+    fatia = Column(SmallInteger, primary_key=True, default=0)
+    total = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CheckinsPorMinuto evento={self.evento_id} minuto={self.minuto} total={self.total}>"
@@ -1,7 +1,7 @@
 # servico_eventos/src/routers/eventos.py
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 import models, schemas
@@ -9,13 +9,29 @@ from database import get_db
 from security import get_current_admin_user, User
 from servico_comum.exceptions import ServiceError
 from servico_comum.logger import configure_logger
+from servico_comum.pagination import Paginacao, filtro_prefixo
+from services.estatisticas import consultar as consultar_estatisticas
 
 router = APIRouter(tags=["Eventos"])
 logger = configure_logger("router_eventos")
 
 @router.get("/eventos", response_model=List[schemas.Evento])
-def list_eventos(db: Session = Depends(get_db)):
-    return db.query(models.Evento).all()
+def list_eventos(
+    response: Response,
+    nome: Optional[str] = Query(None, min_length=1, description="Prefixo do nome do evento."),
+    data_inicio: Optional[datetime] = Query(None, description="Eventos a partir desta data."),
+    data_fim: Optional[datetime] = Query(None, description="Eventos até esta data."),
+    pagina: Paginacao = Depends(),
+    db: Session = Depends(get_db)
+):
+    query = db.query(models.Evento)
+    if nome:
+        query = query.filter(filtro_prefixo(models.Evento.nome, nome))
+    if data_inicio:
+        query = query.filter(models.Evento.data_evento >= data_inicio)
+    if data_fim:
+        query = query.filter(models.Evento.data_evento <= data_fim)
+    return pagina.aplicar(query, models.Evento.id, response)
 
 @router.get("/eventos/{id}", response_model=schemas.Evento)
 def get_evento(id: int, db: Session = Depends(get_db)):
@@ -56,4 +72,20 @@ def update_evento(
     db.add(evento)
     db.commit()
     db.refresh(evento)
-    return evento
\ No newline at end of file
+    return evento
+
+@router.get("/admin/eventos/{id}/stats", response_model=schemas.EventoEstatisticas, tags=["Admin"])
+def estatisticas_evento(
+    id: int,
+    desde: Optional[datetime] = Query(None, description="Linha do tempo a partir deste instante."),
+    ate: Optional[datetime] = Query(None, description="Linha do tempo até este instante."),
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_current_admin_user)
+):
+    """
+    Inscrições por status, check-ins por origem, certificados emitidos e
+    check-ins por minuto, lidos dos contadores mantidos a cada escrita.
+    """
+    if db.get(models.Evento, id) is None:
+        raise ServiceError("Evento não encontrado", 404)
+    return consultar_estatisticas(db, id, desde, ate)
@@ -1,15 +1,20 @@
 # servico_eventos/src/routers/inscricoes.py
-from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi import APIRouter, Depends, BackgroundTasks, Query, Request, Response
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload, selectinload
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 import models, schemas
-from database import get_db
+from database import get_db, get_async_db, SessionLocal
 from security import get_current_user, User, get_current_admin_user 
-from services.integracao import send_notification_guaranteed, fetch_user_data, emitir_certificado_sincrono
+from services.integracao import send_notification_guaranteed, fetch_user_data
+from services.inscricoes import inscrever, inscrever_async, cancelar, CRIADA, EXISTENTE
 from servico_comum.exceptions import ServiceError
 from servico_comum.responses import success
+from servico_comum.pagination import Paginacao, filtro_prefixo
+from servico_comum.streaming import aceita_ndjson, resposta_ndjson
 
 router = APIRouter(tags=["Inscrições"])
 
@@ -25,23 +30,10 @@ def create_inscricao(
     if not evento:
         raise ServiceError("Evento não encontrado", 404)
 
-    existente = db.query(models.Inscricao).filter_by(usuario_id=user.id, evento_id=body.evento_id).first()
-    if existente:
-        if existente.status == models.InscricaoStatus.CANCELADA.value:
-            existente.status = models.InscricaoStatus.ATIVA.value
-            existente.updated_at = datetime.utcnow()
-            db.commit()
-            db.refresh(existente)
-        return existente
-
-    insc = models.Inscricao(
-        evento_id=body.evento_id,
-        usuario_id=user.id,
-        usuario_username=user.username
-    )
-    db.add(insc)
-    db.commit()
-    db.refresh(insc)
+    # Upsert único: cria, reativa se cancelada ou devolve a existente
+    insc, resultado = inscrever(db, body.evento_id, user.id, user.username)
+    if resultado != CRIADA:
+        return insc
 
     background.add_task(send_notification_guaranteed, {
         "tipo": "inscricao",
@@ -52,48 +44,20 @@ def create_inscricao(
     return insc
 
 @router.get("/inscricoes/me", response_model=List[schemas.InscricaoDetalhes])
-async def minhas_inscricoes(  # <--- Agora é ASYNC
+def minhas_inscricoes(
     db: Session = Depends(get_db), 
     user: User = Depends(get_current_user)
 ):
     """
-    Lista inscrições e faz AUTO-REPARO se faltar certificado.
+    Lista inscrições do usuário (somente leitura).
+    Certificados faltantes são emitidos pelo outbox e pelo reconciliador.
     """
-    inscricoes = db.query(models.Inscricao).options(
+    return db.query(models.Inscricao).options(
         joinedload(models.Inscricao.evento),
         selectinload(models.Inscricao.presencas),
         joinedload(models.Inscricao.certificado)
     ).filter_by(usuario_id=user.id).all()
 
-    # Lógica de Auto-Reparo (Self-Healing)
-    for insc in inscricoes:
-        # Se tem presença MAS não tem certificado salvo
-        if insc.checkin_realizado and not insc.certificado:
-            print(f"[AUTO-REPAIR] Gerando certificado faltante para inscrição {insc.id}")
-            
-            # Tenta obter email do objeto user do token ou usa fallback
-            user_email = getattr(user, "email", None) or "usuario@evento.com"
-            
-            # Gera agora
-            cert_data = await emitir_certificado_sincrono(insc, user_email, insc.evento)
-            
-            if cert_data and cert_data.get("codigo_unico"):
-                # Salva no banco
-                novo_cert = models.Certificado(
-                    inscricao_id=insc.id,
-                    evento_id=insc.evento_id,
-                    codigo_unico=cert_data["codigo_unico"]
-                )
-                db.add(novo_cert)
-                db.commit()
-                # Atualiza o objeto para retornar na resposta atual
-                db.refresh(insc)
-                
-                if not insc.certificado:
-                    insc.certificado = db.query(models.Certificado).filter_by(inscricao_id=insc.id).first()
-    
-    return inscricoes
-
 @router.patch("/inscricoes/{id}/cancelar")
 def cancelar_inscricao(
     id: int,
@@ -109,9 +73,7 @@ def cancelar_inscricao(
     if db.query(models.Presenca).filter_by(inscricao_id=id).first():
         raise ServiceError("Não é possível cancelar: presença já registrada", 400)
 
-    insc.status = models.InscricaoStatus.CANCELADA.value
-    insc.updated_at = datetime.utcnow()
-    db.commit()
+    cancelar(db, insc)
 
     evento_nome = db.query(models.Evento).filter_by(id=insc.evento_id).first().nome
     background.add_task(send_notification_guaranteed, {
@@ -127,19 +89,51 @@ def cancelar_inscricao(
 
 @router.get("/admin/inscricoes", response_model=List[schemas.Inscricao], tags=["Admin"])
 def listar_todas_inscricoes_admin(
+    request: Request,
+    response: Response,
+    evento_id: Optional[int] = None,
+    status: Optional[models.InscricaoStatus] = None,
+    username: Optional[str] = Query(None, min_length=1, description="Prefixo do username."),
+    data_inicio: Optional[datetime] = Query(None, description="Inscrições a partir desta data."),
+    data_fim: Optional[datetime] = Query(None, description="Inscrições até esta data."),
+    since: Optional[datetime] = Query(None, description="Somente inscrições alteradas desde este instante."),
+    pagina: Paginacao = Depends(),
     db: Session = Depends(get_db),
     admin: User = Depends(get_current_admin_user)
 ):
-    return db.query(models.Inscricao).all()
+    """
+    Lista inscrições (paginação por cursor opcional).
+    Com `Accept: application/x-ndjson` a resposta é transmitida em streaming.
+    """
+    query = db.query(models.Inscricao)
+    if evento_id is not None:
+        query = query.filter(models.Inscricao.evento_id == evento_id)
+    if status is not None:
+        query = query.filter(models.Inscricao.status == status)
+    if username:
+        query = query.filter(filtro_prefixo(models.Inscricao.usuario_username, username))
+    if data_inicio:
+        query = query.filter(models.Inscricao.data_inscricao >= data_inicio)
+    if data_fim:
+        query = query.filter(models.Inscricao.data_inscricao <= data_fim)
+    if since:
+        # updated_at só é preenchido na primeira alteração
+        alterado_em = func.coalesce(models.Inscricao.updated_at, models.Inscricao.created_at)
+        query = query.filter(alterado_em >= since)
+
+    if aceita_ndjson(request):
+        query = pagina.preparar(query, models.Inscricao.id, response)
+        return resposta_ndjson(query, SessionLocal, schemas.Inscricao, response)
+    return pagina.aplicar(query, models.Inscricao.id, response)
 
 @router.post("/admin/inscricoes", response_model=schemas.Inscricao, status_code=201, tags=["Admin"])
 async def admin_create_inscricao(
     body: schemas.InscricaoAdminCreate,
     background: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin: User = Depends(get_current_admin_user)
 ):
-    evento = db.query(models.Evento).filter_by(id=body.evento_id).first()
+    evento = await db.get(models.Evento, body.evento_id)
     if not evento:
         raise ServiceError("Evento não encontrado", 404)
 
@@ -154,40 +148,11 @@ async def admin_create_inscricao(
         user_nome = user_data.get("full_name") or username
     except Exception: pass
 
-    # Lógica de Idempotência e Reativação
-    existente = db.query(models.Inscricao).filter_by(
-        usuario_id=body.usuario_id,
-        evento_id=body.evento_id
-    ).first()
-
-    if existente:
-        # CORREÇÃO: Se estiver cancelada, reativa!
-        if existente.status == models.InscricaoStatus.CANCELADA.value:
-            existente.status = models.InscricaoStatus.ATIVA.value
-            existente.updated_at = datetime.utcnow()
-            db.commit()
-            db.refresh(existente)
-            
-            # Envia e-mail de re-inscrição
-            if user_email:
-                background.add_task(send_notification_guaranteed, {
-                    "tipo": "inscricao",
-                    "destinatario": user_email,
-                    "nome": user_nome,
-                    "nome_evento": evento.nome
-                })
-        return existente
-
-    insc = models.Inscricao(
-        evento_id=body.evento_id,
-        usuario_id=body.usuario_id,
-        usuario_username=username
-    )
-    db.add(insc)
-    db.commit()
-    db.refresh(insc)
-
-    if user_email:
+    # Idempotência e reativação no próprio INSERT ... ON CONFLICT
+    insc, resultado = await inscrever_async(db, body.evento_id, body.usuario_id, username)
+
+    # Inscrição nova ou re-inscrição: envia e-mail
+    if user_email and resultado != EXISTENTE:
         background.add_task(send_notification_guaranteed, {
             "tipo": "inscricao",
             "destinatario": user_email,
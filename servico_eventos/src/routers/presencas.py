@@ -1,172 +1,281 @@
 # servico_eventos/src/routers/presencas.py
-from fastapi import APIRouter, Depends, BackgroundTasks, status, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 from datetime import datetime, timedelta, timezone
 import uuid
 import os
 import models, schemas
-from database import get_db
+from database import get_db, get_async_db
 from security import get_current_admin_user, get_current_user, User
-from services.integracao import (
-    solicitar_emissao_certificado_automatica, 
-    send_notification_guaranteed,
-    fetch_user_data,
-    emitir_certificado_sincrono
-)
-from servico_comum import logger
+from services.integracao import emitir_certificados_lote
+from services.emissao import salvar_certificados_locais
+from services.outbox import registrar_certificado, registrar_pos_checkin, despachante
+from services.checkin import checkin_por_token, tokens_checkin
+from services.estatisticas import Contagem
+from services.feed_checkins import feed_checkins, evento_checkin, stream_sse, FeedLotado
 from servico_comum.exceptions import ServiceError
 from servico_comum.responses import success
 
 router = APIRouter(tags=["Presenças & Check-in"])
 
 # --- LOGICA DE CHECK-IN COMUM ---
-async def realizar_checkin_logica(insc, origem, background, db):
-    """Função reutilizável para registrar presença."""
-    presenca = models.Presenca(
-        inscricao_id=insc.id,
-        usuario_id=insc.usuario_id,
-        evento_id=insc.evento_id,
-        origem=origem
+async def realizar_checkin_logica(insc, origem, db: AsyncSession, email=None, nome=None):
+    """
+    Registra a presença e enfileira certificado + e-mail no outbox,
+    tudo na mesma transação. Nenhuma chamada a outros serviços aqui.
+    INSERT ... ON CONFLICT (inscricao_id) DO NOTHING: se outro check-in
+    (QR/sync) já gravou, devolve a presença existente sem reenfileirar.
+    """
+    stmt = (
+        insert(models.Presenca)
+        .values(
+            inscricao_id=insc.id,
+            usuario_id=insc.usuario_id,
+            evento_id=insc.evento_id,
+            origem=origem,
+        )
+        .on_conflict_do_nothing(index_elements=["inscricao_id"])
+        .returning(models.Presenca)
     )
-    db.add(presenca)
-    db.commit()
-    db.refresh(presenca)
+    presenca = (await db.execute(stmt)).scalar()
+    if presenca is None:
+        return await db.scalar(select(models.Presenca).filter_by(inscricao_id=insc.id))
 
-    # Buscar dados frescos para certificado/email
-    try:
-        user_data = await fetch_user_data(insc.usuario_id)
-        user_email = user_data.get("email")
-        evento = insc.evento  # Assumindo carregado ou lazy loading
-        user_nome = user_data.get("full_name") or user_data.get("username") or "Participante"
-        
-        # Tarefa 1: Emitir Certificado
-        cert_data = await emitir_certificado_sincrono(insc, user_email, evento)
-        
-        if cert_data and cert_data.get("codigo_unico"):
-            # SALVA NO BANCO LOCAL DO SERVIÇO DE EVENTOS
-            # Verifica se já existe para evitar duplicidade
-            if not db.query(models.Certificado).filter_by(inscricao_id=insc.id).first():
-                novo_cert = models.Certificado(
-                    inscricao_id=insc.id,
-                    evento_id=insc.evento_id,
-                    codigo_unico=cert_data["codigo_unico"]
-                )
-                db.add(novo_cert)
-                db.commit()
-                db.refresh(novo_cert)
-
-        background.add_task(send_notification_guaranteed, {
-            "tipo": "checkin",
-            "destinatario": user_email,
-            "nome": user_nome,
-            "nome_evento": evento.nome
-        })
-    except Exception as e:
-        logger.error(f"Erro no fluxo pós-checkin: {e}")
+    registrar_pos_checkin(db, insc, email=email, nome=nome)
+    contagem = Contagem()
+    contagem.checkin(presenca.evento_id, presenca.origem, presenca.data_checkin)
+    await contagem.aplicar_async(db)
+    await db.commit()
 
+    despachante.notificar()
+    await feed_checkins.publicar([_evento_presenca(presenca)])
     return presenca
 
+def _evento_presenca(presenca):
+    return evento_checkin(
+        presenca.id, presenca.inscricao_id, presenca.usuario_id,
+        presenca.evento_id, presenca.origem, presenca.data_checkin,
+    )
+
 # --- ENDPOINTS ---
 
 @router.post("/admin/presencas/checkin", response_model=schemas.Presenca, status_code=201, tags=["Admin"])
 async def registrar_presenca_admin(
     body: schemas.PresencaCreate,
-    background: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin: User = Depends(get_current_admin_user)
 ):
-    insc = db.query(models.Inscricao).filter_by(id=body.inscricao_id).first()
+    insc = await db.get(models.Inscricao, body.inscricao_id)
     if not insc:
         raise ServiceError("Inscrição não encontrada", 404)
     
-    existente = db.query(models.Presenca).filter_by(inscricao_id=insc.id).first()
-    if existente: return existente
-
-    return await realizar_checkin_logica(insc, body.origem, background, db)
+    return await realizar_checkin_logica(insc, body.origem, db)
 
 @router.post("/checkin-qr/{token_uuid}", response_model=schemas.CheckinQRCodeResult)
 async def consume_checkin_qr(
     token_uuid: str,
-    background: BackgroundTasks,
-    db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    # Valida Token
-    token_obj = db.query(models.CheckinToken).filter_by(token=token_uuid).first()
-    now_utc = datetime.now(timezone.utc)
-    if not token_obj or not token_obj.is_active or token_obj.data_expiracao < now_utc:
+    """
+    Caminho rápido (services.checkin): token validado pelo cache e
+    inscrição + presença + outbox gravados em um único comando.
+    O QR do evento é público para todos os participantes: o token não é invalidado.
+    """
+    try:
+        token_uuid = str(uuid.UUID(token_uuid))
+    except ValueError:
         raise ServiceError("Token inválido ou expirado", 400)
 
-    # Auto-Inscrição (Inscrição Rápida)
-    insc = db.query(models.Inscricao).filter_by(usuario_id=user.id, evento_id=token_obj.evento_id).first()
-    if not insc:
-        # Cria inscrição na hora
-        insc = models.Inscricao(
-            evento_id=token_obj.evento_id,
-            usuario_id=user.id,
-            usuario_username=user.username,
-            status=models.InscricaoStatus.ATIVA.value
-        )
-        db.add(insc)
-        db.commit()
-        db.refresh(insc)
-    if insc.status == models.InscricaoStatus.CANCELADA.value:
+    resultado = await checkin_por_token(token_uuid, user, models.PresencaOrigem.QR_CODE.value)
+    if resultado is None:
+        raise ServiceError("Token inválido ou expirado", 400)
+
+    if resultado.status == models.InscricaoStatus.CANCELADA:
         raise ServiceError("Sua inscrição está cancelada. Reative-a no portal antes de fazer check-in.", 400)
-    
-    # Verifica Presença
-    if db.query(models.Presenca).filter_by(inscricao_id=insc.id).first():
-        return {"message": "Já registrado", "inscricao_id": insc.id, "presenca_registrada": True}
+    if resultado.presenca_id is None:
+        return {"message": "Já registrado", "inscricao_id": resultado.inscricao_id, "presenca_registrada": True}
 
-    # Registra Presença
-    await realizar_checkin_logica(insc, models.PresencaOrigem.QR_CODE.value, background, db)
-    
-    # Invalida token (se for uso único) - opcional, aqui mantemos ativo para outros usuarios usarem o mesmo QR do evento
-    # db.query(models.CheckinToken).filter_by(token=token_uuid).update({"is_active": False}) 
-    # NOTA: Geralmente QR de evento é publico para todos, então não invalidamos.
+    despachante.notificar()
+    await feed_checkins.publicar([evento_checkin(
+        resultado.presenca_id, resultado.inscricao_id, user.id, resultado.evento_id,
+        models.PresencaOrigem.QR_CODE.value, resultado.data_checkin,
+    )])
+    return {"message": "Sucesso", "inscricao_id": resultado.inscricao_id, "presenca_registrada": True}
+
+@router.get("/admin/eventos/{id}/checkins/stream", tags=["Admin"])
+async def stream_checkins_evento(
+    id: int,
+    db: AsyncSession = Depends(get_async_db),
+    admin: User = Depends(get_current_admin_user)
+):
+    """
+    Feed ao vivo (Server-Sent Events) dos check-ins do evento, para o painel.
+    Cada presença nova chega como `event: checkin`; `event: descartado`
+    indica que o cliente ficou para trás e deve reconectar.
+    """
+    if await db.get(models.Evento, id) is None:
+        raise ServiceError("Evento não encontrado", 404)
+    # Não segura a conexão do pool durante o stream
+    await db.close()
+
+    try:
+        assinante = feed_checkins.assinar(id)
+    except FeedLotado:
+        raise ServiceError("Limite de painéis ao vivo atingido. Tente novamente em instantes.", 503)
 
-    return {"message": "Sucesso", "inscricao_id": insc.id, "presenca_registrada": True}
+    return StreamingResponse(
+        stream_sse(assinante),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: o Nginx do gateway repassa cada evento sem bufferizar
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.post("/admin/sync/presencas", tags=["Admin", "Sync"])
 async def sync_presencas_offline(
     payload: schemas.SyncPayload,
-    background: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin: User = Depends(get_current_admin_user)
 ):
-    """Recebe lista de presenças capturadas offline e processa em lote."""
-    results = []
+    """
+    Recebe lista de presenças capturadas offline e processa em lote.
+
+    Fluxo set-based: uma consulta carrega inscrições e presenças existentes,
+    um único INSERT multi-linha grava as novas presenças e a emissão de
+    certificados acontece depois do commit, em lotes com concorrência limitada.
+    """
+    ids_inscricao = {item.inscricao_id for item in payload.presencas}
+    if not ids_inscricao:
+        return success({"sincronizadas": 0, "ids": [], "itens": []})
+
+    # 1. Uma única consulta: inscrições referenciadas + presença já existente
+    linhas = (await db.execute(
+        select(models.Inscricao, models.Presenca.id)
+        .outerjoin(models.Presenca, models.Presenca.inscricao_id == models.Inscricao.id)
+        .options(joinedload(models.Inscricao.evento))
+        .filter(models.Inscricao.id.in_(ids_inscricao))
+    )).all()
+    inscricoes = {}
+    presencas_existentes = {}
+    for insc, presenca_id in linhas:
+        inscricoes[insc.id] = insc
+        if presenca_id is not None:
+            presencas_existentes.setdefault(insc.id, presenca_id)
+
+    # 2. Monta as novas linhas (primeira ocorrência no lote vence)
+    novas = {}
     for item in payload.presencas:
-        insc = db.query(models.Inscricao).filter_by(id=item.inscricao_id).first()
-
-        if not insc:
-            continue 
-
-        if not db.query(models.Presenca).filter_by(inscricao_id=insc.id).first():
-            presenca = models.Presenca(
-                inscricao_id=insc.id,
-                usuario_id=insc.usuario_id,
-                evento_id=insc.evento_id,
-                origem=models.PresencaOrigem.SINCRONIZADO.value,
-                data_checkin=item.data_checkin
+        insc = inscricoes.get(item.inscricao_id)
+        if not insc or insc.id in presencas_existentes or insc.id in novas:
+            continue
+        novas[insc.id] = {
+            "inscricao_id": insc.id,
+            "usuario_id": insc.usuario_id,
+            "evento_id": insc.evento_id,
+            "origem": models.PresencaOrigem.SINCRONIZADO.value,
+            "data_checkin": item.data_checkin,
+        }
+
+    # 3. INSERT multi-linha em uma única transação
+    criadas = {}
+    if novas:
+        stmt = (
+            insert(models.Presenca)
+            .values(list(novas.values()))
+            # Check-in por QR pode ter gravado no meio tempo: quem já existe fica de fora
+            .on_conflict_do_nothing(index_elements=["inscricao_id"])
+            .returning(
+                models.Presenca.id, models.Presenca.inscricao_id,
+                models.Presenca.evento_id, models.Presenca.origem, models.Presenca.data_checkin,
             )
-            db.add(presenca)
-            db.commit()
-            results.append(presenca.id)
-            
-            evento = insc.evento
-            cert_data = await emitir_certificado_sincrono(insc, "usuario@sistema.com", evento)
-            
-            if cert_data and cert_data.get("codigo_unico"):
-                 if not db.query(models.Certificado).filter_by(inscricao_id=insc.id).first():
-                    novo_cert = models.Certificado(
-                        inscricao_id=insc.id,
-                        evento_id=insc.evento_id,
-                        codigo_unico=cert_data["codigo_unico"]
-                    )
-                    db.add(novo_cert)
-                    db.commit()
-
-    return success({"sincronizadas": len(results), "ids": results})
+        )
+        contagem = Contagem()
+        feed = []
+        for presenca_id, inscricao_id, evento_id, origem, data_checkin in await db.execute(stmt):
+            criadas[inscricao_id] = presenca_id
+            contagem.checkin(evento_id, origem, data_checkin)
+            feed.append(evento_checkin(
+                presenca_id, inscricao_id, inscricoes[inscricao_id].usuario_id,
+                evento_id, origem, data_checkin,
+            ))
+        await contagem.aplicar_async(db)
+        await db.commit()
+        await feed_checkins.publicar(feed)
+
+    # 4. Emissão de certificados fora da transação, em lotes
+    certificados = await _emitir_certificados_lote(
+        [inscricoes[i] for i in criadas], db
+    )
+    # O que não foi emitido agora fica no outbox para nova tentativa
+    faltantes = [inscricoes[i] for i in criadas if i not in certificados]
+    if faltantes:
+        for insc in faltantes:
+            registrar_certificado(db, insc)
+        await db.commit()
+        despachante.notificar()
+
+    # 5. Resultado por item, na mesma ordem do payload
+    itens = _itens_sync(
+        [item.inscricao_id for item in payload.presencas],
+        inscricoes, presencas_existentes, criadas, certificados,
+    )
+    return success({
+        "sincronizadas": len(criadas),
+        # Como sempre: só as presenças criadas agora (ordem do payload)
+        "ids": [i["presenca_id"] for i in itens if i["status"] == "registrada"],
+        "itens": itens,
+    })
+
+
+def _itens_sync(ids_payload, inscricoes, presencas_existentes, criadas, certificados):
+    """
+    Um item por entrada do payload, na mesma ordem: é por `itens` que o
+    app-local casa cada entrada com o resultado. Só a primeira ocorrência de
+    uma inscrição criada neste lote conta como "registrada"; as repetições
+    vêm como "ja_registrada".
+    """
+    itens = []
+    reportadas = set()
+    for inscricao_id in ids_payload:
+        if inscricao_id not in inscricoes:
+            status_item, presenca_id = "inscricao_nao_encontrada", None
+        elif inscricao_id in criadas and inscricao_id not in reportadas:
+            status_item, presenca_id = "registrada", criadas[inscricao_id]
+        else:
+            # Já existia no banco ou repetida dentro do próprio lote
+            status_item = "ja_registrada"
+            presenca_id = presencas_existentes.get(inscricao_id) or criadas.get(inscricao_id)
+        reportadas.add(inscricao_id)
+        itens.append({
+            "inscricao_id": inscricao_id,
+            "status": status_item,
+            "presenca_id": presenca_id,
+            "certificado": certificados.get(inscricao_id),
+        })
+    return itens
+
+
+async def _emitir_certificados_lote(inscricoes, db):
+    """
+    Emite certificados para as inscrições informadas em lotes
+    (/interno/certificados/emitir_lote) e grava todos os registros locais
+    com um único INSERT. Retorna {inscricao_id: codigo_unico}.
+    """
+    if not inscricoes:
+        return {}
+
+    codigos = await emitir_certificados_lote(
+        [(insc, "usuario@sistema.com", insc.evento) for insc in inscricoes]
+    )
+    if not codigos:
+        return {}
+
+    # Reaproveita a gravação síncrona dentro da sessão async
+    await db.run_sync(salvar_certificados_locais, inscricoes, codigos)
+    return codigos
 
 @router.post("/admin/checkin/generate", response_model=schemas.CheckinTokenResponse, tags=["Admin"])
 def generate_checkin_token(
@@ -181,8 +290,8 @@ def generate_checkin_token(
     if not evento:
         raise ServiceError("Evento não encontrado", 404)
 
-    #Invalida tokens anteriores deste evento
-    db.query(models.CheckinToken).filter_by(evento_id=body.evento_id).update({"is_active": False})
+    #Invalida tokens anteriores deste evento (só os ativos: índice parcial, sem reescrever os inativos)
+    db.query(models.CheckinToken).filter_by(evento_id=body.evento_id, is_active=True).update({"is_active": False})
     
     token_uuid = str(uuid.uuid4())
     now = datetime.now(timezone.utc)
@@ -197,6 +306,7 @@ def generate_checkin_token(
     db.add(token)
     db.commit()
     db.refresh(token)
+    tokens_checkin.invalidar_evento(body.evento_id)
 
     base_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
 
@@ -218,11 +328,17 @@ def deletar_presenca_admin(
     admin: User = Depends(get_current_admin_user)
 ):
     """Remove uma presença (Correção de erro operacional)."""
-    presenca = db.query(models.Presenca).filter_by(id=id).first()
-    if not presenca:
+    # DELETE ... RETURNING: só quem removeu de fato desconta das estatísticas
+    P = models.Presenca
+    removida = db.execute(
+        delete(P).where(P.id == id).returning(P.evento_id, P.origem, P.data_checkin)
+    ).first()
+    if removida is None:
         # Se já não existe, retorna 200 para o sync não travar
         return success("Presença já removida ou inexistente.")
-    
-    db.delete(presenca)
+
+    contagem = Contagem()
+    contagem.checkin(removida.evento_id, removida.origem, removida.data_checkin, -1)
+    contagem.aplicar(db)
     db.commit()
     return success("Presença removida com sucesso.")
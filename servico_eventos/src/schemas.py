@@ -1,7 +1,7 @@
 # servico_eventos/src/schemas.py
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 from models import InscricaoStatus, PresencaOrigem
 from uuid import UUID
@@ -52,6 +52,30 @@ class EventoUpdate(BaseModel):
     _sanitize = field_validator("nome", "descricao", mode="before")(strip)
 
 
+class InscricoesEstatisticas(BaseModel):
+    total: int
+    por_status: Dict[str, int]
+
+
+class CheckinsEstatisticas(BaseModel):
+    total: int
+    por_origem: Dict[str, int]
+
+
+class CheckinsMinuto(BaseModel):
+    minuto: datetime
+    total: int
+
+
+class EventoEstatisticas(BaseModel):
+    """Estatísticas de participação de um evento (contadores incrementais)."""
+    evento_id: int
+    inscricoes: InscricoesEstatisticas
+    checkins: CheckinsEstatisticas
+    certificados_emitidos: int
+    checkins_por_minuto: List[CheckinsMinuto]
+
+
 # ============================================================
 #  CERTIFICADOS (Definido antes para ser usado em InscricaoDetalhes)
 # ============================================================
@@ -0,0 +1,258 @@
+# servico_eventos/src/services/checkin.py
+
+"""
+Caminho rápido do check-in por QR Code.
+
+Na entrada de um evento centenas de pessoas leem o mesmo QR em poucos
+minutos. Aqui:
+  * os CheckinTokens ativos ficam em cache no processo (respeitando a
+    expiração), invalidados quando um novo token é gerado para o evento;
+  * inscrição (se faltar), presença e tarefas do outbox são gravadas em
+    um único comando (CTE) em autocommit: uma ida ao banco por leitura.
+
+Inscrição e presença usam INSERT ... ON CONFLICT DO NOTHING sobre as
+constraints únicas, então leituras repetidas ou simultâneas não duplicam.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+from sqlalchemy import exists, func, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert
+
+import models
+from database import async_engine
+from services.estatisticas import (
+    chave_checkins, chave_inscricoes, fatia_aleatoria, somar_contadores, somar_minutos,
+)
+from servico_comum.logger import configure_logger
+
+logger = configure_logger("servico_eventos.checkin")
+
+# Teto de permanência no cache: limita a defasagem entre workers quando um
+# token é desativado em outro processo
+CHECKIN_TOKEN_CACHE_TTL = float(os.getenv("CHECKIN_TOKEN_CACHE_TTL", "30"))
+# Tokens inexistentes/expirados também ficam em cache (evita martelar o banco)
+CHECKIN_TOKEN_CACHE_NEGATIVO_TTL = float(os.getenv("CHECKIN_TOKEN_CACHE_NEGATIVO_TTL", "5"))
+CHECKIN_TOKEN_CACHE_MAX = int(os.getenv("CHECKIN_TOKEN_CACHE_MAX", "1000"))
+
+
+# ============================================================
+#  CACHE DE TOKENS
+# ============================================================
+
+class CacheTokensCheckin:
+
+    def __init__(self, ttl: float, ttl_negativo: float, max_itens: int):
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+        self.max_itens = max_itens
+        # token -> (válido_até_monotonic, evento_id | None, data_expiracao | None)
+        self._itens = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidacoes": 0}
+
+    def _guardar(self, token: str, evento_id: Optional[int], expiracao: Optional[datetime]):
+        agora = time.monotonic()
+        if evento_id is None:
+            validade = agora + self.ttl_negativo
+        else:
+            restante = (expiracao - datetime.now(timezone.utc)).total_seconds()
+            validade = agora + min(self.ttl, max(0.0, restante))
+        with self._lock:
+            if len(self._itens) >= self.max_itens:
+                # Poucos tokens ativos por vez: basta descartar os vencidos
+                self._itens = {k: v for k, v in self._itens.items() if v[0] > agora}
+                if len(self._itens) >= self.max_itens:
+                    self._itens.clear()
+            self._itens[token] = (validade, evento_id, expiracao)
+
+    async def evento_do_token(self, conn, token: str) -> Optional[int]:
+        """evento_id de um token ativo e dentro da validade; None se inválido."""
+        item = self._itens.get(token)
+        if item is not None and item[0] > time.monotonic():
+            self._stats["hits"] += 1
+            _, evento_id, expiracao = item
+            if evento_id is not None and expiracao > datetime.now(timezone.utc):
+                return evento_id
+            return None
+
+        self._stats["misses"] += 1
+        T = models.CheckinToken
+        linha = (await conn.execute(
+            select(T.evento_id, T.data_expiracao).where(
+                T.token == token,
+                T.is_active.is_(True),
+                T.data_expiracao > func.now(),
+            )
+        )).first()
+        if linha is None:
+            self._guardar(token, None, None)
+            return None
+        self._guardar(token, linha.evento_id, linha.data_expiracao)
+        return linha.evento_id
+
+    def invalidar_evento(self, evento_id: int):
+        """Chamado ao gerar um novo token: os anteriores do evento foram desativados."""
+        with self._lock:
+            self._itens = {k: v for k, v in self._itens.items() if v[1] != evento_id}
+        self._stats["invalidacoes"] += 1
+
+    def estatisticas(self) -> dict:
+        return {"itens": len(self._itens), **self._stats}
+
+
+tokens_checkin = CacheTokensCheckin(
+    CHECKIN_TOKEN_CACHE_TTL, CHECKIN_TOKEN_CACHE_NEGATIVO_TTL, CHECKIN_TOKEN_CACHE_MAX
+)
+
+
+class ResultadoCheckin(NamedTuple):
+    evento_id: int
+    inscricao_id: int
+    status: models.InscricaoStatus
+    presenca_id: Optional[int]       # None: presença já existia ou inscrição cancelada
+    data_checkin: Optional[datetime]
+
+
+# ============================================================
+#  CHECK-IN EM UM ÚNICO COMANDO
+# ============================================================
+
+def _comando_checkin(evento_id: int, user, origem: str):
+    """
+    CTE única: reaproveita (ou cria) a inscrição, insere a presença com
+    ON CONFLICT DO NOTHING e, só se ela foi criada, enfileira certificado e
+    e-mail no outbox e soma as estatísticas do evento.
+    Retorna (inscricao_id, status, presenca_id, data_checkin).
+    """
+    I, P, O = models.Inscricao, models.Presenca, models.TarefaOutbox
+    email = user.email
+    nome = user.full_name or user.username
+
+    existente = (
+        select(I.id, I.status)
+        .where(I.usuario_id == user.id, I.evento_id == evento_id)
+        .order_by(I.id)
+        .limit(1)
+        .cte("insc_existente")
+    )
+    nova = (
+        insert(I)
+        .from_select(
+            ["evento_id", "usuario_id", "usuario_username", "status"],
+            select(
+                literal(evento_id), literal(user.id), literal(user.username),
+                literal(models.InscricaoStatus.ATIVA, I.status.type),
+            ).where(~exists(select(existente.c.id))),
+        )
+        # Outra leitura simultânea criou a inscrição depois do snapshot
+        .on_conflict_do_nothing(constraint="uq_inscricoes_usuario_evento")
+        .returning(I.id, I.status)
+        .cte("insc_nova")
+    )
+    insc = union_all(
+        select(existente.c.id, existente.c.status),
+        select(nova.c.id, nova.c.status),
+    ).cte("insc")
+
+    presenca = (
+        insert(P)
+        .from_select(
+            ["inscricao_id", "usuario_id", "evento_id", "origem"],
+            select(insc.c.id, literal(user.id), literal(evento_id), literal(origem))
+            .where(insc.c.status != models.InscricaoStatus.CANCELADA),
+        )
+        .on_conflict_do_nothing(index_elements=["inscricao_id"])
+        .returning(P.id, P.inscricao_id, P.data_checkin)
+        .cte("presenca_nova")
+    )
+
+    def _tarefa(nome_cte: str, tipo: str, payload):
+        return (
+            insert(O)
+            .from_select(
+                ["tipo", "payload", "status", "tentativas"],
+                select(
+                    literal(tipo), payload,
+                    literal(models.OutboxStatus.PENDENTE.value), literal(0),
+                ).select_from(presenca),
+            )
+            .cte(nome_cte)
+        )
+
+    tarefa_certificado = _tarefa(
+        "outbox_certificado", models.OutboxTipo.CERTIFICADO.value,
+        func.json_build_object("inscricao_id", presenca.c.inscricao_id, "usuario_email", email),
+    )
+    tarefa_notificacao = _tarefa(
+        "outbox_notificacao", models.OutboxTipo.NOTIFICACAO.value,
+        func.json_build_object(
+            "tipo", "checkin", "inscricao_id", presenca.c.inscricao_id,
+            "destinatario", email, "nome", nome,
+        ),
+    )
+
+    # Estatísticas do evento: inscrição criada aqui e presença nova
+    fatia = fatia_aleatoria()
+    contadores = (
+        somar_contadores(
+            insert(models.ContadorEvento).from_select(
+                ["evento_id", "chave", "fatia", "valor"],
+                union_all(
+                    select(
+                        literal(evento_id), literal(chave_inscricoes(models.InscricaoStatus.ATIVA)),
+                        literal(fatia), literal(1),
+                    ).select_from(nova),
+                    select(
+                        literal(evento_id), literal(chave_checkins(origem)), literal(fatia), literal(1),
+                    ).select_from(presenca),
+                ),
+            )
+        )
+        .cte("contadores")
+    )
+    minuto = (
+        somar_minutos(
+            insert(models.CheckinsPorMinuto).from_select(
+                ["evento_id", "minuto", "fatia", "total"],
+                select(
+                    literal(evento_id), func.date_trunc("minute", presenca.c.data_checkin),
+                    literal(fatia), literal(1),
+                ),
+            )
+        )
+        .cte("checkins_minuto")
+    )
+
+    return (
+        select(
+            insc.c.id, insc.c.status,
+            select(presenca.c.id).scalar_subquery().label("presenca_id"),
+            select(presenca.c.data_checkin).scalar_subquery().label("data_checkin"),
+        )
+        # CTEs de escrita não referenciadas precisam ser declaradas para serem executadas
+        .add_cte(tarefa_certificado, tarefa_notificacao, contadores, minuto)
+        .limit(1)
+    )
+
+
+async def checkin_por_token(token: str, user, origem: str):
+    """
+    Valida o token (cache) e registra o check-in em autocommit.
+    Retorna None se o token for inválido; senão um ResultadoCheckin.
+    """
+    async with async_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        evento_id = await tokens_checkin.evento_do_token(conn, token)
+        if evento_id is None:
+            return None
+        comando = _comando_checkin(evento_id, user, origem)
+        linha = (await conn.execute(comando)).first()
+        if linha is None:
+            # Perdeu a corrida na criação da inscrição: o novo snapshot já a enxerga
+            linha = (await conn.execute(comando)).one()
+        return ResultadoCheckin(evento_id, linha.id, linha.status, linha.presenca_id, linha.data_checkin)
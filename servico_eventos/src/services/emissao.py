@@ -0,0 +1,47 @@
+# servico_eventos/src/services/emissao.py
+
+"""
+Persistência local dos certificados emitidos pelo servico_certificados.
+"""
+
+from sqlalchemy.dialects.postgresql import insert
+
+import models
+from services.estatisticas import Contagem
+
+
+def salvar_certificados_locais(db, inscricoes, codigos: dict) -> int:
+    """
+    Grava com um único INSERT ... ON CONFLICT (inscricao_id) DO NOTHING os
+    certificados de `codigos` ({inscricao_id: codigo_unico}); os que já
+    existem localmente ficam como estão. `inscricoes` é um iterável de
+    Inscricao. Faz commit; retorna quantos gravou.
+    """
+    if not codigos:
+        return 0
+
+    novos = [
+        {
+            "inscricao_id": insc.id,
+            "evento_id": insc.evento_id,
+            "codigo_unico": codigos[insc.id],
+        }
+        for insc in inscricoes
+        if insc.id in codigos
+    ]
+    if not novos:
+        return 0
+
+    stmt = (
+        insert(models.Certificado)
+        .on_conflict_do_nothing(index_elements=["inscricao_id"])
+        .returning(models.Certificado.evento_id)
+    )
+    contagem = Contagem()
+    gravados = 0
+    for (evento_id,) in db.execute(stmt, novos):
+        contagem.certificado(evento_id)
+        gravados += 1
+    contagem.aplicar(db)
+    db.commit()
+    return gravados
@@ -0,0 +1,261 @@
+# servico_eventos/src/services/estatisticas.py
+
+"""
+Estatísticas por evento servidas de contadores incrementais.
+
+Cada escrita que muda inscrições, presenças ou certificados acumula os
+deltas em uma `Contagem` e os grava (INSERT ... ON CONFLICT DO UPDATE
+valor = valor + delta) na mesma transação. `/admin/eventos/{id}/stats`
+só soma algumas linhas, sem varrer as tabelas do evento.
+
+Os contadores são fatiados (ESTATISTICAS_FATIAS linhas por chave, uma
+escolhida ao acaso por transação): check-ins simultâneos do mesmo evento
+não ficam em fila pelo lock de uma única linha.
+
+Reconstrução a partir das tabelas (ex.: após correção manual no banco):
+
+    python -m services.estatisticas [--evento ID]
+"""
+
+import os
+import random
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import String, cast, delete, func, literal, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert
+
+import models
+from servico_comum.logger import configure_logger
+
+logger = configure_logger("servico_eventos.estatisticas")
+
+ESTATISTICAS_FATIAS = max(1, int(os.getenv("ESTATISTICAS_FATIAS", "8")))
+
+PREFIXO_INSCRICOES = "inscricoes."
+PREFIXO_CHECKINS = "checkins."
+CHAVE_CERTIFICADOS = "certificados"
+
+
+def chave_inscricoes(status) -> str:
+    return PREFIXO_INSCRICOES + models.InscricaoStatus(status).value
+
+
+def chave_checkins(origem: Optional[str]) -> str:
+    return PREFIXO_CHECKINS + (origem or models.PresencaOrigem.ONLINE.value)
+
+
+def _minuto(instante: datetime) -> datetime:
+    return instante.replace(second=0, microsecond=0)
+
+
+def fatia_aleatoria() -> int:
+    return random.randrange(ESTATISTICAS_FATIAS)
+
+
+# ============================================================
+#  ESCRITA: DELTAS NA TRANSAÇÃO DO CHAMADOR
+# ============================================================
+
+def somar_contadores(stmt):
+    """ON CONFLICT que acumula `valor` em um INSERT em contadores_evento."""
+    C = models.ContadorEvento
+    return stmt.on_conflict_do_update(
+        index_elements=[C.evento_id, C.chave, C.fatia],
+        set_={"valor": C.valor + stmt.excluded.valor},
+    )
+
+
+def somar_minutos(stmt):
+    """ON CONFLICT que acumula `total` em um INSERT em checkins_por_minuto."""
+    M = models.CheckinsPorMinuto
+    return stmt.on_conflict_do_update(
+        index_elements=[M.evento_id, M.minuto, M.fatia],
+        set_={"total": M.total + stmt.excluded.total},
+    )
+
+
+class Contagem:
+    """
+    Deltas de uma transação. Chaves repetidas são somadas antes de gravar
+    (um mesmo INSERT ... ON CONFLICT não pode tocar a mesma linha duas vezes).
+    """
+
+    def __init__(self):
+        self.fatia = fatia_aleatoria()
+        self._contadores = defaultdict(int)  # (evento_id, chave) -> delta
+        self._minutos = defaultdict(int)     # (evento_id, minuto) -> delta
+
+    def inscricao(self, evento_id: int, status, delta: int = 1):
+        self._contadores[(evento_id, chave_inscricoes(status))] += delta
+
+    def mudanca_status(self, evento_id: int, anterior, novo):
+        self.inscricao(evento_id, anterior, -1)
+        self.inscricao(evento_id, novo, +1)
+
+    def checkin(self, evento_id: int, origem: Optional[str], instante: Optional[datetime], delta: int = 1):
+        self._contadores[(evento_id, chave_checkins(origem))] += delta
+        if instante is not None:
+            self._minutos[(evento_id, _minuto(instante))] += delta
+
+    def certificado(self, evento_id: int, delta: int = 1):
+        self._contadores[(evento_id, CHAVE_CERTIFICADOS)] += delta
+
+    def comandos(self) -> list:
+        """
+        Linhas sempre em ordem de chave: duas transações que tocam as mesmas
+        linhas (ex.: cancelamento e reativação na mesma fatia) as travam na
+        mesma ordem e não entram em deadlock.
+        """
+        comandos = []
+        contadores = [
+            {"evento_id": e, "chave": c, "fatia": self.fatia, "valor": d}
+            for (e, c), d in sorted(self._contadores.items()) if d
+        ]
+        if contadores:
+            comandos.append(somar_contadores(insert(models.ContadorEvento).values(contadores)))
+        minutos = [
+            {"evento_id": e, "minuto": m, "fatia": self.fatia, "total": d}
+            for (e, m), d in sorted(self._minutos.items()) if d
+        ]
+        if minutos:
+            comandos.append(somar_minutos(insert(models.CheckinsPorMinuto).values(minutos)))
+        return comandos
+
+    def aplicar(self, db):
+        """Session/Connection síncrona; o commit é do chamador."""
+        for comando in self.comandos():
+            db.execute(comando)
+
+    async def aplicar_async(self, db):
+        for comando in self.comandos():
+            await db.execute(comando)
+
+
+# ============================================================
+#  LEITURA
+# ============================================================
+
+def consultar(db, evento_id: int, desde: Optional[datetime] = None, ate: Optional[datetime] = None) -> dict:
+    C, M = models.ContadorEvento, models.CheckinsPorMinuto
+
+    contadores = dict(
+        db.execute(
+            select(C.chave, func.sum(C.valor))
+            .where(C.evento_id == evento_id)
+            .group_by(C.chave)
+        ).all()
+    )
+
+    linha_do_tempo = select(M.minuto, func.sum(M.total).label("total")).where(M.evento_id == evento_id)
+    if desde:
+        linha_do_tempo = linha_do_tempo.where(M.minuto >= _minuto(desde))
+    if ate:
+        linha_do_tempo = linha_do_tempo.where(M.minuto <= ate)
+    linha_do_tempo = linha_do_tempo.group_by(M.minuto).order_by(M.minuto)
+
+    def _por_prefixo(prefixo):
+        return {
+            chave[len(prefixo):]: int(valor)
+            for chave, valor in contadores.items()
+            if chave.startswith(prefixo) and valor
+        }
+
+    inscricoes = {status.value: 0 for status in models.InscricaoStatus}
+    inscricoes.update(_por_prefixo(PREFIXO_INSCRICOES))
+    checkins = _por_prefixo(PREFIXO_CHECKINS)
+
+    return {
+        "evento_id": evento_id,
+        "inscricoes": {"total": sum(inscricoes.values()), "por_status": inscricoes},
+        "checkins": {"total": sum(checkins.values()), "por_origem": checkins},
+        "certificados_emitidos": int(contadores.get(CHAVE_CERTIFICADOS) or 0),
+        "checkins_por_minuto": [
+            {"minuto": minuto, "total": int(total)}
+            for minuto, total in db.execute(linha_do_tempo)
+            if total
+        ],
+    }
+
+
+# ============================================================
+#  RECONSTRUÇÃO
+# ============================================================
+
+def reconstruir(db, evento_id: Optional[int] = None) -> dict:
+    """
+    Recalcula os contadores (de um evento ou de todos) a partir das
+    tabelas. O lock nas tabelas de contadores espera as transações que já
+    as atualizaram e segura as novas até o commit: nada é contado duas
+    vezes nem perdido. Faz commit.
+    """
+    C, M = models.ContadorEvento, models.CheckinsPorMinuto
+    I, P, Cert = models.Inscricao, models.Presenca, models.Certificado
+
+    def _do_evento(consulta, coluna):
+        return consulta.where(coluna == evento_id) if evento_id is not None else consulta
+
+    db.execute(text("LOCK TABLE contadores_evento, checkins_por_minuto IN SHARE ROW EXCLUSIVE MODE"))
+    db.execute(_do_evento(delete(C), C.evento_id))
+    db.execute(_do_evento(delete(M), M.evento_id))
+
+    # Status são gravados pelo nome (ATIVA); a chave usa o valor (ativa)
+    por_status = _do_evento(
+        select(
+            I.evento_id,
+            literal(PREFIXO_INSCRICOES) + func.lower(cast(I.status, String)),
+            literal(0),
+            func.count(),
+        ).group_by(I.evento_id, I.status),
+        I.evento_id,
+    )
+    origem = func.coalesce(P.origem, models.PresencaOrigem.ONLINE.value)
+    por_origem = _do_evento(
+        select(P.evento_id, literal(PREFIXO_CHECKINS) + origem, literal(0), func.count())
+        .group_by(P.evento_id, origem),
+        P.evento_id,
+    )
+    certificados = _do_evento(
+        select(Cert.evento_id, literal(CHAVE_CERTIFICADOS), literal(0), func.count())
+        .group_by(Cert.evento_id),
+        Cert.evento_id,
+    )
+    contadores = db.execute(
+        insert(C).from_select(
+            ["evento_id", "chave", "fatia", "valor"],
+            union_all(por_status, por_origem, certificados),
+        )
+    ).rowcount
+
+    minuto = func.date_trunc("minute", P.data_checkin)
+    minutos = db.execute(
+        insert(M).from_select(
+            ["evento_id", "minuto", "fatia", "total"],
+            _do_evento(
+                select(P.evento_id, minuto, literal(0), func.count())
+                .where(P.data_checkin.is_not(None))
+                .group_by(P.evento_id, minuto),
+                P.evento_id,
+            ),
+        )
+    ).rowcount
+    db.commit()
+
+    logger.info("estatisticas_reconstruidas", extra={
+        "evento_id": evento_id, "contadores": contadores, "minutos": minutos,
+    })
+    return {"contadores": contadores, "minutos": minutos}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Recalcula os contadores de estatísticas por evento.")
+    parser.add_argument("--evento", type=int, default=None, help="Só este evento (padrão: todos).")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        print(reconstruir(db, args.evento))
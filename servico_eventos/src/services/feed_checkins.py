@@ -0,0 +1,237 @@
+# servico_eventos/src/services/feed_checkins.py
+
+"""
+Feed de check-ins ao vivo (Server-Sent Events) para os painéis de evento.
+
+Cada presença nova é publicada depois do commit e distribuída aos
+assinantes do evento por uma fila limitada por assinante. O quadro SSE é
+montado uma vez por presença, não uma vez por assinante. Quem não
+consome no ritmo (fila cheia) é desconectado com `event: descartado` e
+o painel reconecta: um cliente lento não segura memória nem atrasa os
+demais.
+
+Backends:
+    local (padrão) -> fan-out no próprio processo (um worker)
+    postgres       -> publicação via NOTIFY e um LISTEN por worker, para
+                      que o painel veja check-ins atendidos por qualquer worker
+"""
+
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import func, select
+
+from database import DSN_POSTGRES, async_engine
+from servico_comum.logger import configure_logger
+
+logger = configure_logger("servico_eventos.feed_checkins")
+
+FEED_CHECKINS_BACKEND = os.getenv("FEED_CHECKINS_BACKEND", "local").lower()
+# Mensagens pendentes por assinante antes de descartá-lo
+FEED_CHECKINS_FILA = int(os.getenv("FEED_CHECKINS_FILA", "256"))
+FEED_CHECKINS_MAX_ASSINANTES = int(os.getenv("FEED_CHECKINS_MAX_ASSINANTES", "1000"))
+# Comentário SSE periódico: mantém proxies abertos e detecta desconexão
+FEED_CHECKINS_KEEPALIVE = float(os.getenv("FEED_CHECKINS_KEEPALIVE", "15"))
+FEED_CHECKINS_CANAL = os.getenv("FEED_CHECKINS_CANAL", "checkins")
+# NOTIFY aceita até 8000 bytes de payload: lotes grandes são divididos
+FEED_CHECKINS_NOTIFY_LOTE = 40
+
+# Marcadores de fim de stream colocados na fila do assinante
+DESCARTADO = "descartado"
+ENCERRADO = "encerrado"
+
+
+class FeedLotado(Exception):
+    """Limite de assinantes simultâneos do worker atingido."""
+
+
+def evento_checkin(presenca_id: int, inscricao_id: int, usuario_id: int, evento_id: int,
+                   origem: Optional[str], data_checkin: Optional[datetime]) -> dict:
+    return {
+        "presenca_id": presenca_id,
+        "inscricao_id": inscricao_id,
+        "usuario_id": usuario_id,
+        "evento_id": evento_id,
+        "origem": origem,
+        "data_checkin": (data_checkin or datetime.now(timezone.utc)).isoformat(),
+    }
+
+
+def _quadro_sse(evento: dict) -> str:
+    return f"id: {evento['presenca_id']}\nevent: checkin\ndata: {json.dumps(evento)}\n\n"
+
+
+class Assinante:
+
+    def __init__(self, evento_id: int, tamanho_fila: int):
+        self.evento_id = evento_id
+        self.fila = asyncio.Queue(maxsize=tamanho_fila)
+
+    def encerrar(self, motivo: str):
+        """Esvazia a fila e deixa só o marcador de fim."""
+        while not self.fila.empty():
+            self.fila.get_nowait()
+        self.fila.put_nowait(motivo)
+
+
+class FeedCheckins:
+
+    def __init__(self, backend: str, tamanho_fila: int, max_assinantes: int):
+        self.backend = backend
+        self.tamanho_fila = tamanho_fila
+        self.max_assinantes = max_assinantes
+        self._assinantes = {}  # evento_id -> set[Assinante]
+        self._total = 0
+        self._escuta: Optional[asyncio.Task] = None
+        self._conexao = None   # conexão asyncpg dedicada ao LISTEN
+        self._stats = {"publicados": 0, "entregues": 0, "descartados": 0, "falhas_notify": 0}
+
+    # --------------------------------------------------------
+    #  Assinaturas
+    # --------------------------------------------------------
+
+    def assinar(self, evento_id: int) -> Assinante:
+        if self._total >= self.max_assinantes:
+            raise FeedLotado()
+        assinante = Assinante(evento_id, self.tamanho_fila)
+        self._assinantes.setdefault(evento_id, set()).add(assinante)
+        self._total += 1
+        return assinante
+
+    def cancelar(self, assinante: Assinante):
+        assinantes = self._assinantes.get(assinante.evento_id)
+        if assinantes is None or assinante not in assinantes:
+            return
+        assinantes.discard(assinante)
+        self._total -= 1
+        if not assinantes:
+            del self._assinantes[assinante.evento_id]
+
+    # --------------------------------------------------------
+    #  Publicação (chamada depois do commit)
+    # --------------------------------------------------------
+
+    async def publicar(self, eventos: Iterable[dict]):
+        """Nunca levanta: o check-in já foi gravado, o feed é acessório."""
+        eventos = list(eventos)
+        if not eventos:
+            return
+        self._stats["publicados"] += len(eventos)
+
+        if self.backend == "postgres" and self._conexao is not None:
+            try:
+                async with async_engine.connect() as conn:
+                    for i in range(0, len(eventos), FEED_CHECKINS_NOTIFY_LOTE):
+                        lote = json.dumps(eventos[i:i + FEED_CHECKINS_NOTIFY_LOTE])
+                        await conn.execute(select(func.pg_notify(FEED_CHECKINS_CANAL, lote)))
+                    await conn.commit()
+                return
+            except Exception as e:
+                self._stats["falhas_notify"] += 1
+                logger.warning("feed_checkins_notify_falha", extra={"error": str(e)})
+        # Backend local, ou LISTEN fora do ar: ao menos este worker entrega
+        self._distribuir(eventos)
+
+    def _distribuir(self, eventos: list):
+        for evento in eventos:
+            assinantes = self._assinantes.get(evento.get("evento_id"))
+            if not assinantes:
+                continue
+            quadro = _quadro_sse(evento)
+            for assinante in list(assinantes):
+                try:
+                    assinante.fila.put_nowait(quadro)
+                    self._stats["entregues"] += 1
+                except asyncio.QueueFull:
+                    # Consumidor lento: sai do feed em vez de acumular memória
+                    self.cancelar(assinante)
+                    assinante.encerrar(DESCARTADO)
+                    self._stats["descartados"] += 1
+                    logger.warning("feed_checkins_assinante_descartado", extra={"evento_id": assinante.evento_id})
+
+    # --------------------------------------------------------
+    #  LISTEN/NOTIFY
+    # --------------------------------------------------------
+
+    async def iniciar(self):
+        if self.backend == "postgres":
+            self._escuta = asyncio.create_task(self._escutar())
+        logger.info("feed_checkins_iniciado", extra={"backend": self.backend})
+
+    async def encerrar(self):
+        if self._escuta is not None:
+            self._escuta.cancel()
+            await asyncio.gather(self._escuta, return_exceptions=True)
+            self._escuta = None
+        # Streams abertos terminam sozinhos em vez de segurar o desligamento
+        for assinantes in list(self._assinantes.values()):
+            for assinante in list(assinantes):
+                self.cancelar(assinante)
+                assinante.encerrar(ENCERRADO)
+
+    def _ao_notificar(self, conexao, pid, canal, payload):
+        try:
+            self._distribuir(json.loads(payload))
+        except ValueError:
+            logger.warning("feed_checkins_payload_invalido", extra={"canal": canal})
+
+    async def _escutar(self):
+        import asyncpg
+
+        espera = 1.0
+        while True:
+            perdida = asyncio.get_running_loop().create_future()
+            try:
+                self._conexao = await asyncpg.connect(DSN_POSTGRES)
+                self._conexao.add_termination_listener(
+                    lambda _: perdida.done() or perdida.set_result(None)
+                )
+                await self._conexao.add_listener(FEED_CHECKINS_CANAL, self._ao_notificar)
+                logger.info("feed_checkins_escutando", extra={"canal": FEED_CHECKINS_CANAL})
+                espera = 1.0
+                await perdida
+                logger.warning("feed_checkins_conexao_perdida")
+            except asyncio.CancelledError:
+                if self._conexao is not None:
+                    await self._conexao.close()
+                raise
+            except Exception as e:
+                logger.error("feed_checkins_listen_falha", extra={"error": str(e)})
+            self._conexao = None
+            await asyncio.sleep(espera)
+            espera = min(espera * 2, 30.0)
+
+    # --------------------------------------------------------
+
+    def estatisticas(self) -> dict:
+        return {
+            "backend": self.backend,
+            "escutando": self._conexao is not None,
+            "assinantes": self._total,
+            "eventos_assistidos": len(self._assinantes),
+            **self._stats,
+        }
+
+
+feed_checkins = FeedCheckins(FEED_CHECKINS_BACKEND, FEED_CHECKINS_FILA, FEED_CHECKINS_MAX_ASSINANTES)
+
+
+async def stream_sse(assinante: Assinante, keepalive: float = FEED_CHECKINS_KEEPALIVE):
+    """Gerador do corpo text/event-stream; libera a assinatura ao terminar."""
+    try:
+        yield f"retry: 3000\n: evento {assinante.evento_id}\n\n"
+        while True:
+            try:
+                quadro = await asyncio.wait_for(assinante.fila.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if quadro in (DESCARTADO, ENCERRADO):
+                yield f"event: {quadro}\ndata: {{}}\n\n"
+                return
+            yield quadro
+    finally:
+        feed_checkins.cancelar(assinante)
@@ -0,0 +1,105 @@
+# servico_eventos/src/services/inscricoes.py
+
+"""
+Inscrição em um único comando.
+
+Com a constraint única (usuario_id, evento_id) a inscrição é um
+INSERT ... ON CONFLICT: cria, reativa uma inscrição cancelada ou não faz
+nada se já estiver ativa. Pedidos simultâneos do mesmo usuário não geram
+duplicatas e o caminho comum não precisa do SELECT prévio.
+Os contadores de estatísticas são atualizados na mesma transação.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+
+import models
+from services.estatisticas import Contagem
+
+# Resultado do upsert
+CRIADA = "criada"
+REATIVADA = "reativada"
+EXISTENTE = "existente"
+
+
+def comando_inscricao(evento_id: int, usuario_id: int, username: str):
+    """
+    Upsert que só toca na linha existente se ela estiver cancelada.
+    RETURNING traz a inscrição e se ela foi inserida (xmax = 0) ou
+    reativada; sem linha retornada, a inscrição já estava ativa.
+    """
+    I = models.Inscricao
+    return (
+        insert(I)
+        .values(
+            evento_id=evento_id,
+            usuario_id=usuario_id,
+            usuario_username=username,
+            status=models.InscricaoStatus.ATIVA,
+        )
+        .on_conflict_do_update(
+            constraint="uq_inscricoes_usuario_evento",
+            set_={"status": models.InscricaoStatus.ATIVA, "updated_at": func.now()},
+            where=I.status == models.InscricaoStatus.CANCELADA,
+        )
+        .returning(I, literal_column("xmax = 0").label("inserida"))
+        .execution_options(populate_existing=True)
+    )
+
+
+def consulta_inscricao(evento_id: int, usuario_id: int):
+    return select(models.Inscricao).filter_by(usuario_id=usuario_id, evento_id=evento_id)
+
+
+def _resultado(linha):
+    return linha.Inscricao, CRIADA if linha.inserida else REATIVADA
+
+
+def _contagem(evento_id: int, linha) -> Contagem:
+    contagem = Contagem()
+    if linha is None:
+        return contagem
+    if linha.inserida:
+        contagem.inscricao(evento_id, models.InscricaoStatus.ATIVA)
+    else:
+        contagem.mudanca_status(evento_id, models.InscricaoStatus.CANCELADA, models.InscricaoStatus.ATIVA)
+    return contagem
+
+
+def inscrever(db, evento_id: int, usuario_id: int, username: str):
+    """Sessão síncrona. Faz commit; retorna (inscricao, CRIADA | REATIVADA | EXISTENTE)."""
+    linha = db.execute(comando_inscricao(evento_id, usuario_id, username)).first()
+    _contagem(evento_id, linha).aplicar(db)
+    db.commit()
+    if linha is not None:
+        return _resultado(linha)
+    return db.scalars(consulta_inscricao(evento_id, usuario_id)).one(), EXISTENTE
+
+
+async def inscrever_async(db, evento_id: int, usuario_id: int, username: str):
+    """Mesmo que `inscrever`, para AsyncSession."""
+    linha = (await db.execute(comando_inscricao(evento_id, usuario_id, username))).first()
+    await _contagem(evento_id, linha).aplicar_async(db)
+    await db.commit()
+    if linha is not None:
+        return _resultado(linha)
+    return (await db.scalars(consulta_inscricao(evento_id, usuario_id))).one(), EXISTENTE
+
+
+def cancelar(db, insc: models.Inscricao):
+    """
+    Cancela a inscrição (sessão síncrona) e ajusta os contadores. O status
+    anterior é relido com FOR UPDATE: cancelamento e reativação simultâneos
+    não contam a mesma mudança duas vezes. Faz commit.
+    """
+    I = models.Inscricao
+    anterior = db.scalar(select(I.status).where(I.id == insc.id).with_for_update())
+    if anterior is not None and models.InscricaoStatus(anterior) != models.InscricaoStatus.CANCELADA:
+        contagem = Contagem()
+        contagem.mudanca_status(insc.evento_id, anterior, models.InscricaoStatus.CANCELADA)
+        contagem.aplicar(db)
+    insc.status = models.InscricaoStatus.CANCELADA
+    insc.updated_at = datetime.utcnow()
+    db.commit()
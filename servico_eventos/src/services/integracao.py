@@ -1,21 +1,136 @@
 # servico_eventos/src/services/integracao.py
+import os
+import time
+import importlib.util
 import httpx
 import asyncio
 from servico_comum.logger import configure_logger
+from servico_comum.metrics import LatencyHistogram
 
 logger = configure_logger("service_integracao")
 
-NOTIFICATION_URL = "http://servico_notificacoes:8004/emails"
-CERTIFICADOS_URL = "http://servico_certificados:8000"
-USUARIOS_URL = "http://servico_usuarios:8000"
+NOTIFICATION_URL = os.getenv("NOTIFICATION_URL", "http://servico_notificacoes:8004")
+CERTIFICADOS_URL = os.getenv("CERTIFICADOS_URL", "http://servico_certificados:8000")
+USUARIOS_URL = os.getenv("USUARIOS_URL", "http://servico_usuarios:8000")
+
+# Quantidade de certificados por chamada a /interno/certificados/emitir_lote
+CERT_LOTE_TAMANHO = int(os.getenv("CERT_LOTE_TAMANHO", "200"))
+# Lotes enviados simultaneamente ao serviço de certificados
+CERT_LOTE_CONCORRENCIA = int(os.getenv("CERT_LOTE_CONCORRENCIA", "4"))
+
+# Pool de conexões por serviço de destino
+HTTP_MAX_CONEXOES = int(os.getenv("HTTP_MAX_CONEXOES", "50"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+# HTTP/2 só é negociado quando o pacote h2 está instalado (httpx[http2]) e o destino usa TLS
+HTTP2_ATIVO = os.getenv("HTTP2_ATIVO", "1") == "1" and importlib.util.find_spec("h2") is not None
+
+
+# ============================================================
+#  CLIENTES HTTP COMPARTILHADOS
+# ============================================================
+
+class ClienteServico:
+    """
+    httpx.AsyncClient compartilhado para um serviço de destino.
+    Mantém conexões keep-alive entre chamadas e mede a latência de cada uma.
+    """
+
+    def __init__(self, nome: str, base_url: str, timeout: float):
+        self.nome = nome
+        self.base_url = base_url
+        self.timeout = timeout
+        self.latencia = LatencyHistogram()
+        self._client = None
+        self._stats = {"requisicoes": 0, "erros": 0}
+
+    def iniciar(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                http2=HTTP2_ATIVO,
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONEXOES,
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+                ),
+            )
+        return self._client
+
+    async def encerrar(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        # Fora do lifespan (scripts, testes) o cliente é criado sob demanda
+        client = self._client or self.iniciar()
+        inicio = time.perf_counter()
+        self._stats["requisicoes"] += 1
+        try:
+            return await client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            self._stats["erros"] += 1
+            raise
+        finally:
+            self.latencia.observe(time.perf_counter() - inicio)
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", path, **kwargs)
+
+    def estatisticas(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "http2": HTTP2_ATIVO,
+            **self._stats,
+            "latencia": self.latencia.snapshot(),
+        }
+
+
+notificacoes = ClienteServico("notificacoes", NOTIFICATION_URL, timeout=3.0)
+certificados = ClienteServico("certificados", CERTIFICADOS_URL, timeout=5.0)
+usuarios = ClienteServico("usuarios", USUARIOS_URL, timeout=3.0)
+
+CLIENTES = (notificacoes, certificados, usuarios)
+
+
+def iniciar_clientes():
+    for cliente in CLIENTES:
+        cliente.iniciar()
+
+async def encerrar_clientes():
+    await asyncio.gather(*(cliente.encerrar() for cliente in CLIENTES))
+
+def estatisticas_clientes() -> dict:
+    return {cliente.nome: cliente.estatisticas() for cliente in CLIENTES}
+
+
+# ============================================================
+#  CHAMADAS AOS SERVIÇOS
+# ============================================================
+
+def _payload_certificado(inscricao, user_email, evento) -> dict:
+    return {
+        "inscricao_id": inscricao.id,
+        "usuario_id": inscricao.usuario_id,
+        "evento_id": inscricao.evento_id,
+        "usuario_nome": inscricao.usuario_username,
+        "usuario_email": user_email,
+        "evento_nome": evento.nome,
+        "evento_data": str(evento.data_evento),
+        "template_certificado": getattr(evento, "template_certificado", "default")
+    }
 
 async def send_notification_guaranteed(payload: dict):
     """Tenta enviar notificação com retry (Backoff exponencial)."""
     delay = 0.5
     for attempt in range(3):
         try:
-            async with httpx.AsyncClient(timeout=3) as client:
-                await client.post(NOTIFICATION_URL, json=payload)
+            await notificacoes.post("/emails", json=payload)
             logger.info("notification_sent", extra=payload)
             return
         except httpx.RequestError as e:
@@ -23,64 +138,58 @@ async def send_notification_guaranteed(payload: dict):
             await asyncio.sleep(delay)
             delay *= 2
 
-async def solicitar_emissao_certificado_automatica(inscricao, user_email, evento):
-    """Solicita a emissão de certificado ao microsserviço correspondente."""
-    try:
-        payload = {
-            "inscricao_id": inscricao.id,
-            "usuario_id": inscricao.usuario_id,
-            "evento_id": inscricao.evento_id,
-            "usuario_nome": inscricao.usuario_username,
-            "usuario_email": user_email,
-            "evento_nome": evento.nome,
-            "evento_data": str(evento.data_evento),
-            "template_certificado": getattr(evento, "template_certificado", "default")
-        }
-
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.post(
-                f"{CERTIFICADOS_URL}/interno/certificados/emitir_automatico",
-                json=payload
-            )
-            resp.raise_for_status()
-            logger.info("certificado_emitido_sucesso", extra={"inscricao_id": inscricao.id})
-            
-    except Exception as e:
-        logger.error("falha_integracao_certificado", extra={"erro": str(e), "inscricao": inscricao.id})
+async def enviar_notificacao(payload: dict):
+    """Envio único, sem retry: quem chama decide quando repetir (outbox)."""
+    resp = await notificacoes.post("/emails", json=payload)
+    resp.raise_for_status()
+    logger.info("notification_sent", extra={"tipo": payload.get("tipo")})
 
 async def fetch_user_data(usuario_id: int):
     """Busca dados atualizados do usuário no microsserviço de usuários."""
-    async with httpx.AsyncClient(timeout=3.0) as client:
-        resp = await client.get(f"{USUARIOS_URL}/usuarios/{usuario_id}")
-        resp.raise_for_status()
-        return resp.json()
-    
-async def emitir_certificado_sincrono(inscricao, user_email, evento):
+    resp = await usuarios.get(f"/usuarios/{usuario_id}")
+    resp.raise_for_status()
+    return resp.json()
+
+async def emitir_certificados_lote(itens):
     """
-    Chama o serviço de certificados e retorna os dados (codigo_unico) para salvar localmente.
+    Emite certificados em lotes via /interno/certificados/emitir_lote.
+
+    `itens` é uma lista de tuplas (inscricao, user_email, evento).
+    Retorna {inscricao_id: codigo_unico}; lotes que falharem ficam de fora
+    e são registrados no log.
     """
-    try:
-        payload = {
-            "inscricao_id": inscricao.id,
-            "usuario_id": inscricao.usuario_id,
-            "evento_id": inscricao.evento_id,
-            "usuario_nome": inscricao.usuario_username,
-            "usuario_email": user_email,
-            "evento_nome": evento.nome,
-            "evento_data": str(evento.data_evento),
-            "template_certificado": getattr(evento, "template_certificado", "default")
-        }
+    if not itens:
+        return {}
 
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.post(
-                f"{CERTIFICADOS_URL}/interno/certificados/emitir_automatico",
-                json=payload
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            logger.info("certificado_emitido_remoto", extra={"codigo": data.get("codigo_unico")})
-            return data
-            
-    except Exception as e:
-        logger.error("falha_integracao_certificado", extra={"erro": str(e), "inscricao": inscricao.id})
-        return None
\ No newline at end of file
+    payloads = [_payload_certificado(*item) for item in itens]
+    lotes = [
+        payloads[i:i + CERT_LOTE_TAMANHO]
+        for i in range(0, len(payloads), CERT_LOTE_TAMANHO)
+    ]
+    semaforo = asyncio.Semaphore(CERT_LOTE_CONCORRENCIA)
+
+    async def enviar(lote):
+        async with semaforo:
+            try:
+                resp = await certificados.post(
+                    "/interno/certificados/emitir_lote",
+                    json={"certificados": lote},
+                    timeout=30.0
+                )
+                resp.raise_for_status()
+                emitidos = resp.json()["certificados"]
+                return {
+                    item["inscricao_id"]: cert["codigo_unico"]
+                    for item, cert in zip(lote, emitidos)
+                }
+            except Exception as e:
+                logger.error("falha_integracao_certificado_lote", extra={"erro": str(e), "tamanho": len(lote)})
+                return {}
+
+    resultados = await asyncio.gather(*(enviar(lote) for lote in lotes))
+
+    codigos = {}
+    for parcial in resultados:
+        codigos.update(parcial)
+    logger.info("certificados_lote_emitidos_remoto", extra={"total": len(codigos), "lotes": len(lotes)})
+    return codigos
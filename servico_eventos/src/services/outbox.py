@@ -0,0 +1,324 @@
+# servico_eventos/src/services/outbox.py
+
+"""
+Outbox transacional do serviço de eventos.
+
+O check-in grava a presença e as tarefas de pós-processamento (certificado e
+e-mail) na mesma transação e responde em seguida. O despachante assíncrono
+drena a tabela em lotes, chama os outros serviços e reagenda as falhas com
+backoff exponencial: se servico_certificados ou servico_usuarios estiverem
+fora do ar, o certificado atrasa, mas o check-in não.
+"""
+
+import asyncio
+import os
+from datetime import timedelta
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+import models
+from database import SessionLocal
+from servico_comum.logger import configure_logger
+from services.emissao import salvar_certificados_locais
+from services.integracao import emitir_certificados_lote, enviar_notificacao, fetch_user_data
+
+logger = configure_logger("servico_eventos.outbox")
+
+OUTBOX_ATIVO = os.getenv("OUTBOX_ATIVO", "1") == "1"
+OUTBOX_INTERVALO = float(os.getenv("OUTBOX_INTERVALO", "2"))
+OUTBOX_LOTE = int(os.getenv("OUTBOX_LOTE", "100"))
+# Envios de e-mail simultâneos dentro de um lote
+OUTBOX_CONCORRENCIA = int(os.getenv("OUTBOX_CONCORRENCIA", "8"))
+OUTBOX_MAX_TENTATIVAS = int(os.getenv("OUTBOX_MAX_TENTATIVAS", "10"))
+OUTBOX_BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE", "5"))
+OUTBOX_BACKOFF_MAX = float(os.getenv("OUTBOX_BACKOFF_MAX", "600"))
+# Por quanto tempo um lote reservado fica invisível; se o processo cair, é retomado depois disso
+OUTBOX_RESERVA = float(os.getenv("OUTBOX_RESERVA", "120"))
+
+# O e-mail não aparece no PDF; usado quando o check-in não o conhece
+EMAIL_PADRAO = "usuario@sistema.com"
+
+
+def registrar_certificado(db, insc, email: Optional[str] = None):
+    """Enfileira a emissão do certificado na transação corrente (sem commit)."""
+    db.add(models.TarefaOutbox(
+        tipo=models.OutboxTipo.CERTIFICADO.value,
+        payload={"inscricao_id": insc.id, "usuario_email": email},
+    ))
+
+
+def registrar_pos_checkin(db, insc, email: Optional[str] = None, nome: Optional[str] = None):
+    """Enfileira certificado e e-mail de check-in na transação corrente (sem commit)."""
+    registrar_certificado(db, insc, email)
+    db.add(models.TarefaOutbox(
+        tipo=models.OutboxTipo.NOTIFICACAO.value,
+        payload={"tipo": "checkin", "inscricao_id": insc.id, "destinatario": email, "nome": nome},
+    ))
+
+
+def _backoff(tentativas: int) -> float:
+    return min(OUTBOX_BACKOFF_BASE * 2 ** (tentativas - 1), OUTBOX_BACKOFF_MAX)
+
+
+# ============================================================
+#  ACESSO AO BANCO (executado em threadpool)
+# ============================================================
+
+def _reservar(tipo: str, lote: int):
+    """
+    Reserva até `lote` tarefas vencidas. FOR UPDATE SKIP LOCKED permite
+    vários despachantes (um por worker) sem disputar as mesmas linhas.
+    """
+    T = models.TarefaOutbox
+    with SessionLocal() as db:
+        tarefas = (
+            db.query(T)
+            .filter(
+                T.status == models.OutboxStatus.PENDENTE.value,
+                T.tipo == tipo,
+                T.proxima_tentativa <= func.now(),
+            )
+            .order_by(T.id)
+            .limit(lote)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        reservadas = []
+        for tarefa in tarefas:
+            tarefa.tentativas += 1
+            tarefa.proxima_tentativa = func.now() + timedelta(seconds=OUTBOX_RESERVA)
+            reservadas.append({"id": tarefa.id, "payload": tarefa.payload, "tentativas": tarefa.tentativas})
+        db.commit()
+        return reservadas
+
+
+def _concluir(ids):
+    if not ids:
+        return
+    with SessionLocal() as db:
+        db.query(models.TarefaOutbox).filter(models.TarefaOutbox.id.in_(ids)).update(
+            {
+                "status": models.OutboxStatus.CONCLUIDA.value,
+                "processado_em": func.now(),
+                "ultimo_erro": None,
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+
+
+def _reagendar(falhas):
+    """`falhas`: lista de (tarefa, erro). Um UPDATE por grupo de mesma tentativa."""
+    if not falhas:
+        return 0
+    grupos = {}
+    for tarefa, erro in falhas:
+        grupos.setdefault((tarefa["tentativas"], erro), []).append(tarefa["id"])
+
+    definitivas = 0
+    with SessionLocal() as db:
+        for (tentativas, erro), ids in grupos.items():
+            valores = {"ultimo_erro": erro[:1000]}
+            if tentativas >= OUTBOX_MAX_TENTATIVAS:
+                valores["status"] = models.OutboxStatus.FALHA.value
+                definitivas += len(ids)
+            else:
+                valores["proxima_tentativa"] = func.now() + timedelta(seconds=_backoff(tentativas))
+            db.query(models.TarefaOutbox).filter(models.TarefaOutbox.id.in_(ids)).update(
+                valores, synchronize_session=False
+            )
+        db.commit()
+    return definitivas
+
+
+def _carregar_inscricoes(inscricao_ids):
+    with SessionLocal() as db:
+        inscricoes = (
+            db.query(models.Inscricao)
+            .options(joinedload(models.Inscricao.evento))
+            .filter(models.Inscricao.id.in_(inscricao_ids))
+            .all()
+        )
+        emitidos = {
+            inscricao_id for (inscricao_id,) in
+            db.query(models.Certificado.inscricao_id)
+            .filter(models.Certificado.inscricao_id.in_(inscricao_ids))
+        }
+        return {insc.id: insc for insc in inscricoes}, emitidos
+
+
+def _gravar_certificados(inscricoes, codigos):
+    with SessionLocal() as db:
+        return salvar_certificados_locais(db, inscricoes, codigos)
+
+
+def contar_tarefas() -> dict:
+    """Tarefas por tipo/status e idade da pendente mais antiga."""
+    T = models.TarefaOutbox
+    with SessionLocal() as db:
+        linhas = db.query(T.tipo, T.status, func.count(T.id)).group_by(T.tipo, T.status).all()
+        mais_antiga = (
+            db.query(func.extract("epoch", func.now() - func.min(T.created_at)))
+            .filter(T.status == models.OutboxStatus.PENDENTE.value)
+            .scalar()
+        )
+    contagem = {}
+    for tipo, status, total in linhas:
+        contagem.setdefault(tipo, {})[status] = total
+    return {
+        "tarefas": contagem,
+        "pendente_mais_antiga_segundos": round(float(mais_antiga), 3) if mais_antiga is not None else None,
+    }
+
+
+# ============================================================
+#  DESPACHANTE
+# ============================================================
+
+class DespachanteOutbox:
+
+    def __init__(self, intervalo: float, lote: int, concorrencia: int):
+        self.intervalo = intervalo
+        self.lote = lote
+        self.concorrencia = concorrencia
+        self._tarefa: Optional[asyncio.Task] = None
+        self._acordar: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {
+            "certificados": 0, "notificacoes": 0, "descartadas": 0,
+            "reagendadas": 0, "falhas_definitivas": 0,
+        }
+
+    async def iniciar(self):
+        self._loop = asyncio.get_running_loop()
+        self._acordar = asyncio.Event()
+        self._tarefa = asyncio.create_task(self._executar())
+        logger.info("outbox_iniciado", extra={"lote": self.lote, "intervalo": self.intervalo})
+
+    async def encerrar(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            await asyncio.gather(self._tarefa, return_exceptions=True)
+            self._tarefa = None
+
+    def notificar(self):
+        """Antecipa o próximo ciclo. Seguro para chamar a partir de threads."""
+        if self._loop is not None and self._acordar is not None:
+            self._loop.call_soon_threadsafe(self._acordar.set)
+
+    async def _executar(self):
+        etapas = (
+            (models.OutboxTipo.CERTIFICADO.value, self._processar_certificados),
+            (models.OutboxTipo.NOTIFICACAO.value, self._processar_notificacoes),
+        )
+        while True:
+            # Limpa antes de buscar: avisos que chegarem durante o ciclo não se perdem
+            self._acordar.clear()
+            lote_cheio = False
+            try:
+                for tipo, processar in etapas:
+                    tarefas = await run_in_threadpool(_reservar, tipo, self.lote)
+                    if not tarefas:
+                        continue
+                    concluidas, falhas = await processar(tarefas)
+                    await run_in_threadpool(_concluir, [t["id"] for t in concluidas])
+                    definitivas = await run_in_threadpool(_reagendar, falhas)
+                    self._stats["reagendadas"] += len(falhas) - definitivas
+                    self._stats["falhas_definitivas"] += definitivas
+                    lote_cheio = lote_cheio or len(tarefas) == self.lote
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("outbox_falha_ciclo", extra={"error": str(e)})
+
+            if lote_cheio:
+                continue
+            try:
+                await asyncio.wait_for(self._acordar.wait(), timeout=self.intervalo)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _processar_certificados(self, tarefas):
+        por_inscricao = {}
+        for tarefa in tarefas:
+            por_inscricao.setdefault(tarefa["payload"]["inscricao_id"], []).append(tarefa)
+
+        inscricoes, emitidos = await run_in_threadpool(_carregar_inscricoes, list(por_inscricao))
+
+        concluidas, itens = [], []
+        for inscricao_id, grupo in por_inscricao.items():
+            insc = inscricoes.get(inscricao_id)
+            if insc is None:
+                self._stats["descartadas"] += len(grupo)
+                concluidas += grupo
+                continue
+            if inscricao_id in emitidos:
+                # Certificado já emitido por outro caminho (sync, reenvio)
+                concluidas += grupo
+                continue
+            email = grupo[0]["payload"].get("usuario_email") or EMAIL_PADRAO
+            itens.append((insc, email, insc.evento))
+
+        codigos = await emitir_certificados_lote(itens) if itens else {}
+        if codigos:
+            await run_in_threadpool(_gravar_certificados, inscricoes.values(), codigos)
+
+        falhas = []
+        for insc, _, _ in itens:
+            grupo = por_inscricao[insc.id]
+            if insc.id in codigos:
+                concluidas += grupo
+                self._stats["certificados"] += 1
+            else:
+                falhas += [(tarefa, "emissão não confirmada pelo servico_certificados") for tarefa in grupo]
+        return concluidas, falhas
+
+    async def _processar_notificacoes(self, tarefas):
+        inscricao_ids = {tarefa["payload"]["inscricao_id"] for tarefa in tarefas}
+        inscricoes, _ = await run_in_threadpool(_carregar_inscricoes, list(inscricao_ids))
+        semaforo = asyncio.Semaphore(self.concorrencia)
+
+        async def enviar(tarefa):
+            payload = dict(tarefa["payload"])
+            insc = inscricoes.get(payload.pop("inscricao_id"))
+            if insc is None:
+                self._stats["descartadas"] += 1
+                return None
+            async with semaforo:
+                if not payload.get("destinatario"):
+                    user_data = await fetch_user_data(insc.usuario_id)
+                    payload["destinatario"] = user_data.get("email")
+                    payload["nome"] = payload.get("nome") or user_data.get("full_name") or user_data.get("username")
+                if not payload["destinatario"]:
+                    # Usuário sem e-mail cadastrado: nada a enviar
+                    self._stats["descartadas"] += 1
+                    return None
+                payload["nome"] = payload.get("nome") or "Participante"
+                payload["nome_evento"] = insc.evento.nome
+                await enviar_notificacao(payload)
+            self._stats["notificacoes"] += 1
+            return None
+
+        resultados = await asyncio.gather(*(enviar(t) for t in tarefas), return_exceptions=True)
+
+        concluidas, falhas = [], []
+        for tarefa, resultado in zip(tarefas, resultados):
+            if isinstance(resultado, Exception):
+                falhas.append((tarefa, f"{type(resultado).__name__}: {resultado}"))
+            else:
+                concluidas.append(tarefa)
+        return concluidas, falhas
+
+    def status(self) -> dict:
+        return {
+            "ativo": self._tarefa is not None,
+            "lote": self.lote,
+            "max_tentativas": OUTBOX_MAX_TENTATIVAS,
+            **self._stats,
+        }
+
+
+despachante = DespachanteOutbox(OUTBOX_INTERVALO, OUTBOX_LOTE, OUTBOX_CONCORRENCIA)
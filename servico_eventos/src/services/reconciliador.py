@@ -0,0 +1,176 @@
+# servico_eventos/src/services/reconciliador.py
+
+"""
+Reconciliação periódica de certificados.
+
+Encontra presenças sem certificado local (um anti-join) e emite os
+certificados em lotes pelo /interno/certificados/emitir_lote. Cobre o que
+escapou do outbox (tarefas que esgotaram as tentativas, dados antigos) sem
+que nenhuma leitura do usuário precise fazer escrita ou chamada HTTP.
+
+Todo worker web sobe o seu reconciliador, mas cada ciclo roda sob um
+pg_try_advisory_lock: só um processo (entre workers e réplicas) percorre o
+backlog por vez; os outros pulam o ciclo.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import exists, func, text
+from sqlalchemy.orm import joinedload
+
+import models
+from database import SessionLocal, async_engine
+from servico_comum.logger import configure_logger
+from services.emissao import salvar_certificados_locais
+from services.integracao import emitir_certificados_lote
+from services.outbox import EMAIL_PADRAO
+
+logger = configure_logger("servico_eventos.reconciliador")
+
+RECONCILIADOR_ATIVO = os.getenv("RECONCILIADOR_ATIVO", "1") == "1"
+RECONCILIADOR_INTERVALO = float(os.getenv("RECONCILIADOR_INTERVALO", "300"))
+RECONCILIADOR_LOTE = int(os.getenv("RECONCILIADOR_LOTE", "200"))
+# Presenças mais novas que isso ainda estão com o outbox
+RECONCILIADOR_CARENCIA = float(os.getenv("RECONCILIADOR_CARENCIA", "600"))
+# Nome do advisory lock (hashtext -> chave int) que serializa os ciclos
+RECONCILIADOR_LOCK = "servico_eventos.reconciliador"
+
+
+def _sem_certificado(db):
+    """Inscrições com presença (fora da carência) e sem certificado local."""
+    I, P, C = models.Inscricao, models.Presenca, models.Certificado
+    limite = datetime.now(timezone.utc) - timedelta(seconds=RECONCILIADOR_CARENCIA)
+    return (
+        db.query(I)
+        .outerjoin(C, C.inscricao_id == I.id)
+        .filter(
+            C.id.is_(None),
+            exists().where(P.inscricao_id == I.id, P.data_checkin <= limite),
+        )
+    )
+
+
+def _buscar_pendentes(apos_id: int, lote: int):
+    with SessionLocal() as db:
+        return (
+            _sem_certificado(db)
+            .options(joinedload(models.Inscricao.evento))
+            .filter(models.Inscricao.id > apos_id)
+            .order_by(models.Inscricao.id)
+            .limit(lote)
+            .all()
+        )
+
+
+def _contar_pendentes() -> int:
+    with SessionLocal() as db:
+        return _sem_certificado(db).with_entities(func.count(models.Inscricao.id)).scalar()
+
+
+def _gravar(inscricoes, codigos) -> int:
+    with SessionLocal() as db:
+        return salvar_certificados_locais(db, inscricoes, codigos)
+
+
+class ReconciliadorCertificados:
+
+    def __init__(self, intervalo: float, lote: int):
+        self.intervalo = intervalo
+        self.lote = lote
+        self._tarefa: Optional[asyncio.Task] = None
+        self._backlog: Optional[int] = None
+        self._ultima_execucao: Optional[datetime] = None
+        self._ultima_duracao: Optional[float] = None
+        self._stats = {"ciclos": 0, "ciclos_pulados": 0, "emitidos": 0, "nao_emitidos": 0}
+
+    async def iniciar(self):
+        self._tarefa = asyncio.create_task(self._executar())
+        logger.info("reconciliador_iniciado", extra={"intervalo": self.intervalo, "lote": self.lote})
+
+    async def encerrar(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            await asyncio.gather(self._tarefa, return_exceptions=True)
+            self._tarefa = None
+
+    async def _executar(self):
+        while True:
+            try:
+                await self.reconciliar()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("reconciliador_falha", extra={"error": str(e)})
+            await asyncio.sleep(self.intervalo)
+
+    async def reconciliar(self) -> int:
+        """
+        Um ciclo completo, se nenhum outro processo estiver reconciliando.
+        O lock é de sessão: cai junto com a conexão se o worker morrer.
+        """
+        async with async_engine.connect() as conn:
+            # AUTOCOMMIT: a conexão segura o lock sem ficar "idle in transaction"
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            if not await conn.scalar(
+                text("SELECT pg_try_advisory_lock(hashtext(:nome))"), {"nome": RECONCILIADOR_LOCK}
+            ):
+                self._stats["ciclos_pulados"] += 1
+                return 0
+            try:
+                return await self._ciclo()
+            finally:
+                await conn.execute(
+                    text("SELECT pg_advisory_unlock(hashtext(:nome))"), {"nome": RECONCILIADOR_LOCK}
+                )
+
+    async def _ciclo(self) -> int:
+        """Percorre o backlog por id e emite em lotes."""
+        inicio = time.perf_counter()
+        self._backlog = await run_in_threadpool(_contar_pendentes)
+        emitidos = 0
+        apos_id = 0
+        while self._backlog:
+            inscricoes = await run_in_threadpool(_buscar_pendentes, apos_id, self.lote)
+            if not inscricoes:
+                break
+            # Avança o cursor mesmo com falha: o próximo ciclo tenta de novo
+            apos_id = inscricoes[-1].id
+
+            codigos = await emitir_certificados_lote(
+                [(insc, EMAIL_PADRAO, insc.evento) for insc in inscricoes]
+            )
+            if codigos:
+                await run_in_threadpool(_gravar, inscricoes, codigos)
+            emitidos += len(codigos)
+            self._stats["nao_emitidos"] += len(inscricoes) - len(codigos)
+
+            if len(inscricoes) < self.lote:
+                break
+
+        self._stats["ciclos"] += 1
+        self._stats["emitidos"] += emitidos
+        self._backlog -= emitidos
+        self._ultima_execucao = datetime.now(timezone.utc)
+        self._ultima_duracao = time.perf_counter() - inicio
+        if emitidos:
+            logger.info("reconciliador_emitiu", extra={"emitidos": emitidos, "backlog": self._backlog})
+        return emitidos
+
+    def status(self) -> dict:
+        return {
+            "ativo": self._tarefa is not None,
+            "intervalo": self.intervalo,
+            "carencia": RECONCILIADOR_CARENCIA,
+            "backlog": self._backlog,
+            "ultima_execucao": self._ultima_execucao.isoformat() if self._ultima_execucao else None,
+            "ultima_duracao_segundos": round(self._ultima_duracao, 3) if self._ultima_duracao is not None else None,
+            **self._stats,
+        }
+
+
+reconciliador = ReconciliadorCertificados(RECONCILIADOR_INTERVALO, RECONCILIADOR_LOTE)
@@ -0,0 +1,120 @@
+# servico_eventos/tests/test_concorrencia_postgres.py
+
+"""
+Pedidos simultâneos para a mesma chave gravam uma única linha
+(constraints únicas + ON CONFLICT). Precisa de Postgres: pulado sem
+TESTES_DATABASE_URL.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, func, select, text
+
+import models
+from services.checkin import checkin_por_token, tokens_checkin
+from services.inscricoes import CRIADA, EXISTENTE, inscrever_async
+
+PARALELOS = 20
+# Ids fora da faixa dos usuários reais
+USUARIO_ID = 900_000_001
+
+
+class Participante:
+    id = USUARIO_ID
+    username = "concorrente"
+    email = "concorrente@exemplo.com"
+    full_name = None
+
+
+@pytest.fixture
+def evento(postgres):
+    """Evento com token de check-in ativo; tudo o que ele gerou é removido no fim."""
+    I, P, O = models.Inscricao, models.Presenca, models.TarefaOutbox
+    with postgres.engine.begin() as conn:
+        evento_id = conn.execute(
+            models.Evento.__table__.insert()
+            .values(nome=f"teste-concorrencia-{uuid.uuid4().hex[:8]}", data_evento=datetime.now(timezone.utc))
+            .returning(models.Evento.id)
+        ).scalar_one()
+        token = str(uuid.uuid4())
+        conn.execute(models.CheckinToken.__table__.insert().values(
+            token=token, evento_id=evento_id, is_active=True,
+            data_expiracao=datetime.now(timezone.utc) + timedelta(hours=1),
+        ))
+
+    yield evento_id, token
+
+    tokens_checkin.invalidar_evento(evento_id)
+    with postgres.engine.begin() as conn:
+        ids = conn.scalars(select(I.id).where(I.evento_id == evento_id)).all()
+        if ids:
+            conn.execute(delete(O).where(text("(payload->>'inscricao_id')::int = ANY(:ids)")), {"ids": ids})
+        conn.execute(delete(P).where(P.evento_id == evento_id))
+        conn.execute(delete(I).where(I.evento_id == evento_id))
+        conn.execute(delete(models.CheckinToken).where(models.CheckinToken.evento_id == evento_id))
+        # contadores_evento / checkins_por_minuto: ON DELETE CASCADE
+        conn.execute(delete(models.Evento).where(models.Evento.id == evento_id))
+
+
+def _contar(postgres, modelo, evento_id: int) -> int:
+    with postgres.engine.connect() as conn:
+        return conn.scalar(select(func.count()).select_from(modelo).where(modelo.evento_id == evento_id))
+
+
+def _contador(postgres, evento_id: int, prefixo: str) -> int:
+    C = models.ContadorEvento
+    with postgres.engine.connect() as conn:
+        return conn.scalar(
+            select(func.coalesce(func.sum(C.valor), 0))
+            .where(C.evento_id == evento_id, C.chave.like(f"{prefixo}%"))
+        )
+
+
+def test_inscricoes_simultaneas_gravam_uma_linha(postgres, evento):
+    evento_id, _ = evento
+
+    async def inscrever():
+        async with postgres.AsyncSessionLocal() as db:
+            insc, resultado = await inscrever_async(db, evento_id, USUARIO_ID, "concorrente")
+            return insc.id, resultado
+
+    async def cenario():
+        return await asyncio.gather(*(inscrever() for _ in range(PARALELOS)))
+
+    resultados = asyncio.run(cenario())
+
+    assert len({inscricao_id for inscricao_id, _ in resultados}) == 1
+    assert sorted(r for _, r in resultados) == [CRIADA] + [EXISTENTE] * (PARALELOS - 1)
+    assert _contar(postgres, models.Inscricao, evento_id) == 1
+    assert _contador(postgres, evento_id, "inscricoes.") == 1
+
+
+def test_checkins_simultaneos_gravam_uma_presenca(postgres, evento):
+    evento_id, token = evento
+    origem = models.PresencaOrigem.QR_CODE.value
+
+    async def cenario():
+        # Sem inscrição prévia: o comando também disputa a criação dela
+        return await asyncio.gather(*(
+            checkin_por_token(token, Participante(), origem) for _ in range(PARALELOS)
+        ))
+
+    resultados = asyncio.run(cenario())
+
+    assert len({r.inscricao_id for r in resultados}) == 1
+    # Só quem gravou a presença recebe o id (e dispara outbox/feed)
+    assert len([r for r in resultados if r.presenca_id is not None]) == 1
+    assert _contar(postgres, models.Inscricao, evento_id) == 1
+    assert _contar(postgres, models.Presenca, evento_id) == 1
+    assert _contador(postgres, evento_id, "checkins.") == 1
+
+    with postgres.engine.connect() as conn:
+        tarefas = conn.execute(
+            text("SELECT tipo FROM outbox WHERE (payload->>'inscricao_id')::int = :id ORDER BY tipo"),
+            {"id": resultados[0].inscricao_id},
+        ).scalars().all()
+    # Um certificado e uma notificação, não um par por requisição
+    assert len(tarefas) == 2 and len(set(tarefas)) == 2
@@ -0,0 +1,54 @@
+# servico_eventos/tests/test_estatisticas.py
+
+"""Contagem: deltas somados por chave e linhas gravadas em ordem determinística."""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.dialects import postgresql
+
+import models
+from services.estatisticas import Contagem
+
+ATIVA, CANCELADA = models.InscricaoStatus.ATIVA, models.InscricaoStatus.CANCELADA
+
+
+def _linhas(comando, *colunas) -> list:
+    """Valores do INSERT multi-linha, na ordem em que o Postgres os aplica."""
+    params = comando.compile(dialect=postgresql.dialect()).params
+    total = sum(1 for k in params if k.startswith(f"{colunas[0]}_m"))
+    return [tuple(params[f"{c}_m{i}"] for c in colunas) for i in range(total)]
+
+
+def test_cancelamento_e_reativacao_travam_as_linhas_na_mesma_ordem():
+    cancelamento, reativacao = Contagem(), Contagem()
+    cancelamento.mudanca_status(7, ATIVA, CANCELADA)
+    reativacao.mudanca_status(7, CANCELADA, ATIVA)
+
+    (c,) = cancelamento.comandos()
+    (r,) = reativacao.comandos()
+    assert [k for k, _ in _linhas(c, "chave", "valor")] == [k for k, _ in _linhas(r, "chave", "valor")]
+    assert _linhas(c, "chave", "valor") == [("inscricoes.ativa", -1), ("inscricoes.cancelada", 1)]
+
+
+def test_linhas_ordenadas_por_evento_e_chave_e_minutos_por_evento_e_minuto():
+    agora = datetime(2026, 10, 18, 12, 30, tzinfo=timezone.utc)
+    contagem = Contagem()
+    contagem.checkin(9, "qrcode", agora)
+    contagem.certificado(3)
+    contagem.checkin(3, "manual", agora + timedelta(minutes=5))
+    contagem.checkin(3, "manual", agora)
+
+    contadores, minutos = contagem.comandos()
+    assert _linhas(contadores, "evento_id", "chave") == [
+        (3, "certificados"), (3, "checkins.manual"), (9, "checkins.qrcode"),
+    ]
+    assert _linhas(minutos, "evento_id", "minuto") == [
+        (3, agora), (3, agora + timedelta(minutes=5)), (9, agora),
+    ]
+
+
+def test_deltas_que_se_anulam_nao_geram_linha():
+    contagem = Contagem()
+    contagem.inscricao(1, ATIVA)
+    contagem.inscricao(1, ATIVA, -1)
+    assert contagem.comandos() == []
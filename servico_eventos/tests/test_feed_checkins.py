@@ -0,0 +1,96 @@
+# servico_eventos/tests/test_feed_checkins.py
+
+"""Fan-out do feed de check-ins: assinante parado é descartado sem atrasar os demais."""
+
+import asyncio
+import json
+
+import pytest
+
+import services.feed_checkins as modulo
+from services.feed_checkins import DESCARTADO, FeedCheckins, FeedLotado, evento_checkin, stream_sse
+
+EVENTO = 1
+CONSUMIDORES = 50
+PUBLICACOES = 20
+FILA = 4
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    feed = FeedCheckins("local", tamanho_fila=FILA, max_assinantes=CONSUMIDORES + 2)
+    # stream_sse libera a assinatura no singleton do módulo
+    monkeypatch.setattr(modulo, "feed_checkins", feed)
+    return feed
+
+
+def _checkin(presenca_id: int, evento_id: int = EVENTO) -> dict:
+    return evento_checkin(presenca_id, presenca_id, 900_000_000 + presenca_id, evento_id, "qrcode", None)
+
+
+async def _consumir(assinante, total: int) -> list:
+    """Lê o stream SSE como o painel: devolve os ids dos check-ins recebidos."""
+    ids = []
+    stream = stream_sse(assinante, keepalive=5)
+    try:
+        async for quadro in stream:
+            if quadro.startswith("id: "):
+                ids.append(json.loads(quadro.split("data: ", 1)[1])["presenca_id"])
+                if len(ids) == total:
+                    break
+    finally:
+        await stream.aclose()
+    return ids
+
+
+def test_assinante_parado_e_descartado_e_os_demais_recebem_tudo(feed):
+    async def cenario():
+        parado = feed.assinar(EVENTO)
+        outro_evento = feed.assinar(EVENTO + 1)
+        consumidores = [
+            asyncio.create_task(_consumir(feed.assinar(EVENTO), PUBLICACOES))
+            for _ in range(CONSUMIDORES)
+        ]
+        await asyncio.sleep(0)
+
+        for presenca_id in range(1, PUBLICACOES + 1):
+            await feed.publicar([_checkin(presenca_id)])
+            # Os consumidores leem entre um check-in e outro; o parado, nunca
+            await asyncio.sleep(0.005)
+
+        recebidos = await asyncio.wait_for(asyncio.gather(*consumidores), timeout=5)
+        return parado, outro_evento, recebidos
+
+    parado, outro_evento, recebidos = asyncio.run(cenario())
+
+    assert all(ids == list(range(1, PUBLICACOES + 1)) for ids in recebidos)
+
+    # A fila do parado ficou só com o marcador de fim: nada retido em memória
+    assert parado.fila.qsize() == 1 and parado.fila.get_nowait() == DESCARTADO
+    assert outro_evento.fila.empty()
+
+    stats = feed.estatisticas()
+    assert stats["descartados"] == 1
+    assert stats["entregues"] == CONSUMIDORES * PUBLICACOES + FILA
+    # Consumidores saíram ao fechar o stream; o parado, ao ser descartado
+    assert stats["assinantes"] == 1
+
+
+def test_stream_do_descartado_avisa_o_painel(feed):
+    async def cenario():
+        assinante = feed.assinar(EVENTO)
+        await feed.publicar([_checkin(i) for i in range(1, FILA + 2)])
+        return [quadro async for quadro in stream_sse(assinante, keepalive=5)]
+
+    quadros = asyncio.run(cenario())
+
+    assert quadros[-1] == f"event: {DESCARTADO}\ndata: {{}}\n\n"
+    assert not any(q.startswith("id: ") for q in quadros)
+    assert feed.estatisticas()["assinantes"] == 0
+
+
+def test_limite_de_assinantes(feed):
+    for _ in range(feed.max_assinantes):
+        feed.assinar(EVENTO)
+    with pytest.raises(FeedLotado):
+        feed.assinar(EVENTO)
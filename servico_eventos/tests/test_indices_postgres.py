@@ -0,0 +1,155 @@
+# servico_eventos/tests/test_indices_postgres.py
+
+"""
+As consultas quentes usam os índices das migrações 0003/0005 (EXPLAIN em uma
+massa semeada e analisada dentro de uma transação desfeita no fim).
+Precisa de Postgres com as migrações aplicadas: pulado sem
+TESTES_DATABASE_URL.
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select, text, update
+from sqlalchemy.dialects import postgresql
+
+import models
+from servico_comum.pagination import filtro_prefixo
+
+EVENTOS = 2000
+INSCRITOS_POR_EVENTO = 50
+
+MASSA = [
+    f"""
+    INSERT INTO eventos (id, nome, data_evento, template_certificado)
+    SELECT -g, 'Evento ' || g, now() + g * interval '1 hour', 'default'
+    FROM generate_series(1, {EVENTOS}) g
+    """,
+    f"""
+    INSERT INTO inscricoes (id, usuario_id, evento_id, usuario_username, status, created_at)
+    SELECT -(e * {INSCRITOS_POR_EVENTO} + u), 800000000 + u, -e, 'user' || (e * {INSCRITOS_POR_EVENTO} + u),
+           CASE WHEN u % 10 = 0 THEN 'CANCELADA' ELSE 'ATIVA' END::inscricaostatus,
+           now() - (e * {INSCRITOS_POR_EVENTO} + u) * interval '1 minute'
+    FROM generate_series(1, {EVENTOS}) e, generate_series(1, {INSCRITOS_POR_EVENTO}) u
+    """,
+    """
+    INSERT INTO presencas (id, usuario_id, evento_id, inscricao_id, data_checkin, origem)
+    SELECT i.id, i.usuario_id, i.evento_id, i.id, now() + i.id * interval '1 second', 'QR_CODE'
+    FROM inscricoes i WHERE i.id < 0 AND i.status = 'ATIVA' AND i.id % 2 = 0
+    """,
+    """
+    INSERT INTO outbox (id, tipo, payload, status, tentativas, proxima_tentativa)
+    SELECT -g, CASE WHEN g % 2 = 0 THEN 'certificado' ELSE 'email' END, '{}',
+           CASE WHEN g % 500 = 0 THEN 'pendente' ELSE 'concluida' END, 1, now() - interval '1 minute'
+    FROM generate_series(1, 50000) g
+    """,
+    # Um token ativo por evento e vários antigos desativados
+    f"""
+    INSERT INTO checkin_tokens (token, evento_id, data_expiracao, is_active)
+    SELECT gen_random_uuid(), -e, now() + interval '1 hour', v = 1
+    FROM generate_series(1, {EVENTOS}) e, generate_series(1, 10) v
+    """,
+]
+
+
+@pytest.fixture(scope="module")
+def conn():
+    if not os.getenv("TESTES_DATABASE_URL"):
+        pytest.skip("TESTES_DATABASE_URL não definida")
+    import database
+
+    with database.engine.connect() as conexao:
+        transacao = conexao.begin()
+        try:
+            for comando in MASSA:
+                conexao.execute(text(comando))
+            for tabela in ("eventos", "inscricoes", "presencas", "outbox", "checkin_tokens"):
+                conexao.execute(text(f"ANALYZE {tabela}"))
+            yield conexao
+        finally:
+            transacao.rollback()
+
+
+def _plano(conn, stmt) -> tuple:
+    """(índices usados, tabelas lidas com Seq Scan) do EXPLAIN da consulta."""
+    sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    plano = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    indices, seq_scans = set(), set()
+
+    def visitar(no):
+        if "Index Name" in no:
+            indices.add(no["Index Name"])
+        if no["Node Type"] == "Seq Scan":
+            seq_scans.add(no["Relation Name"])
+        for filho in no.get("Plans", []):
+            visitar(filho)
+
+    visitar(plano[0]["Plan"])
+    return indices, seq_scans
+
+
+I, P, E = models.Inscricao, models.Presenca, models.Evento
+T, O = models.CheckinToken, models.TarefaOutbox
+
+CONSULTAS = {
+    # GET /admin/inscricoes?evento_id=&after_id=&limit= (keyset por id)
+    "inscricoes_do_evento": (
+        select(I).where(I.evento_id == -7, I.id > -400).order_by(I.id).limit(20),
+        {"ix_inscricoes_evento_id_id", "ix_inscricoes_evento_status_id"},
+    ),
+    "inscricoes_do_evento_por_status": (
+        select(I).where(I.evento_id == -7, I.status == models.InscricaoStatus.ATIVA).order_by(I.id).limit(20),
+        {"ix_inscricoes_evento_status_id", "ix_inscricoes_evento_ativas"},
+    ),
+    "inscricoes_por_prefixo_do_usuario": (
+        select(I).where(filtro_prefixo(I.usuario_username, "user1234")).order_by(I.id).limit(20),
+        {"ix_inscricoes_username_prefixo"},
+    ),
+    # Sync incremental: ?since=
+    "inscricoes_alteradas_desde": (
+        select(I).where(func.coalesce(I.updated_at, I.created_at) >= datetime.now(timezone.utc) - timedelta(hours=1)),
+        {"ix_inscricoes_alterado_em"},
+    ),
+    # GET /eventos?nome= e ?data_inicio=
+    "eventos_por_prefixo": (
+        select(E).where(filtro_prefixo(E.nome, "Evento 123")).order_by(E.id),
+        # Com collation "C" o índice simples também serve ao LIKE
+        {"ix_eventos_nome_prefixo", "ix_eventos_nome"},
+    ),
+    "eventos_do_periodo": (
+        select(E).where(
+            E.data_evento >= datetime.now(timezone.utc) + timedelta(hours=10),
+            E.data_evento <= datetime.now(timezone.utc) + timedelta(hours=20),
+        ),
+        {"ix_eventos_data_evento_id"},
+    ),
+    # Check-ins de um evento em ordem de chegada
+    "presencas_do_evento": (
+        select(P).where(P.evento_id == -7).order_by(P.data_checkin),
+        {"ix_presencas_evento_data_checkin"},
+    ),
+    # Despachante do outbox (services.outbox._reservar)
+    "outbox_pendentes": (
+        select(O).where(
+            O.status == models.OutboxStatus.PENDENTE.value,
+            O.tipo == "certificado",
+            O.proxima_tentativa <= func.now(),
+        ).order_by(O.id).limit(50).with_for_update(skip_locked=True),
+        {"ix_outbox_pendentes_tipo_id"},
+    ),
+    # Nova geração de token desativa os ativos do evento
+    "tokens_ativos_do_evento": (
+        update(T).where(T.evento_id == -7, T.is_active.is_(True)).values(is_active=False),
+        {"ix_checkin_tokens_evento_ativos", "ix_checkin_tokens_evento_id"},
+    ),
+}
+
+
+@pytest.mark.parametrize("nome", list(CONSULTAS))
+def test_consulta_quente_usa_indice(conn, nome):
+    stmt, esperados = CONSULTAS[nome]
+    indices, seq_scans = _plano(conn, stmt)
+
+    assert indices & esperados, f"{nome}: índices {sorted(indices)}, esperado um de {sorted(esperados)}"
+    assert not seq_scans, f"{nome}: Seq Scan em {sorted(seq_scans)}"
@@ -0,0 +1,31 @@
+# servico_eventos/tests/test_reconciliador.py
+
+"""Só um processo reconcilia por vez (pg_try_advisory_lock por ciclo)."""
+
+import asyncio
+
+from services.reconciliador import ReconciliadorCertificados
+
+
+def test_ciclos_simultaneos_rodam_uma_vez(postgres, monkeypatch):
+    executando = []
+
+    async def ciclo_lento(self):
+        executando.append(self)
+        await asyncio.sleep(0.3)
+        return 1
+
+    monkeypatch.setattr(ReconciliadorCertificados, "_ciclo", ciclo_lento)
+    # Um reconciliador por worker; cada um com a sua conexão
+    workers = [ReconciliadorCertificados(intervalo=60, lote=10) for _ in range(4)]
+
+    async def cenario():
+        resultados = await asyncio.gather(*(w.reconciliar() for w in workers))
+        assert sorted(resultados) == [0, 0, 0, 1]
+        assert len(executando) == 1
+        assert sum(w.status()["ciclos_pulados"] for w in workers) == 3
+
+        # Lock devolvido ao fim do ciclo: o próximo pode rodar
+        assert await workers[0].reconciliar() == 1
+
+    asyncio.run(cenario())
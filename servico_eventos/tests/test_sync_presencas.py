@@ -0,0 +1,43 @@
+# servico_eventos/tests/test_sync_presencas.py
+
+"""Alinhamento do resultado do sync offline com a ordem do payload."""
+
+from routers.presencas import _itens_sync
+
+
+def test_itens_na_ordem_do_payload():
+    inscricoes = {1: object(), 2: object(), 3: object()}
+    itens = _itens_sync(
+        [3, 99, 1, 2],
+        inscricoes,
+        presencas_existentes={2: 20},
+        criadas={1: 10, 3: 30},
+        certificados={1: "ABC"},
+    )
+
+    assert [i["inscricao_id"] for i in itens] == [3, 99, 1, 2]
+    assert [i["status"] for i in itens] == [
+        "registrada", "inscricao_nao_encontrada", "registrada", "ja_registrada",
+    ]
+    assert [i["presenca_id"] for i in itens] == [30, None, 10, 20]
+    assert [i["certificado"] for i in itens] == [None, None, "ABC", None]
+
+
+def test_repeticao_no_lote_so_registra_a_primeira():
+    itens = _itens_sync([5, 5, 5], {5: object()}, {}, {5: 50}, {})
+
+    assert [i["status"] for i in itens] == ["registrada", "ja_registrada", "ja_registrada"]
+    # Todas apontam para a mesma presença: `itens` continua alinhado ao payload
+    assert [i["presenca_id"] for i in itens] == [50, 50, 50]
+
+
+def test_presenca_existente_nao_conta_como_registrada():
+    itens = _itens_sync([7], {7: object()}, {7: 70}, {}, {})
+
+    assert itens == [{
+        "inscricao_id": 7, "status": "ja_registrada", "presenca_id": 70, "certificado": None,
+    }]
+
+
+def test_payload_vazio():
+    assert _itens_sync([], {}, {}, {}, {}) == []
@@ -4,23 +4,23 @@ import os
 from datetime import datetime, timedelta
 from typing import Optional, List
 
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from jose import jwt
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
+from servico_comum.auth import verificador
 from database import get_db
 import models
+from services.senhas import pwd_context
+from services.cache_usuarios import cache_usuarios
 
 # ============================================================
 #  CONFIGURAÇÃO DO HASH DE SENHAS
 # ============================================================
 
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto"
-)
+# O contexto (custo do bcrypt) vive em services.senhas. Nas rotas, use o
+# `hasher` de lá: estas versões síncronas bloqueiam quem chama.
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica senha usando bcrypt."""
@@ -75,29 +75,8 @@ def create_access_token(
 # ============================================================
 
 def decode_and_validate_token(token: str):
-    valid_issuers = [
-        "servico-eventos",
-        "sistema-eventos",
-        "servico-usuarios",
-    ]
-
-    for issuer in valid_issuers:
-        try:
-            payload = jwt.decode(
-                token,
-                SECRET_KEY,
-                algorithms=[ALGORITHM],
-                issuer=issuer
-            )
-            return payload
-        except JWTError:
-            continue
-
-    raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Token inválido ou emissor desconhecido.",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    """Decodificação única + cache de tokens verificados (servico_comum.auth)."""
+    return verificador.verificar(token)
 
 
 async def get_current_user(
@@ -114,11 +93,7 @@ async def get_current_user(
             detail="Token inválido: 'sub' ausente."
         )
 
-    user = (
-        db.query(models.User)
-        .filter(models.User.username == username)
-        .first()
-    )
+    user = cache_usuarios.buscar(db, username, payload.get("user_id"))
 
     if not user:
         raise HTTPException(
@@ -10,6 +10,7 @@ from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from sqlalchemy.exc import OperationalError
 
 from servico_comum.logger import configure_logger
+from servico_comum.runtime import dimensionar_pool, TESTAR_CONEXAO
 
 
 # ============================================================
@@ -44,8 +45,9 @@ POSTGRES_DB = load_env_var("POSTGRES_DB")
 POSTGRES_HOST = os.getenv("POSTGRES_HOST", "db")  # default do Docker Compose
 POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
 
+# Driver explícito: a partir do SQLAlchemy 2.1 `postgresql://` usa psycopg 3
 DATABASE_URL = (
-    f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}"
+    f"postgresql+psycopg2://{POSTGRES_USER}:{POSTGRES_PASSWORD}"
     f"@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 )
 
@@ -54,11 +56,14 @@ DATABASE_URL = (
 #  Criação do Engine (PROFISSIONAL)
 # ============================================================
 
+# Orçamento global de conexões (DB_CONEXOES_MAX) dividido entre os workers
+POOL_SIZE, MAX_OVERFLOW = dimensionar_pool(30)
+
 # Engine configurado com parâmetros robustos
 engine = create_engine(
     DATABASE_URL,
-    pool_size=10,                 # número padrão de conexões
-    max_overflow=20,              # conexões extras se necessário
+    pool_size=POOL_SIZE,          # conexões fixas por worker
+    max_overflow=MAX_OVERFLOW,    # conexões extras se necessário
     pool_pre_ping=True,           # detecta conexões mortas
     pool_recycle=600,            # recicla conexões após 30 min
     connect_args={
@@ -72,13 +77,14 @@ engine = create_engine(
 )
 
 
-# Teste inicial da conexão (apenas 1 vez)
-try:
-    with engine.connect() as conn:
-        logger.info("Conexão com o banco de dados estabelecida com sucesso.")
-except OperationalError as e:
-    logger.error("Falha ao conectar-se ao banco de dados", extra={"error": str(e)})
-    raise e
+# Teste inicial da conexão (desligado no perfil de produção: DB_TESTAR_CONEXAO=0)
+if TESTAR_CONEXAO:
+    try:
+        with engine.connect() as conn:
+            logger.info("Conexão com o banco de dados estabelecida com sucesso.")
+    except OperationalError as e:
+        logger.error("Falha ao conectar-se ao banco de dados", extra={"error": str(e)})
+        raise e
 
 
 # ============================================================
@@ -1,28 +1,67 @@
 # servico_usuarios/src/main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from servico_comum.logger import configure_logger
 from servico_comum.middleware import RequestIDMiddleware
 from servico_comum.exceptions import ServiceError, service_error_handler
 
 from database import engine
-import models
 from routers import auth, usuarios
-
-# Inicializa Banco
-models.Base.metadata.create_all(bind=engine)
+from services.senhas import hasher, HashSaturado, HashExpirado
+from services.cache_usuarios import cache_usuarios
+from services.presenca import presenca
 
 logger = configure_logger("servico_usuarios")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sobe o pool de hash antes do primeiro login
+    hasher.iniciar()
+    await presenca.iniciar()
+    yield
+    await presenca.encerrar()
+    hasher.encerrar()
+    # Encerramento gracioso: devolve as conexões do pool
+    engine.dispose()
+
 app = FastAPI(
     title="Serviço de Usuários",
     description="API de Identidade e Gestão de Usuários",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(RequestIDMiddleware)
 app.add_exception_handler(ServiceError, service_error_handler)
 app.add_exception_handler(Exception, service_error_handler)
 
+@app.exception_handler(HashSaturado)
+async def hash_saturado_handler(request: Request, exc: HashSaturado):
+    logger.warning("hash_saturado", extra={"path": request.url.path})
+    return JSONResponse(
+        status_code=429,
+        content={
+            "success": False,
+            "message": "Muitas requisições de autenticação. Tente novamente em instantes.",
+            "request_id": getattr(request.state, "request_id", None),
+        },
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+@app.exception_handler(HashExpirado)
+async def hash_expirado_handler(request: Request, exc: HashExpirado):
+    logger.warning("hash_expirado", extra={"path": request.url.path})
+    return JSONResponse(
+        status_code=503,
+        content={
+            "success": False,
+            "message": "A verificação de senha demorou demais. Tente novamente em instantes.",
+            "request_id": getattr(request.state, "request_id", None),
+        },
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 # --- ROTAS ---
 app.include_router(auth.router)
 app.include_router(usuarios.router)
@@ -36,3 +75,18 @@ async def request_logger(request: Request, call_next):
 @app.get("/")
 def health_check():
     return {"status": "ok", "service": "servico_usuarios"}
+
+@app.get("/interno/senhas/metricas")
+def metricas_senhas():
+    """Fila, rejeições (429) e latência do pool de hash de senhas."""
+    return hasher.estatisticas()
+
+@app.get("/interno/cache/usuarios/metricas")
+def metricas_cache_usuarios():
+    """Hits, misses, taxa de acerto e invalidações do cache token -> usuário."""
+    return cache_usuarios.estatisticas()
+
+@app.get("/interno/presenca/metricas")
+def metricas_presenca():
+    """Heartbeats recebidos, pendentes no buffer e flushes em lote."""
+    return presenca.estatisticas()
@@ -0,0 +1,54 @@
+"""Esquema inicial do serviço de usuários
+
+Tabela como era criada pelo create_all antes do Alembic; bancos que já a
+têm não são alterados.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from servico_comum.migracoes import tabelas_existentes
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if "usuarios" in tabelas_existentes():
+        return
+
+    op.create_table(
+        "usuarios",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("username", sa.String(50), nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("full_name", sa.String(100)),
+        sa.Column("email", sa.String(120)),
+        sa.Column("cpf", sa.String(14)),
+        sa.Column("telefone", sa.String(20)),
+        sa.Column("endereco", sa.String(255)),
+        sa.Column("is_admin", sa.Boolean, nullable=False),
+        sa.Column("is_superuser", sa.Boolean, nullable=False),
+        sa.Column("is_active", sa.Boolean, nullable=False),
+        sa.Column("is_verified", sa.Boolean, nullable=False),
+        sa.Column("must_change_password", sa.Boolean, nullable=False),
+        sa.Column("last_heartbeat", sa.DateTime(timezone=True)),
+        sa.Column("connection_status", sa.String(50)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()")),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()")),
+    )
+    op.create_index("ix_usuarios_id", "usuarios", ["id"])
+    op.create_index("ix_usuarios_username", "usuarios", ["username"], unique=True)
+    op.create_index("ix_usuarios_full_name", "usuarios", ["full_name"])
+    op.create_index("ix_usuarios_email", "usuarios", ["email"], unique=True)
+    op.create_index("ix_usuarios_cpf", "usuarios", ["cpf"], unique=True)
+
+
+def downgrade():
+    op.drop_table("usuarios")
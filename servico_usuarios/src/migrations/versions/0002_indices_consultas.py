@@ -0,0 +1,36 @@
+"""Índices da listagem admin, sync incremental e presença (CONCURRENTLY)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+from servico_comum.migracoes import criar_indice_concorrente, remover_indice_concorrente
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+INDICES = [
+    # Busca por prefixo na listagem admin
+    ("ix_usuarios_username_prefixo", ["username"],
+     {"postgresql_ops": {"username": "varchar_pattern_ops"}}),
+    ("ix_usuarios_full_name_prefixo", ["full_name"],
+     {"postgresql_ops": {"full_name": "varchar_pattern_ops"}}),
+    # Sync incremental (?since=)
+    ("ix_usuarios_updated_at", ["updated_at"], {}),
+    # Listagem de presença por janela de tempo
+    ("ix_usuarios_last_heartbeat", ["last_heartbeat"], {}),
+]
+
+
+def upgrade():
+    for nome, colunas, opcoes in INDICES:
+        criar_indice_concorrente(nome, "usuarios", colunas, **opcoes)
+
+
+def downgrade():
+    for nome, _, _ in reversed(INDICES):
+        remover_indice_concorrente(nome, "usuarios")
@@ -1,6 +1,6 @@
 # servico_usuarios/src/models.py
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, func
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -56,6 +56,18 @@ class User(Base):
         onupdate=func.now()
     )
 
+    # ---------------------------
+    # Índices da listagem admin
+    # ---------------------------
+    __table_args__ = (
+        Index("ix_usuarios_username_prefixo", "username", postgresql_ops={"username": "varchar_pattern_ops"}),
+        Index("ix_usuarios_full_name_prefixo", "full_name", postgresql_ops={"full_name": "varchar_pattern_ops"}),
+        # Sync incremental (?since=)
+        Index("ix_usuarios_updated_at", "updated_at"),
+        # Listagem de presença (/usuarios/presenca) por janela de tempo
+        Index("ix_usuarios_last_heartbeat", "last_heartbeat"),
+    )
+
     # ---------------------------
     # Representação profissional
     # ---------------------------
@@ -1,5 +1,6 @@
 # servico_usuarios/src/routers/auth.py
 from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
@@ -7,6 +8,7 @@ import models
 import schemas 
 import auth as auth_service
 from database import get_db
+from services.senhas import hasher
 from servico_comum.exceptions import ServiceError
 from servico_comum.logger import configure_logger
 
@@ -14,16 +16,29 @@ router = APIRouter(tags=["Autenticação"])
 logger = configure_logger("router_auth")
 
 @router.post("/auth", response_model=schemas.Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(), 
     db: Session = Depends(get_db)
 ):
     """
     Autenticação: Recebe username/password e retorna JWT.
+    O bcrypt roda no pool de processos (services.senhas); com a fila cheia
+    a resposta é 429 imediato.
     """
-    user = db.query(models.User).filter(models.User.username == form_data.username).first()
+    user = await run_in_threadpool(
+        lambda: db.query(models.User).filter(models.User.username == form_data.username).first()
+    )
+
+    valida = False
+    if user:
+        valida, novo_hash = await hasher.verificar(form_data.password, user.hashed_password)
+        if valida and novo_hash:
+            # Custo do bcrypt mudou: regrava o hash com a senha em mãos
+            user.hashed_password = novo_hash
+            await run_in_threadpool(db.commit)
+            logger.info("senha_rehash", extra={"username": user.username})
 
-    if not user or not auth_service.verify_password(form_data.password, user.hashed_password):
+    if not valida:
         # Log de segurança (falha de login)
         logger.warning("login_failed", extra={"username": form_data.username})
         raise ServiceError("Credenciais inválidas", 401)
@@ -1,18 +1,23 @@
 # servico_usuarios/src/routers/usuarios.py
-from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, status
+from datetime import datetime
+from anyio.from_thread import run as executar_no_loop
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 import models   
 import schemas
 from schemas import HeartbeatSchema
-import auth as auth_service 
-from database import get_db 
+from database import get_db, SessionLocal
+from services.senhas import hasher
+from services.cache_usuarios import cache_usuarios
+from services.presenca import presenca, PRESENCA_JANELA_MAX
 from servico_comum.exceptions import ServiceError
 # Renomeamos para 'get_token_payload' para deixar claro que retorna apenas dados do token
 from servico_comum.auth import require_roles, get_current_user as get_token_payload
 from servico_comum.logger import configure_logger
+from servico_comum.pagination import Paginacao, filtro_prefixo
+from servico_comum.streaming import aceita_ndjson, resposta_ndjson
 
 router = APIRouter(tags=["Usuários"])
 logger = configure_logger("router_usuarios")
@@ -23,13 +28,14 @@ def get_current_user_from_db(
     db: Session = Depends(get_db)
 ) -> models.User:
     """
-    Recupera o objeto User completo do banco de dados baseado no token JWT.
+    Recupera o objeto User completo baseado no token JWT.
     """
     username = payload.get("sub")
     if not username:
          raise ServiceError("Token inválido: sub não encontrado", 401)
 
-    user = db.query(models.User).filter(models.User.username == username).first()
+    # Resolvido pelo cache (TTL + LRU); só vai ao banco no miss
+    user = cache_usuarios.buscar(db, username, payload.get("user_id"))
     if not user:
         raise ServiceError("Usuário não encontrado", 404)
     
@@ -52,7 +58,8 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
         raise ServiceError("E-mail já cadastrado", 400)
 
     # 2. Criação
-    hashed_password = auth_service.get_password_hash(user.password)
+    # bcrypt no pool de processos (429 se a fila estiver cheia)
+    hashed_password = executar_no_loop(hasher.gerar_hash, user.password)
     new_user = models.User(
         username=user.username,
         hashed_password=hashed_password,
@@ -69,10 +76,19 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
+    cache_usuarios.invalidar(new_user.username)
     
     logger.info("user_created", extra={"username": new_user.username})
     return new_user
 
+def _com_presenca(user: models.User) -> schemas.UserAdmin:
+    """Sobrepõe o heartbeat em memória (ainda não gravado) aos dados do banco."""
+    dados = schemas.UserAdmin.model_validate(user)
+    estado = presenca.estado(user.id)
+    if estado and (dados.last_heartbeat is None or estado["last_heartbeat"] > dados.last_heartbeat):
+        dados = dados.model_copy(update=estado)
+    return dados
+
 # --- AUTENTICADO (ME) ---
 
 @router.get("/usuarios/me", response_model=schemas.UserAdmin)
@@ -81,7 +97,7 @@ def read_me(current_user: models.User = Depends(get_current_user_from_db)):
     Perfil do usuário logado.
     A Rota deve ser EXPLICITAMENTE /usuarios/me para casar com o Nginx.
     """
-    return current_user
+    return _com_presenca(current_user)
 
 @router.patch("/usuarios/me", response_model=schemas.User)
 def update_me(
@@ -91,6 +107,7 @@ def update_me(
 ):
     """Atualização de dados cadastrais do próprio usuário."""
     data = update.model_dump(exclude_unset=True)
+    username_anterior = current_user.username
 
     # Valida troca de email
     if "email" in data:
@@ -104,7 +121,7 @@ def update_me(
     if "password" in data:
         # Se enviou senha nova, faz o hash antes de salvar
         password_plain = data.pop("password")
-        current_user.hashed_password = auth_service.get_password_hash(password_plain)
+        current_user.hashed_password = executar_no_loop(hasher.gerar_hash, password_plain)
         
         # Se trocou a senha, assume que cumpriu a obrigação (se existia)
         if current_user.must_change_password:
@@ -120,16 +137,56 @@ def update_me(
 
     db.commit()
     db.refresh(current_user)
+    cache_usuarios.invalidar(username_anterior, current_user.username)
     return current_user
 
 # --- ADMIN / INTERNO ---
 
 @router.get("/usuarios", response_model=List[schemas.UserAdmin], tags=["Admin"])
 def list_users(
+    request: Request,
+    response: Response,
+    username: Optional[str] = Query(None, min_length=1, description="Prefixo do username."),
+    nome: Optional[str] = Query(None, min_length=1, description="Prefixo do nome completo."),
+    is_active: Optional[bool] = None,
+    data_inicio: Optional[datetime] = Query(None, description="Cadastrados a partir desta data."),
+    data_fim: Optional[datetime] = Query(None, description="Cadastrados até esta data."),
+    since: Optional[datetime] = Query(None, description="Somente usuários alterados desde este instante."),
+    pagina: Paginacao = Depends(),
+    db: Session = Depends(get_db),
+    _ = Depends(require_roles("admin"))
+):
+    """
+    Lista usuários (paginação por cursor opcional).
+    Com `Accept: application/x-ndjson` a resposta é transmitida em streaming.
+    """
+    query = db.query(models.User)
+    if username:
+        query = query.filter(filtro_prefixo(models.User.username, username))
+    if nome:
+        query = query.filter(filtro_prefixo(models.User.full_name, nome))
+    if is_active is not None:
+        query = query.filter(models.User.is_active == is_active)
+    if data_inicio:
+        query = query.filter(models.User.created_at >= data_inicio)
+    if data_fim:
+        query = query.filter(models.User.created_at <= data_fim)
+    if since:
+        query = query.filter(models.User.updated_at >= since)
+
+    if aceita_ndjson(request):
+        query = pagina.preparar(query, models.User.id, response)
+        return resposta_ndjson(query, SessionLocal, schemas.UserAdmin, response)
+    return pagina.aplicar(query, models.User.id, response)
+
+@router.get("/usuarios/presenca", response_model=List[schemas.PresencaCliente], tags=["Admin"])
+def listar_presenca(
+    janela: int = Query(3600, ge=1, le=int(PRESENCA_JANELA_MAX), description="Heartbeats nos últimos N segundos."),
     db: Session = Depends(get_db),
     _ = Depends(require_roles("admin"))
 ):
-    return db.query(models.User).all()
+    """Clientes desktop vistos na janela, classificados em online/offline."""
+    return presenca.listar(db, janela)
 
 @router.get("/usuarios/{id}", response_model=schemas.UserAdmin, tags=["Interno"])
 def get_user_by_id(
@@ -139,18 +196,16 @@ def get_user_by_id(
     user = db.query(models.User).filter(models.User.id == id).first()
     if not user:
         raise ServiceError("Usuário não encontrado", 404)
-    return user
+    return _com_presenca(user)
 
 @router.post("/usuarios/heartbeat", status_code=204)
 def registrar_batimento(
     payload: HeartbeatSchema,
-    db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user_from_db)
 ):
     """
     Recebe: { "status": "online" } ou { "status": "working_offline" }
+    O heartbeat vai para o buffer em memória; o banco é atualizado em lote.
     """
-    current_user.last_heartbeat = datetime.now(timezone.utc)
-    current_user.connection_status = payload.status
-    db.commit()
-    return
\ No newline at end of file
+    presenca.registrar(current_user.id, current_user.username, payload.status)
+    return
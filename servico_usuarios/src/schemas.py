@@ -140,4 +140,12 @@ class UserUpdate(BaseModel):
 
 
 class HeartbeatSchema(BaseModel):
-    status: str = "online"
\ No newline at end of file
+    status: str = "online"
+
+
+class PresencaCliente(BaseModel):
+    id: int
+    username: str
+    last_heartbeat: datetime
+    connection_status: Optional[str] = None
+    online: bool
\ No newline at end of file
@@ -0,0 +1,213 @@
+# servico_usuarios/src/services/cache_usuarios.py
+
+"""
+Cache token -> usuário.
+
+Toda rota autenticada resolvia o `sub` do JWT com um SELECT por username
+(inclusive o heartbeat, chamado em polling pelos clientes desktop). Aqui
+as colunas do usuário ficam em cache (TTL + LRU) e o objeto é remontado
+sem ir ao banco: make_transient_to_detached + merge(load=False) devolvem
+uma instância persistente na sessão da requisição, então as rotas que
+alteram o usuário continuam funcionando com commit normal.
+
+Backends:
+    local (padrão) -> dict LRU por processo
+    redis          -> compartilhado entre workers (requer o pacote `redis`)
+
+Com o backend local cada worker tem o seu cache: a invalidação vale para
+o processo que atendeu a alteração e o TTL limita a defasagem nos demais.
+"""
+
+import importlib.util
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+import models
+from servico_comum.logger import configure_logger
+
+logger = configure_logger("servico_usuarios.cache")
+
+USUARIO_CACHE_ATIVO = os.getenv("USUARIO_CACHE_ATIVO", "1") == "1"
+USUARIO_CACHE_BACKEND = os.getenv("USUARIO_CACHE_BACKEND", "local").lower()
+USUARIO_CACHE_TTL = float(os.getenv("USUARIO_CACHE_TTL", "30"))
+USUARIO_CACHE_MAX = int(os.getenv("USUARIO_CACHE_MAX", "10000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+
+# A senha nunca vai para o cache; se alguém a ler, o ORM carrega do banco
+_CAMPOS_EXCLUIDOS = {"hashed_password"}
+_COLUNAS = [
+    c for c in models.User.__table__.columns if c.key not in _CAMPOS_EXCLUIDOS
+]
+_COLUNAS_DATA = {c.key for c in _COLUNAS if isinstance(c.type, DateTime)}
+
+
+# ============================================================
+#  BACKENDS
+# ============================================================
+
+class BackendLocal:
+    """LRU com TTL em memória do processo (seguro para threads)."""
+
+    nome = "local"
+
+    def __init__(self, ttl: float, max_itens: int):
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self.despejos = 0
+
+    def obter(self, chave: str) -> Optional[dict]:
+        agora = time.monotonic()
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            expira_em, dados = item
+            if expira_em <= agora:
+                del self._itens[chave]
+                return None
+            self._itens.move_to_end(chave)
+            return dados
+
+    def salvar(self, chave: str, dados: dict):
+        with self._lock:
+            self._itens[chave] = (time.monotonic() + self.ttl, dados)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+                self.despejos += 1
+
+    def remover(self, chave: str):
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def tamanho(self) -> Optional[int]:
+        return len(self._itens)
+
+
+class BackendRedis:
+    """Redis (ou compatível): o TTL é do próprio servidor, LRU via maxmemory-policy."""
+
+    nome = "redis"
+    despejos = 0
+
+    def __init__(self, url: str, ttl: float):
+        import redis
+
+        self.ttl = max(1, int(ttl))
+        self._redis = redis.Redis.from_url(url, socket_timeout=0.5)
+
+    def obter(self, chave: str) -> Optional[dict]:
+        bruto = self._redis.get(chave)
+        return json.loads(bruto) if bruto else None
+
+    def salvar(self, chave: str, dados: dict):
+        self._redis.setex(chave, self.ttl, json.dumps(dados, default=str))
+
+    def remover(self, chave: str):
+        self._redis.delete(chave)
+
+    def tamanho(self) -> Optional[int]:
+        return None
+
+
+def _criar_backend():
+    if USUARIO_CACHE_BACKEND == "redis":
+        if importlib.util.find_spec("redis") is not None:
+            return BackendRedis(REDIS_URL, USUARIO_CACHE_TTL)
+        logger.warning("cache_usuarios_redis_indisponivel", extra={"fallback": "local"})
+    return BackendLocal(USUARIO_CACHE_TTL, USUARIO_CACHE_MAX)
+
+
+# ============================================================
+#  CACHE DE USUÁRIOS
+# ============================================================
+
+def _serializar(user: models.User) -> dict:
+    return {c.key: getattr(user, c.key) for c in _COLUNAS}
+
+
+def _desserializar(dados: dict) -> dict:
+    # Do Redis as datas voltam como texto
+    return {
+        chave: datetime.fromisoformat(valor) if chave in _COLUNAS_DATA and isinstance(valor, str) else valor
+        for chave, valor in dados.items()
+    }
+
+
+class CacheUsuarios:
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._stats = {"hits": 0, "misses": 0, "invalidacoes": 0, "erros": 0}
+
+    @staticmethod
+    def _chave(username: str) -> str:
+        return f"usuario:{username}"
+
+    def _ler(self, username: str) -> Optional[dict]:
+        try:
+            return self.backend.obter(self._chave(username))
+        except Exception as e:
+            # Cache fora do ar não pode derrubar a autenticação
+            self._stats["erros"] += 1
+            logger.warning("cache_usuarios_falha", extra={"error": str(e)})
+            return None
+
+    def _gravar(self, username: str, dados: dict):
+        try:
+            self.backend.salvar(self._chave(username), dados)
+        except Exception as e:
+            self._stats["erros"] += 1
+            logger.warning("cache_usuarios_falha", extra={"error": str(e)})
+
+    def buscar(self, db: Session, username: str, user_id: Optional[int] = None) -> Optional[models.User]:
+        """
+        Resolve o usuário do token. `user_id` (claim do JWT, quando houver)
+        descarta entradas de um username que foi recriado com outro id.
+        """
+        dados = self._ler(username) if USUARIO_CACHE_ATIVO else None
+        if dados is not None and (user_id is None or dados.get("id") == user_id):
+            self._stats["hits"] += 1
+            user = models.User(**_desserializar(dados))
+            make_transient_to_detached(user)
+            return db.merge(user, load=False)
+
+        self._stats["misses"] += 1
+        user = db.query(models.User).filter(models.User.username == username).first()
+        if user is not None and USUARIO_CACHE_ATIVO:
+            self._gravar(username, _serializar(user))
+        return user
+
+    def invalidar(self, *usernames: str):
+        for username in usernames:
+            try:
+                self.backend.remover(self._chave(username))
+            except Exception as e:
+                self._stats["erros"] += 1
+                logger.warning("cache_usuarios_falha", extra={"error": str(e)})
+            self._stats["invalidacoes"] += 1
+
+    def estatisticas(self) -> dict:
+        consultas = self._stats["hits"] + self._stats["misses"]
+        return {
+            "ativo": USUARIO_CACHE_ATIVO,
+            "backend": self.backend.nome,
+            "ttl": USUARIO_CACHE_TTL,
+            "itens": self.backend.tamanho(),
+            "despejos": self.backend.despejos,
+            **self._stats,
+            "taxa_acerto": round(self._stats["hits"] / consultas, 4) if consultas else 0.0,
+        }
+
+
+cache_usuarios = CacheUsuarios(_criar_backend())
@@ -0,0 +1,207 @@
+# servico_usuarios/src/services/presenca.py
+
+"""
+Ingestão de heartbeats com escrita agrupada.
+
+Cada heartbeat fazia UPDATE + COMMIT na linha do usuário (e movia o
+updated_at), gerando uma versão nova da tupla a cada poucos segundos por
+cliente. Agora o heartbeat só entra em um buffer em memória; a cada
+PRESENCA_FLUSH_INTERVALO o buffer vira um único
+UPDATE ... FROM (VALUES ...), último heartbeat por usuário vence.
+
+Entre os flushes o estado de presença é servido da memória (sobreposto ao
+que está no banco).
+"""
+
+import asyncio
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import DateTime, Integer, String, column, or_, update, values
+
+import models
+from database import SessionLocal
+from servico_comum.logger import configure_logger
+
+logger = configure_logger("servico_usuarios.presenca")
+
+PRESENCA_FLUSH_INTERVALO = float(os.getenv("PRESENCA_FLUSH_INTERVALO", "5"))
+# Sem heartbeat há mais que isso -> cliente considerado offline
+PRESENCA_TIMEOUT = float(os.getenv("PRESENCA_TIMEOUT", "90"))
+# Janela máxima mantida em memória / aceita na listagem admin
+PRESENCA_JANELA_MAX = float(os.getenv("PRESENCA_JANELA_MAX", "86400"))
+
+
+def _gravar_lote(itens) -> int:
+    """itens: [(user_id, instante, status)]. Retorna linhas atualizadas."""
+    U = models.User
+    lote = values(
+        column("id", Integer),
+        column("instante", DateTime(timezone=True)),
+        column("status", String),
+        name="v",
+    ).data(itens)
+
+    stmt = (
+        update(U)
+        .where(U.id == lote.c.id)
+        # Com vários workers, um heartbeat atrasado não sobrescreve um mais novo
+        .where(or_(U.last_heartbeat.is_(None), U.last_heartbeat < lote.c.instante))
+        .values(
+            last_heartbeat=lote.c.instante,
+            connection_status=lote.c.status,
+            # Explícito para não disparar o onupdate: presença não é alteração cadastral
+            updated_at=U.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    with SessionLocal() as db:
+        resultado = db.execute(stmt)
+        db.commit()
+        return resultado.rowcount
+
+
+class BufferPresenca:
+
+    def __init__(self, intervalo: float):
+        self.intervalo = intervalo
+        self._pendentes = {}   # user_id -> (instante, status)
+        self._estado = {}      # user_id -> (username, instante, status)
+        self._lock = threading.Lock()
+        self._tarefa: Optional[asyncio.Task] = None
+        self._stats = {"recebidos": 0, "flushes": 0, "linhas_gravadas": 0, "falhas": 0}
+
+    # --------------------------------------------------------
+    #  Ingestão
+    # --------------------------------------------------------
+
+    def registrar(self, user_id: int, username: str, status: str) -> datetime:
+        agora = datetime.now(timezone.utc)
+        with self._lock:
+            self._pendentes[user_id] = (agora, status)
+            self._estado[user_id] = (username, agora, status)
+            self._stats["recebidos"] += 1
+        return agora
+
+    def estado(self, user_id: int) -> Optional[dict]:
+        """Presença mais recente conhecida por este processo (ainda não gravada ou não)."""
+        item = self._estado.get(user_id)
+        if item is None:
+            return None
+        _, instante, status = item
+        return {"last_heartbeat": instante, "connection_status": status}
+
+    # --------------------------------------------------------
+    #  Flush periódico
+    # --------------------------------------------------------
+
+    async def iniciar(self):
+        self._tarefa = asyncio.create_task(self._executar())
+        logger.info("presenca_buffer_iniciado", extra={"intervalo": self.intervalo})
+
+    async def encerrar(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            await asyncio.gather(self._tarefa, return_exceptions=True)
+            self._tarefa = None
+        # Último flush antes de desligar o worker
+        try:
+            await self.descarregar()
+        except Exception as e:
+            logger.error("presenca_flush_falha", extra={"error": str(e), "pendentes": len(self._pendentes)})
+
+    async def _executar(self):
+        while True:
+            await asyncio.sleep(self.intervalo)
+            try:
+                await self.descarregar()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("presenca_flush_falha", extra={"error": str(e)})
+
+    async def descarregar(self) -> int:
+        with self._lock:
+            pendentes, self._pendentes = self._pendentes, {}
+        if not pendentes:
+            return 0
+
+        itens = [(uid, instante, status) for uid, (instante, status) in pendentes.items()]
+        try:
+            gravadas = await run_in_threadpool(_gravar_lote, itens)
+        except Exception:
+            # Devolve ao buffer sem sobrescrever heartbeats que chegaram no meio
+            with self._lock:
+                for uid, item in pendentes.items():
+                    self._pendentes.setdefault(uid, item)
+            self._stats["falhas"] += 1
+            raise
+
+        self._stats["flushes"] += 1
+        self._stats["linhas_gravadas"] += gravadas
+        self._podar()
+        return gravadas
+
+    def _podar(self):
+        limite = datetime.now(timezone.utc) - timedelta(seconds=PRESENCA_JANELA_MAX)
+        with self._lock:
+            antigos = [uid for uid, (_, instante, _) in self._estado.items() if instante < limite]
+            for uid in antigos:
+                del self._estado[uid]
+
+    # --------------------------------------------------------
+    #  Listagem admin
+    # --------------------------------------------------------
+
+    def listar(self, db, janela: float) -> list:
+        """
+        Clientes com heartbeat dentro da `janela` (segundos): busca por
+        intervalo no índice de last_heartbeat, sobreposta ao estado em memória.
+        """
+        U = models.User
+        agora = datetime.now(timezone.utc)
+        desde = agora - timedelta(seconds=janela)
+
+        linhas = (
+            db.query(U.id, U.username, U.last_heartbeat, U.connection_status)
+            .filter(U.last_heartbeat >= desde)
+            .all()
+        )
+        clientes = {
+            uid: (username, instante, status)
+            for uid, username, instante, status in linhas
+        }
+        with self._lock:
+            memoria = list(self._estado.items())
+        for uid, item in memoria:
+            atual = clientes.get(uid)
+            if item[1] >= desde and (atual is None or atual[1] is None or item[1] > atual[1]):
+                clientes[uid] = item
+
+        limite_online = agora - timedelta(seconds=PRESENCA_TIMEOUT)
+        resultado = []
+        for uid, (username, instante, status) in clientes.items():
+            ativo = instante >= limite_online
+            resultado.append({
+                "id": uid,
+                "username": username,
+                "last_heartbeat": instante,
+                "connection_status": status if ativo else "offline",
+                "online": ativo and status == "online",
+            })
+        resultado.sort(key=lambda c: c["last_heartbeat"], reverse=True)
+        return resultado
+
+    def estatisticas(self) -> dict:
+        return {
+            "intervalo": self.intervalo,
+            "pendentes": len(self._pendentes),
+            "em_memoria": len(self._estado),
+            **self._stats,
+        }
+
+
+presenca = BufferPresenca(PRESENCA_FLUSH_INTERVALO)
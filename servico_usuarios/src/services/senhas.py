@@ -0,0 +1,200 @@
+# servico_usuarios/src/services/senhas.py
+
+"""
+Hash e verificação de senhas (bcrypt) fora do event loop e do threadpool.
+
+bcrypt é CPU-bound e propositalmente lento; um pico de logins no início de
+um evento ocupava todas as threads do servidor e travava as demais rotas.
+Aqui o trabalho vai para um pool de processos dedicado com fila limitada:
+quando saturada, a requisição é recusada na hora com HashSaturado
+(mapeada para 429 + Retry-After no main).
+
+Um hash que passa do timeout continua ocupando o worker: a vaga na fila
+só é liberada quando o job termina de fato (HashExpirado -> 503).
+
+Este módulo não importa banco nem FastAPI: os workers (spawn) só carregam
+passlib/bcrypt.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from passlib.context import CryptContext
+
+from servico_comum.logger import configure_logger
+from servico_comum.metrics import LatencyHistogram
+from servico_comum.runtime import cpus_disponiveis, workers_web
+
+logger = configure_logger("servico_usuarios.senhas")
+
+
+# Custo do bcrypt. Ao mudar, hashes antigos são refeitos no próximo login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# "process" (padrão) ou "thread" (útil em desenvolvimento com --reload)
+SENHA_HASH_BACKEND = os.getenv("SENHA_HASH_BACKEND", "process").lower()
+SENHA_HASH_WORKERS = int(os.getenv("SENHA_HASH_WORKERS", "0")) or max(1, cpus_disponiveis() // workers_web())
+SENHA_FILA_MAX = int(os.getenv("SENHA_FILA_MAX", "0")) or SENHA_HASH_WORKERS * 8
+SENHA_TIMEOUT = float(os.getenv("SENHA_TIMEOUT", "10"))
+SENHA_RETRY_AFTER = int(os.getenv("SENHA_RETRY_AFTER", "1"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+)
+
+
+class HashSaturado(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Fila de verificação de senhas cheia")
+        self.retry_after = retry_after
+
+
+class HashExpirado(Exception):
+    """O hash passou de SENHA_TIMEOUT (o job segue no worker)."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Tempo de verificação de senha esgotado")
+        self.retry_after = retry_after
+
+
+# ============================================================
+#  FUNÇÕES EXECUTADAS NOS WORKERS
+# ============================================================
+
+def _aquecer_worker():
+    # Carrega o backend do bcrypt antes da primeira requisição
+    pwd_context.hash("aquecimento", rounds=4)
+
+
+def _verificar(senha: str, hashed: str):
+    """Retorna (válida, novo_hash). novo_hash só vem quando o custo mudou."""
+    inicio = time.perf_counter()
+    valida, novo_hash = pwd_context.verify_and_update(senha, hashed)
+    return valida, novo_hash, time.perf_counter() - inicio
+
+
+def _gerar_hash(senha: str):
+    inicio = time.perf_counter()
+    return pwd_context.hash(senha), time.perf_counter() - inicio
+
+
+# ============================================================
+#  POOL DE HASH
+# ============================================================
+
+class HasherSenhas:
+
+    def __init__(self, backend: str, workers: int, fila_max: int, timeout: float):
+        self.backend = backend
+        self.workers = workers
+        self.fila_max = fila_max
+        self.timeout = timeout
+        self._executor = None
+        self._pendentes = 0
+        self._stats = {
+            "verificacoes": 0, "hashes": 0, "rehashes": 0,
+            "rejeitadas": 0, "falhas": 0, "timeouts": 0,
+        }
+        # Tempo total (fila + bcrypt) e tempo apenas dentro do worker
+        self.latencia_total = LatencyHistogram()
+        self.latencia_hash = LatencyHistogram()
+
+    def iniciar(self):
+        if self._executor is not None:
+            return
+        if self.backend == "thread":
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="hash-senha"
+            )
+        else:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_aquecer_worker,
+            )
+        logger.info(
+            "hasher_iniciado",
+            extra={
+                "backend": self.backend, "workers": self.workers,
+                "fila_max": self.fila_max, "rounds": BCRYPT_ROUNDS,
+            }
+        )
+
+    def encerrar(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def _executar(self, fn, *args):
+        if self._pendentes >= self.fila_max:
+            self._stats["rejeitadas"] += 1
+            raise HashSaturado(SENHA_RETRY_AFTER)
+
+        if self._executor is None:
+            self.iniciar()
+
+        inicio = time.perf_counter()
+        job = self._executor.submit(fn, *args)
+        self._pendentes += 1
+        futuro = asyncio.wrap_future(job)
+        futuro.add_done_callback(self._liberar)
+        try:
+            # shield: o timeout não marca o job como cancelado antes de ele terminar
+            resultado = await asyncio.wait_for(asyncio.shield(futuro), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            # Se ainda não saiu da fila do executor, nem chega a rodar
+            job.cancel()
+            self._stats["timeouts"] += 1
+            raise HashExpirado(SENHA_RETRY_AFTER)
+        except Exception:
+            self._stats["falhas"] += 1
+            raise
+
+        self.latencia_total.observe(time.perf_counter() - inicio)
+        self.latencia_hash.observe(resultado[-1])
+        return resultado[:-1]
+
+    def _liberar(self, futuro: asyncio.Future):
+        """Callback de término do job (no loop): devolve a vaga da fila."""
+        self._pendentes -= 1
+        if not futuro.cancelled():
+            # Resultado de um job que expirou ninguém mais lê
+            futuro.exception()
+
+    async def verificar(self, senha: str, hashed: str):
+        """
+        Verifica a senha. Retorna (válida, novo_hash): novo_hash é o hash
+        refeito com o custo atual quando o armazenado está desatualizado.
+        """
+        valida, novo_hash = await self._executar(_verificar, senha, hashed)
+        self._stats["verificacoes"] += 1
+        if novo_hash:
+            self._stats["rehashes"] += 1
+        return valida, novo_hash
+
+    async def gerar_hash(self, senha: str) -> str:
+        (hashed,) = await self._executar(_gerar_hash, senha)
+        self._stats["hashes"] += 1
+        return hashed
+
+    def estatisticas(self) -> dict:
+        return {
+            "backend": self.backend,
+            "workers": self.workers,
+            "fila_max": self.fila_max,
+            "rounds": BCRYPT_ROUNDS,
+            "pendentes": self._pendentes,
+            **self._stats,
+            "latencia_total": self.latencia_total.snapshot(),
+            "latencia_hash": self.latencia_hash.snapshot(),
+        }
+
+
+hasher = HasherSenhas(
+    SENHA_HASH_BACKEND, SENHA_HASH_WORKERS, SENHA_FILA_MAX, SENHA_TIMEOUT
+)
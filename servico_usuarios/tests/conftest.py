@@ -0,0 +1,26 @@
+# servico_usuarios/tests/conftest.py
+
+"""
+Testes do serviço de usuários:
+
+    python -m pytest -q servico_usuarios/tests
+
+Os módulos do serviço são importados como no container (src no path,
+`import models`).
+"""
+
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+RAIZ = Path(__file__).resolve().parents[2]
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+from servico_comum.testes import ServicoEmTeste, configurar_banco
+
+configurar_banco()
+
+servico = ServicoEmTeste(SRC)
+servico.ativar()
+pytest_collect_file, pytest_itemcollected, _servico_ativo = servico.ganchos()
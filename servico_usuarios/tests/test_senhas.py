@@ -0,0 +1,69 @@
+# servico_usuarios/tests/test_senhas.py
+
+"""Fila limitada do pool de hash: saturação e jobs que passam do timeout."""
+
+import asyncio
+import threading
+
+import pytest
+
+from services.senhas import HashExpirado, HashSaturado, HasherSenhas
+
+
+@pytest.fixture
+def hash_lento():
+    """Função de hash que espera o teste liberar."""
+    liberar = threading.Event()
+
+    def gerar_hash(senha):
+        liberar.wait(5)
+        return f"hash:{senha}", 0.0
+
+    yield liberar, gerar_hash
+    liberar.set()
+
+
+def _hasher(fila_max=1, timeout=0.05):
+    return HasherSenhas("thread", workers=1, fila_max=fila_max, timeout=timeout)
+
+
+def test_timeout_mantem_a_vaga_ate_o_job_terminar(hash_lento):
+    liberar, gerar_hash = hash_lento
+
+    async def cenario():
+        h = _hasher()
+        try:
+            with pytest.raises(HashExpirado):
+                await h._executar(gerar_hash, "s3nha")
+            # O bcrypt segue no worker: a fila continua cheia
+            assert h.estatisticas()["pendentes"] == 1
+            with pytest.raises(HashSaturado):
+                await h._executar(gerar_hash, "s3nha")
+
+            liberar.set()
+            for _ in range(100):
+                if h.estatisticas()["pendentes"] == 0:
+                    break
+                await asyncio.sleep(0.01)
+            stats = h.estatisticas()
+            assert stats["pendentes"] == 0
+            assert stats["timeouts"] == 1
+            assert stats["rejeitadas"] == 1
+        finally:
+            liberar.set()
+            h.encerrar()
+
+    asyncio.run(cenario())
+
+
+def test_hash_concluido_libera_a_vaga():
+    async def cenario():
+        h = _hasher(timeout=5)
+        try:
+            assert await h._executar(lambda senha: (f"hash:{senha}", 0.001), "s3nha") == ("hash:s3nha",)
+            await asyncio.sleep(0)
+            assert h.estatisticas()["pendentes"] == 0
+        finally:
+            h.encerrar()
+
+    asyncio.run(cenario())